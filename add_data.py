@@ -1,15 +1,11 @@
 # add_data.py
-from app.db.session import Base, engine, SessionLocal
+from app.db.session import SessionLocal
 from app.models.models import *  # Import all models
 from app.db.init_db import init_db
 from app.ml.training.synthetic_data import generate_synthetic_intelligence, save_synthetic_data_to_db
 
-# Create tables if they don't exist
-print("Ensuring database tables exist...")
-Base.metadata.create_all(bind=engine)
-
-# Initialize the database with parish data
-print("Initializing parishes...")
+# Create tables if they don't exist and add the parish data
+print("Ensuring database tables exist and initializing parishes...")
 db = SessionLocal()
 init_db(db)
 
@@ -0,0 +1,47 @@
+# alembic/versions/0002_feature_stats_and_static_features.py
+"""training statistics on model versions and materialized static features
+
+model_versions.feature_stats holds the recency reference time and
+normalization statistics from training; intelligence_features the static
+feature vector of every report, written at ingestion. Either may already exist
+on databases that ran the old add_feature_stats_column.py script or
+create_tables.py, so both are only added when missing.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 16:40:02.512873
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if 'feature_stats' not in [column['name'] for column in inspector.get_columns('model_versions')]:
+        op.add_column('model_versions', sa.Column('feature_stats', sa.JSON(), nullable=True))
+    if not inspector.has_table('intelligence_features'):
+        op.create_table('intelligence_features',
+        sa.Column('intelligence_id', sa.Integer(), nullable=False),
+        sa.Column('schema_version', sa.String(length=16), nullable=False),
+        sa.Column('vector', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['intelligence_id'], ['intelligence.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('intelligence_id')
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('intelligence_features')
+    with op.batch_alter_table('model_versions') as batch_op:
+        batch_op.drop_column('feature_stats')
@@ -1,8 +1,9 @@
 # app/api/v1/endpoints/insights.py
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.core.cache import etag_response, response_cache
+from app.db.replicas import get_read_db
 
 router = APIRouter()
 
@@ -12,15 +13,14 @@ def test_endpoint():
     return {"message": "Insights test endpoint is working"}
 
 @router.get("/resource-recommendations")
-def get_resource_insights(db: Session = Depends(get_db)):
-    """Simplified version for testing"""
-    return [
-        {
-            "parish_id": 1,
-            "parish_name": "Kingston",
-            "action": "Increase",
-            "officers": 10,
-            "confidence": "high",
-            "reason": "Increase due to recent crime reports in this area"
-        }
-    ]
\ No newline at end of file
+def get_resource_insights(request: Request, db: Session = Depends(get_read_db)):
+    """Recommended resource adjustments (dry run, cached until the next data change)"""
+    # Imported on first use, keeping pandas and scikit-learn out of the worker's startup
+    from app.services.insights import InsightsGenerator
+
+    content, etag = response_cache.get_or_compute(
+        "insights",
+        "resource-recommendations",
+        lambda: InsightsGenerator(db).generate_resource_insights(read_only=True)
+    )
+    return etag_response(request, content, etag)
@@ -4,14 +4,31 @@ from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.core.cache import response_cache
+from app.core.reference_data import get_reference_data, parish_exists
+from app.db import queries
+from app.db.replicas import get_read_db
 from app.db.session import get_db
-from app.models.models import Intelligence, Parish
+from app.models.models import Intelligence
 from app.schemas.intelligence import Intelligence as IntelligenceSchema
 from app.schemas.intelligence import IntelligenceCreate, IntelligenceUpdate, IntelligenceType
 from app.services.validation import validate_intelligence, check_intelligence_trends
+from app.services.trends import trend_engine
+from app.services.duplicates import recent_reports
 
 router = APIRouter()
 
+def record_new_intelligence(db_intelligence: Intelligence) -> None:
+    """Update caches and in-memory indexes after a report was created"""
+    response_cache.invalidate("parish_stats", "insights")
+    trend_engine.record(db_intelligence.parish_id, db_intelligence.timestamp, db_intelligence.severity)
+    recent_reports.record(db_intelligence.parish_id, db_intelligence.type, db_intelligence.timestamp, db_intelligence.description)
+
+def record_changed_intelligence() -> None:
+    """Update caches and in-memory indexes after a report was edited or deleted"""
+    response_cache.invalidate("parish_stats", "insights")
+    trend_engine.invalidate()
+
 @router.post("/", response_model=IntelligenceSchema, status_code=status.HTTP_201_CREATED)
 def create_intelligence(
     intelligence: IntelligenceCreate,
@@ -19,8 +36,7 @@ def create_intelligence(
 ):
     """Create new intelligence data"""
     # Validate that parish exists
-    parish = db.query(Parish).filter(Parish.id == intelligence.parish_id).first()
-    if not parish:
+    if not parish_exists(db, intelligence.parish_id):
         raise HTTPException(
             status_code=404,
             detail=f"Parish with ID {intelligence.parish_id} not found. Valid IDs are 1-14."
@@ -28,8 +44,13 @@ def create_intelligence(
         
     db_intelligence = Intelligence(**intelligence.dict())
     db.add(db_intelligence)
+    db.flush()
+    # Imported on the first write, keeping pandas out of the worker's startup
+    from app.ml.features.materialized import store_static_features
+    store_static_features(db, [db_intelligence])
     db.commit()
     db.refresh(db_intelligence)
+    record_new_intelligence(db_intelligence)
     
     # TODO: Trigger update of predictions
     
@@ -41,18 +62,10 @@ def read_intelligence(
     limit: int = 100,
     parish_id: Optional[int] = None,
     intelligence_type: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Retrieve intelligence data with optional filtering"""
-    query = db.query(Intelligence)
-    
-    if parish_id:
-        query = query.filter(Intelligence.parish_id == parish_id)
-    
-    if intelligence_type:
-        query = query.filter(Intelligence.type == intelligence_type)
-    
-    return query.order_by(Intelligence.timestamp.desc()).offset(skip).limit(limit).all()
+    return db.scalars(queries.intelligence_list(skip, limit, parish_id, intelligence_type)).all()
 
 # Note: Moved this endpoint before the /{intelligence_id} endpoint to fix the routing issue
 @router.get("/types", response_model=List[str])
@@ -78,8 +91,12 @@ def create_intelligence_with_validation(
     # Create the intelligence record
     db_intelligence = Intelligence(**data)
     db.add(db_intelligence)
+    db.flush()
+    from app.ml.features.materialized import store_static_features
+    store_static_features(db, [db_intelligence])
     db.commit()
     db.refresh(db_intelligence)
+    record_new_intelligence(db_intelligence)
     
     # Get trends for the associated parish
     trends = check_intelligence_trends(db_intelligence.parish_id, db)
@@ -94,12 +111,11 @@ def create_intelligence_with_validation(
 @router.get("/insights/{parish_id}", response_model=Dict[str, Any])
 def get_intelligence_insights(
     parish_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get intelligence insights for a specific parish"""
     # Check if parish exists
-    parish = db.query(Parish).filter(Parish.id == parish_id).first()
-    if parish is None:
+    if not parish_exists(db, parish_id):
         raise HTTPException(status_code=404, detail="Parish not found")
     
     # Get trends
@@ -107,17 +123,15 @@ def get_intelligence_insights(
     
     # Get recent intelligence (last 30 days)
     month_ago = datetime.now() - timedelta(days=30)
-    recent_intelligence = db.query(Intelligence).filter(
-        Intelligence.parish_id == parish_id,
-        Intelligence.timestamp > month_ago
-    ).order_by(Intelligence.timestamp.desc()).limit(10).all()
+    recent_intelligence = db.scalars(queries.recent_parish_intelligence(parish_id, month_ago)).all()
     
-    # Get parish details
+    # Get parish details (only the columns that change are read from the database)
+    current_crime_level, police_allocated = db.execute(queries.parish_status(parish_id)).one()
     parish_details = {
-        "id": parish.id,
-        "name": parish.name,
-        "current_crime_level": parish.current_crime_level,
-        "police_allocated": parish.police_allocated,
+        "id": parish_id,
+        "name": get_reference_data(db).names[parish_id],
+        "current_crime_level": current_crime_level,
+        "police_allocated": police_allocated,
     }
     
     return {
@@ -132,7 +146,7 @@ def read_intelligence_by_id(
     db: Session = Depends(get_db)
 ):
     """Retrieve specific intelligence by ID"""
-    db_intelligence = db.query(Intelligence).filter(Intelligence.id == intelligence_id).first()
+    db_intelligence = db.scalars(queries.intelligence_by_id(intelligence_id)).first()
     if db_intelligence is None:
         raise HTTPException(status_code=404, detail="Intelligence not found")
     return db_intelligence
@@ -144,7 +158,7 @@ def update_intelligence(
     db: Session = Depends(get_db)
 ):
     """Update intelligence data"""
-    db_intelligence = db.query(Intelligence).filter(Intelligence.id == intelligence_id).first()
+    db_intelligence = db.scalars(queries.intelligence_by_id(intelligence_id)).first()
     if db_intelligence is None:
         raise HTTPException(status_code=404, detail="Intelligence not found")
     
@@ -152,9 +166,12 @@ def update_intelligence(
     update_data = intelligence.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_intelligence, key, value)
+    from app.ml.features.materialized import store_static_features
+    store_static_features(db, [db_intelligence], replace=True)
     
     db.commit()
     db.refresh(db_intelligence)
+    record_changed_intelligence()
     
     # TODO: Trigger update of predictions if necessary
     
@@ -166,12 +183,15 @@ def delete_intelligence(
     db: Session = Depends(get_db)
 ):
     """Delete intelligence data"""
-    db_intelligence = db.query(Intelligence).filter(Intelligence.id == intelligence_id).first()
+    db_intelligence = db.scalars(queries.intelligence_by_id(intelligence_id)).first()
     if db_intelligence is None:
         raise HTTPException(status_code=404, detail="Intelligence not found")
     
+    from app.ml.features.materialized import delete_static_features
+    delete_static_features(db, intelligence_id)
     db.delete(db_intelligence)
     db.commit()
+    record_changed_intelligence()
     
     # TODO: Trigger update of predictions
     
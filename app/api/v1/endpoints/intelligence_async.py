@@ -0,0 +1,162 @@
+# app/api/v1/endpoints/intelligence_async.py
+"""
+Async versions of the intelligence endpoints, served instead of the sync ones
+when ASYNC_DB_ENABLED is set. Statements come from app.db.queries; sync-only
+services run on the async connection through AsyncSession.run_sync().
+"""
+from typing import List, Optional, Dict, Any
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.endpoints.intelligence import record_new_intelligence, record_changed_intelligence
+from app.core.reference_data import get_reference_data, parish_exists
+from app.db import queries
+from app.db.async_session import get_async_db
+from app.models.models import Intelligence
+from app.schemas.intelligence import Intelligence as IntelligenceSchema
+from app.schemas.intelligence import IntelligenceCreate, IntelligenceUpdate, IntelligenceType
+from app.services.validation import validate_intelligence, check_intelligence_trends_async
+
+router = APIRouter()
+
+async def _get_intelligence_or_404(db: AsyncSession, intelligence_id: int) -> Intelligence:
+    db_intelligence = (await db.scalars(queries.intelligence_by_id(intelligence_id))).first()
+    if db_intelligence is None:
+        raise HTTPException(status_code=404, detail="Intelligence not found")
+    return db_intelligence
+
+async def _save_new_intelligence(db: AsyncSession, data: Dict[str, Any]) -> Intelligence:
+    db_intelligence = Intelligence(**data)
+    db.add(db_intelligence)
+    await db.flush()
+    # Imported on the first write, keeping pandas out of the worker's startup
+    from app.ml.features.materialized import store_static_features
+    await db.run_sync(store_static_features, [db_intelligence])
+    await db.commit()
+    await db.refresh(db_intelligence)
+    record_new_intelligence(db_intelligence)
+    return db_intelligence
+
+@router.post("/", response_model=IntelligenceSchema, status_code=status.HTTP_201_CREATED)
+async def create_intelligence(
+    intelligence: IntelligenceCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create new intelligence data"""
+    # Validate that parish exists
+    if not await db.run_sync(parish_exists, intelligence.parish_id):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Parish with ID {intelligence.parish_id} not found. Valid IDs are 1-14."
+        )
+
+    return await _save_new_intelligence(db, intelligence.dict())
+
+@router.get("/", response_model=List[IntelligenceSchema])
+async def read_intelligence(
+    skip: int = 0,
+    limit: int = 100,
+    parish_id: Optional[int] = None,
+    intelligence_type: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Retrieve intelligence data with optional filtering"""
+    return (await db.scalars(queries.intelligence_list(skip, limit, parish_id, intelligence_type))).all()
+
+@router.get("/types", response_model=List[str])
+async def get_intelligence_types():
+    """Get all available intelligence types"""
+    return [intel_type.value for intel_type in IntelligenceType]
+
+@router.post("/with-validation", response_model=Dict[str, Any])
+async def create_intelligence_with_validation(
+    intelligence: IntelligenceCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create new intelligence with validation"""
+    data = intelligence.dict()
+
+    # Validation only does lookups, so it runs on the async connection as is
+    is_valid, message = await db.run_sync(lambda session: validate_intelligence(data, session))
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=message)
+
+    db_intelligence = await _save_new_intelligence(db, data)
+    trends = await check_intelligence_trends_async(db_intelligence.parish_id, db)
+
+    return {
+        "intelligence": IntelligenceSchema.model_validate(db_intelligence),
+        "trends": trends,
+        "message": message  # This will contain any warnings
+    }
+
+@router.get("/insights/{parish_id}", response_model=Dict[str, Any])
+async def get_intelligence_insights(
+    parish_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get intelligence insights for a specific parish"""
+    if not await db.run_sync(parish_exists, parish_id):
+        raise HTTPException(status_code=404, detail="Parish not found")
+
+    trends = await check_intelligence_trends_async(parish_id, db)
+
+    month_ago = datetime.now() - timedelta(days=30)
+    recent_intelligence = (await db.scalars(queries.recent_parish_intelligence(parish_id, month_ago))).all()
+
+    current_crime_level, police_allocated = (await db.execute(queries.parish_status(parish_id))).one()
+    reference = await db.run_sync(get_reference_data)
+
+    return {
+        "parish": {
+            "id": parish_id,
+            "name": reference.names[parish_id],
+            "current_crime_level": current_crime_level,
+            "police_allocated": police_allocated,
+        },
+        "trends": trends,
+        "recent_intelligence": [IntelligenceSchema.model_validate(intel) for intel in recent_intelligence]
+    }
+
+@router.get("/{intelligence_id}", response_model=IntelligenceSchema)
+async def read_intelligence_by_id(
+    intelligence_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Retrieve specific intelligence by ID"""
+    return await _get_intelligence_or_404(db, intelligence_id)
+
+@router.patch("/{intelligence_id}", response_model=IntelligenceSchema)
+async def update_intelligence(
+    intelligence_id: int,
+    intelligence: IntelligenceUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update intelligence data"""
+    db_intelligence = await _get_intelligence_or_404(db, intelligence_id)
+
+    for key, value in intelligence.dict(exclude_unset=True).items():
+        setattr(db_intelligence, key, value)
+    from app.ml.features.materialized import store_static_features
+    await db.run_sync(store_static_features, [db_intelligence], True)
+
+    await db.commit()
+    await db.refresh(db_intelligence)
+    record_changed_intelligence()
+    return db_intelligence
+
+@router.delete("/{intelligence_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_intelligence(
+    intelligence_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Delete intelligence data"""
+    db_intelligence = await _get_intelligence_or_404(db, intelligence_id)
+
+    from app.ml.features.materialized import delete_static_features
+    await db.run_sync(delete_static_features, intelligence_id)
+    await db.delete(db_intelligence)
+    await db.commit()
+    record_changed_intelligence()
+    return None
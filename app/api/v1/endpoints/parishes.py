@@ -1,70 +1,132 @@
 # app/api/v1/endpoints/parishes.py
-from typing import List, Dict
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import List, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
-from sqlalchemy.sql import func
 
+from app.core.cache import compute_etag, etag_response, response_cache
+from app.core.reference_data import REFERENCE_FIELDS, refresh_reference_data
+from app.db import queries
+from app.db.replicas import get_read_db
 from app.db.session import get_db
-from app.models.models import Parish, Intelligence
+from app.models.models import Parish
 from app.schemas.parish import Parish as ParishSchema
 from app.schemas.parish import ParishUpdate, ParishWithStats
-from app.ml.models.resource_allocator import ResourceAllocator
-from app.ml.models.crime_prediction import CrimePredictionModel
+from app.schemas.history import HistoryResponse
+from app.services.history import get_history
+from app.services.trends import trend_engine
 
 router = APIRouter()
 
+def load_history(
+    db: Session,
+    parish_id: Optional[int],
+    start: Optional[datetime],
+    end: Optional[datetime],
+    bucket: str
+) -> Dict:
+    try:
+        return get_history(db, start=start, end=end, bucket=bucket, parish_id=parish_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def history_response(request: Request, history: Dict) -> Response:
+    # The series only change when a bucket does, so "to" is left out of the ETag
+    etag = compute_etag(jsonable_encoder({key: value for key, value in history.items() if key != "end"}))
+    return etag_response(request, history, etag)
+
 @router.get("/", response_model=List[ParishSchema])
 def read_parishes(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db)
 ):
     """Retrieve all parishes"""
-    return db.query(Parish).offset(skip).limit(limit).all()
+    content, etag = response_cache.get_or_compute(
+        "parishes",
+        f"list:{skip}:{limit}",
+        lambda: [ParishSchema.model_validate(parish) for parish in db.scalars(queries.parish_list(skip, limit)).all()]
+    )
+    return etag_response(request, content, etag)
 
 @router.get("/with-stats", response_model=List[ParishWithStats])
 def read_parishes_with_stats(
-    db: Session = Depends(get_db)
+    request: Request,
+    db: Session = Depends(get_read_db)
 ):
     """Retrieve parishes with additional statistics"""
-    parishes = db.query(Parish).all()
-    result = []
+    content, etag = response_cache.get_or_compute(
+        "parish_stats",
+        "all",
+        lambda: _compute_parishes_with_stats(db)
+    )
+    return etag_response(request, content, etag)
+
+def _compute_parishes_with_stats(db: Session) -> List[ParishWithStats]:
+    """Counts and average severity for every parish in one grouped statement"""
+    trends = trend_engine.trends(db)
     
-    for parish in parishes:
-        # Get intelligence count
-        intelligence_count = db.query(func.count(Intelligence.id)).filter(
-            Intelligence.parish_id == parish.id
-        ).scalar()
-        
-        # Get average severity
-        avg_severity = db.query(func.avg(Intelligence.severity)).filter(
-            Intelligence.parish_id == parish.id
-        ).scalar() or 0.0
-        
-        # Get crime trend (simplified for now)
-        crime_trend = "stable"  # This would be calculated based on historical data
-        
-        parish_data = ParishSchema.from_orm(parish)
-        parish_with_stats = ParishWithStats(
-            **parish_data.dict(),
+    rows = db.execute(queries.parishes_with_stats()).all()
+    return build_parishes_with_stats(rows, trends)
+
+def build_parishes_with_stats(rows, trends: Dict[int, str]) -> List[ParishWithStats]:
+    """Shape queries.parishes_with_stats rows (shared with the async endpoint)"""
+    return [
+        ParishWithStats(
+            id=parish_id,
+            name=name,
+            coordinates=coordinates,
+            current_crime_level=crime_level or 0,
+            police_allocated=police_allocated or 0,
+            recommended_allocation=recommended_allocation or 0,
             intelligence_count=intelligence_count,
-            average_severity=float(avg_severity),
-            crime_trend=crime_trend
+            average_severity=float(avg_severity or 0.0),
+            crime_trend=trends.get(parish_id, "stable")
         )
-        result.append(parish_with_stats)
-    
-    return result
+        for (parish_id, name, coordinates, crime_level, police_allocated, recommended_allocation,
+             intelligence_count, avg_severity) in rows
+    ]
+
+@router.get("/history", response_model=HistoryResponse)
+def read_parishes_history(
+    request: Request,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    bucket: str = "auto",
+    db: Session = Depends(get_read_db)
+):
+    """Downsampled prediction and allocation history for all parishes"""
+    return history_response(request, load_history(db, None, start, end, bucket))
+
+@router.get("/{parish_id}/history", response_model=HistoryResponse)
+def read_parish_history(
+    parish_id: int,
+    request: Request,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    bucket: str = "auto",
+    db: Session = Depends(get_read_db)
+):
+    """Downsampled prediction and allocation history for a specific parish"""
+    return history_response(request, load_history(db, parish_id, start, end, bucket))
 
 @router.get("/{parish_id}", response_model=ParishSchema)
 def read_parish(
     parish_id: int,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """Retrieve a specific parish by ID"""
-    db_parish = db.query(Parish).filter(Parish.id == parish_id).first()
-    if db_parish is None:
-        raise HTTPException(status_code=404, detail="Parish not found")
-    return db_parish
+    def load_parish():
+        db_parish = db.scalars(queries.parish_by_id(parish_id)).first()
+        if db_parish is None:
+            raise HTTPException(status_code=404, detail="Parish not found")
+        return ParishSchema.model_validate(db_parish)
+    
+    content, etag = response_cache.get_or_compute("parishes", str(parish_id), load_parish)
+    return etag_response(request, content, etag)
 
 @router.patch("/{parish_id}", response_model=ParishSchema)
 def update_parish(
@@ -73,7 +135,7 @@ def update_parish(
     db: Session = Depends(get_db)
 ):
     """Update parish data"""
-    db_parish = db.query(Parish).filter(Parish.id == parish_id).first()
+    db_parish = db.scalars(queries.parish_by_id(parish_id)).first()
     if db_parish is None:
         raise HTTPException(status_code=404, detail="Parish not found")
     
@@ -83,6 +145,9 @@ def update_parish(
     
     db.commit()
     db.refresh(db_parish)
+    response_cache.invalidate("parishes", "parish_stats", "insights")
+    if REFERENCE_FIELDS.intersection(update_data):
+        refresh_reference_data(db)
     return db_parish
 
 @router.post("/allocate-resources", response_model=dict)
@@ -90,14 +155,17 @@ def allocate_resources(
     db: Session = Depends(get_db)
 ):
     """Allocate police resources across parishes based on crime levels"""
-    # First, update crime level predictions for all parishes
-    prediction_model = CrimePredictionModel()
-    parishes = db.query(Parish).all()
+    # Imported on first use, keeping pandas and scikit-learn out of the worker's startup
+    from app.ml.models.crime_prediction import CrimePredictionModel
+    from app.ml.models.resource_allocator import ResourceAllocator
+
+    # First, update crime level predictions for all parishes (one query for all of them)
+    prediction_model = CrimePredictionModel(db)
+    parishes = {parish.id: parish for parish in db.query(Parish).all()}
+    crime_levels = prediction_model.predict_crime_levels(db, list(parishes))
     
-    for parish in parishes:
-        # Predict crime level
-        crime_level = prediction_model.predict_crime_level(db, parish.id)
-        parish.current_crime_level = crime_level
+    for parish_id, parish in parishes.items():
+        parish.current_crime_level = crime_levels[parish_id]
     
     db.commit()
     
@@ -108,14 +176,16 @@ def allocate_resources(
     recommendations = allocator.generate_recommendations(db)
     allocations = allocator.allocate_resources(db)
     
-    # Update parish allocations in the database
+    # Update parish allocations in the database (reloaded in one query, the commits expired them)
+    parishes = {parish.id: parish for parish in db.query(Parish).all()}
     for parish_id, officers in allocations.items():
-        parish = db.query(Parish).filter(Parish.id == parish_id).first()
+        parish = parishes.get(parish_id)
         if parish:
             parish.police_allocated = officers
             parish.recommended_allocation = recommendations.get(parish_id, 0)
     
     db.commit()
+    response_cache.invalidate("parishes", "parish_stats", "insights")
     
     return {
         "recommendations": recommendations,
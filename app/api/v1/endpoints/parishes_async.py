@@ -0,0 +1,112 @@
+# app/api/v1/endpoints/parishes_async.py
+"""
+Async versions of the parish read/update endpoints, served instead of the sync
+ones when ASYNC_DB_ENABLED is set. allocate-resources stays sync: it is CPU-bound
+model work that belongs on the threadpool, not the event loop.
+"""
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.endpoints.parishes import build_parishes_with_stats, history_response, load_history
+from app.core.cache import etag_response, response_cache
+from app.core.reference_data import REFERENCE_FIELDS, refresh_reference_data
+from app.db import queries
+from app.db.async_session import get_async_db
+from app.schemas.parish import Parish as ParishSchema
+from app.schemas.parish import ParishUpdate, ParishWithStats
+from app.schemas.history import HistoryResponse
+from app.services.trends import trend_engine
+
+router = APIRouter()
+
+@router.get("/", response_model=List[ParishSchema])
+async def read_parishes(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Retrieve all parishes"""
+    async def load_parishes():
+        parishes = (await db.scalars(queries.parish_list(skip, limit))).all()
+        return [ParishSchema.model_validate(parish) for parish in parishes]
+
+    content, etag = await response_cache.get_or_compute_async("parishes", f"list:{skip}:{limit}", load_parishes)
+    return etag_response(request, content, etag)
+
+@router.get("/with-stats", response_model=List[ParishWithStats])
+async def read_parishes_with_stats(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Retrieve parishes with additional statistics"""
+    async def load_stats():
+        trends = await db.run_sync(trend_engine.trends)
+        rows = (await db.execute(queries.parishes_with_stats())).all()
+        return build_parishes_with_stats(rows, trends)
+
+    content, etag = await response_cache.get_or_compute_async("parish_stats", "all", load_stats)
+    return etag_response(request, content, etag)
+
+@router.get("/history", response_model=HistoryResponse)
+async def read_parishes_history(
+    request: Request,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    bucket: str = "auto",
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Downsampled prediction and allocation history for all parishes"""
+    return history_response(request, await db.run_sync(load_history, None, start, end, bucket))
+
+@router.get("/{parish_id}/history", response_model=HistoryResponse)
+async def read_parish_history(
+    parish_id: int,
+    request: Request,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    bucket: str = "auto",
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Downsampled prediction and allocation history for a specific parish"""
+    return history_response(request, await db.run_sync(load_history, parish_id, start, end, bucket))
+
+@router.get("/{parish_id}", response_model=ParishSchema)
+async def read_parish(
+    parish_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Retrieve a specific parish by ID"""
+    async def load_parish():
+        db_parish = (await db.scalars(queries.parish_by_id(parish_id))).first()
+        if db_parish is None:
+            raise HTTPException(status_code=404, detail="Parish not found")
+        return ParishSchema.model_validate(db_parish)
+
+    content, etag = await response_cache.get_or_compute_async("parishes", str(parish_id), load_parish)
+    return etag_response(request, content, etag)
+
+@router.patch("/{parish_id}", response_model=ParishSchema)
+async def update_parish(
+    parish_id: int,
+    parish: ParishUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update parish data"""
+    db_parish = (await db.scalars(queries.parish_by_id(parish_id))).first()
+    if db_parish is None:
+        raise HTTPException(status_code=404, detail="Parish not found")
+
+    update_data = parish.dict(exclude_unset=True)
+    for key, value in update_data.items():
+        setattr(db_parish, key, value)
+
+    await db.commit()
+    await db.refresh(db_parish)
+    response_cache.invalidate("parishes", "parish_stats", "insights")
+    if REFERENCE_FIELDS.intersection(update_data):
+        await db.run_sync(refresh_reference_data)
+    return db_parish
@@ -0,0 +1,73 @@
+# app/api/v1/endpoints/profiling.py
+"""Profiling endpoints, only mounted when PROFILING_TOKEN is set; every call needs X-Profile-Token"""
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.profiling import ACTIVE_LEARNING_THREAD, background_sampler, memory_tracker, token_matches
+
+
+def require_profiling_token(x_profile_token: Optional[str] = Header(None)) -> None:
+    if not token_matches(x_profile_token):
+        raise HTTPException(status_code=403, detail="Profiling needs a valid X-Profile-Token header")
+
+
+router = APIRouter(dependencies=[Depends(require_profiling_token)])
+
+@router.post("/sampler/start", response_model=Dict[str, Any])
+def start_sampler(
+    interval_ms: float = Query(None, gt=0),
+    thread_prefix: str = ACTIVE_LEARNING_THREAD
+):
+    """Start sampling the stacks of threads whose name starts with thread_prefix (the retrain loop by default)"""
+    background_sampler.start((interval_ms or settings.PROFILING_SAMPLE_INTERVAL_MS) / 1000, thread_prefix)
+    return background_sampler.status()
+
+@router.post("/sampler/stop", response_model=Dict[str, Any])
+def stop_sampler():
+    background_sampler.stop()
+    return background_sampler.status()
+
+@router.get("/sampler", response_model=Dict[str, Any])
+def get_sampler_status():
+    return background_sampler.status()
+
+@router.get("/sampler/stacks", response_class=PlainTextResponse)
+def get_sampled_stacks(output: str = Query("collapsed", pattern="^(collapsed|top)$"), reset: bool = False):
+    """Stacks sampled so far, collapsed (flame graph input) or as a table of the hottest functions"""
+    sampler = background_sampler.sampler
+    if sampler is None:
+        raise HTTPException(status_code=404, detail="The sampler has not been started")
+    body = sampler.top() if output == "top" else sampler.collapsed()
+    if reset:
+        sampler.reset()
+    return body
+
+@router.post("/memory/snapshots", response_model=Dict[str, Any])
+def take_memory_snapshot(limit: int = Query(25, gt=0)):
+    """Take a tracemalloc snapshot (tracing starts with the first one) and return its largest allocation sites"""
+    snapshot_id = memory_tracker.snapshot(settings.PROFILING_TRACEMALLOC_FRAMES)
+    return {"id": snapshot_id, "top": memory_tracker.top(snapshot_id, limit), **memory_tracker.status()}
+
+@router.get("/memory", response_model=Dict[str, Any])
+def get_memory_status():
+    return memory_tracker.status()
+
+@router.get("/memory/diff", response_model=Dict[str, Any])
+def diff_memory_snapshots(from_id: int, to_id: Optional[int] = None, limit: int = Query(25, gt=0)):
+    """Allocation growth between two snapshots; without to_id a new snapshot is taken"""
+    if to_id is None:
+        to_id = memory_tracker.snapshot(settings.PROFILING_TRACEMALLOC_FRAMES)
+    try:
+        diff = memory_tracker.diff(from_id, to_id, limit)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"No memory snapshot {e.args[0]}")
+    return {"from_id": from_id, "to_id": to_id, "diff": diff}
+
+@router.post("/memory/stop", response_model=Dict[str, Any])
+def stop_memory_tracing():
+    """Stop tracemalloc (it slows allocations down while tracing) and drop the snapshots"""
+    memory_tracker.stop()
+    return memory_tracker.status()
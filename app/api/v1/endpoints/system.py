@@ -0,0 +1,29 @@
+# app/api/v1/endpoints/system.py
+from typing import Any, Dict
+from fastapi import APIRouter
+
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.db.replicas import read_replicas
+from app.db.session import get_pool_status
+
+router = APIRouter()
+
+@router.get("/cache", response_model=Dict[str, Any])
+def get_cache_metrics():
+    """Response cache hit rate and staleness"""
+    return response_cache.metrics()
+
+@router.get("/db-pool", response_model=Dict[str, Any])
+def get_db_pool_status():
+    """Connection pool usage and checkout wait times"""
+    status = get_pool_status()
+    if settings.ASYNC_DB_ENABLED:
+        from app.db.async_session import get_async_pool_status
+        status["async_pool"] = get_async_pool_status()
+    return status
+
+@router.get("/replicas", response_model=Dict[str, Any])
+def get_replica_status():
+    """Read replica lag and how many reads each one served"""
+    return read_replicas.status()
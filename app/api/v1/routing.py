@@ -0,0 +1,17 @@
+# app/api/v1/routing.py
+from fastapi import APIRouter
+
+
+def with_async_routes(sync_router: APIRouter, async_router: APIRouter) -> APIRouter:
+    """
+    Copy of sync_router where every route that has an async twin (same path and
+    methods) is swapped for it. Route order is kept, so static paths such as
+    /with-stats still match before /{parish_id}.
+    """
+    async_routes = {(route.path, frozenset(route.methods)): route for route in async_router.routes}
+
+    router = APIRouter()
+    for route in sync_router.routes:
+        router.routes.append(async_routes.pop((route.path, frozenset(route.methods)), route))
+    router.routes.extend(async_routes.values())
+    return router
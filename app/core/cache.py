@@ -0,0 +1,202 @@
+# app/core/cache.py
+import hashlib
+import json
+import pickle
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+
+
+class CacheBackend:
+    """Minimal key/value interface the response cache needs from a store"""
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    def get_int(self, key: str) -> int:
+        """Current value of a counter written by incr() (0 when unset)"""
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process store; entries expire after their TTL"""
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        with self._lock:
+            if len(self._data) >= self.max_entries:
+                # Entries from old generations are never read again; dropping everything is cheap
+                self._data.clear()
+            expires_at = time.monotonic() + ttl if ttl else 0
+            self._data[key] = (expires_at, value)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            _, value = self._data.get(key, (0, 0))
+            value += 1
+            self._data[key] = (0, value)
+            return value
+
+    def get_int(self, key: str) -> int:
+        return int(self.get(key) or 0)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Store shared by every worker (requires the optional redis package)"""
+    def __init__(self, url: str, prefix: str = "jisp:", client: Any = None):
+        if client is None:
+            import redis  # Optional dependency, only needed for this backend
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.client.get(self.prefix + key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=ttl or None)
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(self.prefix + key))
+
+    def get_int(self, key: str) -> int:
+        # INCR stores a plain integer, not a pickle
+        return int(self.client.get(self.prefix + key) or 0)
+
+
+def compute_etag(content: Any) -> str:
+    """Weak ETag for JSON-compatible content"""
+    body = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return 'W/"' + hashlib.sha1(body.encode()).hexdigest() + '"'
+
+
+def etag_response(request: Request, content: Any, etag: Optional[str] = None) -> Response:
+    """
+    Return content as JSON with an ETag header, or an empty 304 when the
+    client's If-None-Match already holds that tag
+    """
+    content = jsonable_encoder(content)
+    etag = etag or compute_etag(content)
+
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    return JSONResponse(content=content, headers={"ETag": etag})
+
+
+class ResponseCache:
+    """
+    Caches serialized read responses per namespace. Writers call invalidate()
+    which bumps the namespace generation, so stale entries are simply never
+    looked up again; with a shared backend this works across workers too.
+    """
+    def __init__(self, backend: CacheBackend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0, "age_total": 0.0, "age_max": 0.0}
+
+    def _generation(self, namespace: str) -> int:
+        return self.backend.get_int(f"{namespace}:generation")
+
+    def _lookup(self, namespace: str, key: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Cache key for the current generation and the entry stored under it, if any"""
+        cache_key = f"{namespace}:{self._generation(namespace)}:{key}"
+        entry = self.backend.get(cache_key)
+
+        with self._lock:
+            if entry is None:
+                self._stats["misses"] += 1
+            else:
+                age = time.time() - entry["stored_at"]
+                self._stats["hits"] += 1
+                self._stats["age_total"] += age
+                self._stats["age_max"] = max(self._stats["age_max"], age)
+        return cache_key, entry
+
+    def _store(self, cache_key: str, result: Any) -> Tuple[Any, str]:
+        content = jsonable_encoder(result)
+        etag = compute_etag(content)
+        self.backend.set(cache_key, {"content": content, "etag": etag, "stored_at": time.time()}, self.ttl)
+        return content, etag
+
+    def get_or_compute(self, namespace: str, key: str, compute: Callable[[], Any]) -> Tuple[Any, str]:
+        """
+        Return (content, etag) for key, calling compute() on a miss.
+        compute() must return JSON-compatible content.
+        """
+        cache_key, entry = self._lookup(namespace, key)
+        if entry is not None:
+            return entry["content"], entry["etag"]
+        return self._store(cache_key, compute())
+
+    async def get_or_compute_async(
+        self,
+        namespace: str,
+        key: str,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, str]:
+        """get_or_compute() for the async endpoints; compute() is awaited on a miss"""
+        cache_key, entry = self._lookup(namespace, key)
+        if entry is not None:
+            return entry["content"], entry["etag"]
+        return self._store(cache_key, await compute())
+
+    def invalidate(self, *namespaces: str) -> None:
+        """Drop every cached response in the given namespaces"""
+        for namespace in namespaces:
+            self.backend.incr(f"{namespace}:generation")
+        with self._lock:
+            self._stats["invalidations"] += len(namespaces)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Hit rate and staleness (age of the entries served from cache)"""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        return {
+            "backend": type(self.backend).__name__,
+            "ttl_seconds": self.ttl,
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "hit_rate": stats["hits"] / lookups if lookups else 0.0,
+            "invalidations": stats["invalidations"],
+            "avg_hit_age_seconds": stats["age_total"] / stats["hits"] if stats["hits"] else 0.0,
+            "max_hit_age_seconds": stats["age_max"],
+        }
+
+
+def _create_backend() -> CacheBackend:
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCacheBackend(settings.CACHE_URL)
+    return MemoryCacheBackend()
+
+
+response_cache = ResponseCache(_create_backend(), settings.CACHE_TTL_SECONDS)
@@ -0,0 +1,294 @@
+# app/core/metrics.py
+"""
+Prometheus-compatible metrics, served as text at /metrics (METRICS_ENABLED).
+
+Collectors are sharded per thread: every thread that records a value gets its
+own dict of counts, so the hot path is a dict lookup and a few integer
+increments without taking a lock. A scrape sums the shards. Reading a shard
+while its thread updates it can at worst miss that one in-flight observation,
+which the next scrape picks up.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+RECIPIENT_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000)
+RETRAIN_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """All collectors of the process; enabled is checked on every record call"""
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: List["_Metric"] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: "_Metric") -> None:
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        for metric in list(self._metrics):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry(settings.METRICS_ENABLED)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._local = threading.local()
+        self._shards: List[Dict] = []
+        self._shards_lock = threading.Lock()
+        registry.register(self)
+
+    def _shard(self) -> Dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            # First record from this thread; the only time the lock is taken
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            return shard
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, labels: LabelValues = ()) -> None:
+        if not registry.enabled:
+            return
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def collect(self) -> Dict[LabelValues, float]:
+        totals: Dict[LabelValues, float] = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for labels, value in list(shard.items()):
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+            for labels, value in sorted(self.collect().items())
+        ]
+
+
+class Gauge(_Metric):
+    """Last value set (any thread), or the value of a callback read at scrape time"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 function: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._function = function
+
+    def set(self, value: float, labels: LabelValues = ()) -> None:
+        if registry.enabled:
+            self._values[labels] = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._function = function
+
+    def samples(self) -> List[str]:
+        values = dict(self._values)
+        if self._function is not None:
+            values[()] = self._function()
+        return [
+            f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+            for labels, value in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    """
+    Fixed upper bounds. Each shard entry is [count per bucket..., overflow, sum];
+    the cumulative _bucket series are built at scrape time.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        if not registry.enabled:
+            return
+        shard = self._shard()
+        counts = shard.get(labels)
+        if counts is None:
+            counts = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    @contextmanager
+    def time(self, labels: LabelValues = ()) -> Iterator[None]:
+        """Observe the duration of the with block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, labels)
+
+    def collect(self) -> Dict[LabelValues, List[float]]:
+        totals: Dict[LabelValues, List[float]] = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for labels, counts in list(shard.items()):
+                total = totals.setdefault(labels, [0] * len(counts))
+                for index, value in enumerate(list(counts)):
+                    total[index] += value
+        return totals
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, counts in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts[:-1]):
+                cumulative += count
+                le = 'le="' + _format_value(float(bound)) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {_format_value(counts[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+# HTTP
+http_request_duration = Histogram(
+    "jisp_http_request_duration_seconds", "Request latency by route template",
+    ["method", "route", "status"]
+)
+http_request_queries = Histogram(
+    "jisp_http_request_db_queries", "Database queries executed per request",
+    ["route"], buckets=QUERY_COUNT_BUCKETS
+)
+http_request_db_time = Histogram(
+    "jisp_http_request_db_seconds", "Time spent executing database queries per request", ["route"]
+)
+
+# Database
+db_query_duration = Histogram("jisp_db_query_duration_seconds", "Duration of each database query")
+
+# ML
+model_load_duration = Histogram(
+    "jisp_model_load_seconds",
+    "Loading the latest model: newest version lookup, then unpickling and flattening or mapping (when it changed)",
+    ["step"]
+)
+prediction_fallbacks = Counter(
+    "jisp_prediction_fallbacks_total", "Crime levels computed with the severity heuristic instead of the model", ["reason"]
+)
+ml_stage_duration = Histogram(
+    "jisp_ml_stage_seconds", "Featurize, predict and allocate stage timings", ["stage"]
+)
+retrain_duration = Histogram(
+    "jisp_retrain_duration_seconds", "Active learning retrain duration", ["outcome"], buckets=RETRAIN_BUCKETS
+)
+training_set_rows = Gauge("jisp_training_set_rows", "Rows in the last training set")
+
+# WebSocket
+websocket_connections = Gauge("jisp_websocket_connections", "Open WebSocket connections")
+websocket_broadcast_duration = Histogram(
+    "jisp_websocket_broadcast_seconds", "Time to fan a message out to every recipient", ["scope"]
+)
+websocket_broadcast_recipients = Histogram(
+    "jisp_websocket_broadcast_recipients", "Recipients per broadcast", ["scope"], buckets=RECIPIENT_BUCKETS
+)
+websocket_send_errors = Counter("jisp_websocket_send_errors_total", "Broadcast sends that failed", ["scope"])
+
+
+# Per-request database totals: [queries, seconds], set by MetricsMiddleware.
+# Threadpool endpoints run in a copy of the request's context, so they add to the same list.
+_request_db: ContextVar[Optional[list]] = ContextVar("request_db", default=None)
+
+
+def record_query(seconds: float) -> None:
+    """Called by the engine listeners in app.db.session for every statement"""
+    if not registry.enabled:
+        return
+    db_query_duration.observe(seconds)
+    totals = _request_db.get()
+    if totals is not None:
+        totals[0] += 1
+        totals[1] += seconds
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware (no BaseHTTPMiddleware task overhead) recording each
+    HTTP request's latency under its route template, e.g. /api/v1/parishes/{parish_id}
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        totals = [0, 0.0]
+        token = _request_db.set(totals)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_db.reset(token)
+            # FastAPI puts the matched route in the scope
+            route = getattr(scope.get("route"), "path", "unmatched")
+            http_request_duration.observe(elapsed, (scope["method"], route, str(status[0])))
+            http_request_queries.observe(totals[0], (route,))
+            http_request_db_time.observe(totals[1], (route,))
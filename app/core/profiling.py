@@ -0,0 +1,280 @@
+# app/core/profiling.py
+"""
+On-demand profiling of a live worker, enabled by setting PROFILING_TOKEN.
+With the token unset the middleware and the /profiling endpoints are not
+installed at all, so nothing here runs.
+
+- Per request: add ?__profile=1 (or =top) and an X-Profile-Token header and
+  the response is replaced by the stacks sampled while the request ran, in
+  collapsed format (flamegraph.pl, speedscope) or as a table of the hottest
+  functions. Sync endpoints run on threadpool threads that cProfile, which
+  only sees the thread it was enabled on, would miss, so every busy thread is
+  sampled; on a loaded worker, concurrent requests show up too.
+- Background: a StackSampler on the active-learning thread (or any thread
+  name prefix), started and read through the endpoints.
+- Memory: tracemalloc snapshots and diffs between them.
+"""
+import hmac
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from app.core.config import settings
+
+# Innermost frames of threads waiting for work (pool workers, the event loop, the retrain loop sleeping)
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("active_learning.py", "monitor_loop"),
+    ("warmup.py", "run"),
+}
+
+PROFILE_HEADER = "x-profile-token"
+ACTIVE_LEARNING_THREAD = "active-learning"
+
+
+def token_matches(token: Optional[str]) -> bool:
+    return bool(settings.PROFILING_TOKEN) and hmac.compare_digest(token or "", settings.PROFILING_TOKEN)
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Samples the Python stacks of the threads whose name passes thread_filter
+    every interval seconds from a background thread. Counts are keyed by the
+    code objects on the stack; labels are only built when rendering.
+    """
+    def __init__(self, interval: float, thread_filter: Callable[[str], bool] = lambda name: True):
+        self.interval = interval
+        self.thread_filter = thread_filter
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "StackSampler":
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="stack-sampler")
+        self._thread.start()
+        return self
+
+    def stop(self) -> "StackSampler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def reset(self) -> None:
+        self.samples = Counter()
+        self.sample_count = 0
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                name = names.get(ident, str(ident))
+                if ident == own or name.startswith("stack-sampler") or not self.thread_filter(name):
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                self.samples[(name, tuple(reversed(stack)))] += 1
+            self.sample_count += 1
+
+    def collapsed(self) -> str:
+        """One 'thread;outer;...;inner count' line per distinct stack"""
+        lines = Counter()
+        for (name, stack), count in list(self.samples.items()):
+            lines[";".join([name.split(" (")[0]] + [_frame_label(code) for code in stack])] += count
+        return "\n".join(f"{stack} {count}" for stack, count in lines.most_common()) + "\n"
+
+    def top(self, limit: int = 40) -> str:
+        """Functions by samples spent in them (self) and under them (total)"""
+        own_samples, total_samples = Counter(), Counter()
+        for (_, stack), count in list(self.samples.items()):
+            if not stack:
+                continue
+            own_samples[stack[-1]] += count
+            for code in set(stack):
+                total_samples[code] += count
+        total = sum(own_samples.values()) or 1
+        lines = [f"{total} samples every {1000 * self.interval:g} ms", f"{'self %':>8}{'total %':>9}  function"]
+        for code, count in total_samples.most_common(limit):
+            lines.append(f"{100 * own_samples[code] / total:8.1f}{100 * count / total:9.1f}  {_frame_label(code)}")
+        return "\n".join(lines) + "\n"
+
+
+def _not_background_thread(name: str) -> bool:
+    return not name.startswith(ACTIVE_LEARNING_THREAD)
+
+
+class RequestProfilerMiddleware:
+    """
+    Profiles requests carrying ?__profile=1|collapsed|top and a valid
+    X-Profile-Token; the app's response body is discarded and its status is
+    returned in X-Profile-Status
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or b"__profile" not in scope.get("query_string", b""):
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode().lower(): value.decode() for key, value in scope.get("headers", [])}
+        output = parse_qs(scope["query_string"].decode()).get("__profile", ["1"])[0]
+        if not token_matches(headers.get(PROFILE_HEADER)):
+            await self._respond(send, 403, "Profiling needs a valid X-Profile-Token header\n", {})
+            return
+
+        status = [500]
+
+        async def discard_response(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+
+        sampler = StackSampler(settings.PROFILING_REQUEST_INTERVAL_MS / 1000, _not_background_thread).start()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, discard_response)
+        finally:
+            elapsed = time.perf_counter() - start
+            sampler.stop()
+
+        body = sampler.top() if output == "top" else sampler.collapsed()
+        await self._respond(send, 200, body, {
+            "x-profile-status": str(status[0]),
+            "x-profile-seconds": f"{elapsed:.4f}",
+            "x-profile-samples": str(sampler.sample_count),
+        })
+
+    @staticmethod
+    async def _respond(send, status: int, body: str, headers: Dict[str, str]) -> None:
+        content = body.encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(content)).encode()),
+                *[(key.encode(), value.encode()) for key, value in headers.items()],
+            ],
+        })
+        await send({"type": "http.response.body", "body": content})
+
+
+class BackgroundSampler:
+    """The one long-running StackSampler of the process (default: the active-learning thread)"""
+    def __init__(self):
+        self.sampler: Optional[StackSampler] = None
+        self.thread_prefix = ACTIVE_LEARNING_THREAD
+        self.started_at: Optional[float] = None
+
+    def start(self, interval: float, thread_prefix: str = ACTIVE_LEARNING_THREAD) -> None:
+        self.stop()
+        self.thread_prefix = thread_prefix
+        self.sampler = StackSampler(interval, lambda name: name.startswith(thread_prefix)).start()
+        self.started_at = time.time()
+
+    def stop(self) -> None:
+        if self.sampler is not None and self.sampler.running:
+            self.sampler.stop()
+
+    def status(self) -> Dict[str, object]:
+        sampler = self.sampler
+        return {
+            "running": bool(sampler and sampler.running),
+            "thread_prefix": self.thread_prefix,
+            "interval_ms": 1000 * sampler.interval if sampler else None,
+            "samples": sampler.sample_count if sampler else 0,
+            "stacks": len(sampler.samples) if sampler else 0,
+            "started_at": self.started_at,
+        }
+
+
+background_sampler = BackgroundSampler()
+
+
+class MemoryTracker:
+    """tracemalloc snapshots kept in memory (the last max_snapshots) and diffs between them"""
+    def __init__(self, max_snapshots: int = 5):
+        self.max_snapshots = max_snapshots
+        self.snapshots: List[Tuple[int, float, tracemalloc.Snapshot]] = []
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def snapshot(self, frames: int) -> int:
+        """Start tracing if needed (allocations before that are not seen) and take a snapshot"""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            ])
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self.snapshots = (self.snapshots + [(snapshot_id, time.time(), snapshot)])[-self.max_snapshots:]
+            return snapshot_id
+
+    def _get(self, snapshot_id: int) -> tracemalloc.Snapshot:
+        for existing_id, _, snapshot in self.snapshots:
+            if existing_id == snapshot_id:
+                return snapshot
+        raise KeyError(snapshot_id)
+
+    def top(self, snapshot_id: int, limit: int = 25) -> List[Dict[str, object]]:
+        return [
+            {"location": str(stat.traceback[0]), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+            for stat in self._get(snapshot_id).statistics("lineno")[:limit]
+        ]
+
+    def diff(self, from_id: int, to_id: int, limit: int = 25) -> List[Dict[str, object]]:
+        """Allocation sites with the largest growth from one snapshot to another"""
+        stats = self._get(to_id).compare_to(self._get(from_id), "lineno")
+        return [
+            {
+                "location": str(stat.traceback[0]),
+                "size_diff_kb": round(stat.size_diff / 1024, 1),
+                "size_kb": round(stat.size / 1024, 1),
+                "count_diff": stat.count_diff,
+            }
+            for stat in stats[:limit]
+        ]
+
+    def status(self) -> Dict[str, object]:
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "traced_mb": round(current / 1e6, 2),
+            "peak_mb": round(peak / 1e6, 2),
+            "snapshots": [{"id": snapshot_id, "taken_at": taken_at} for snapshot_id, taken_at, _ in self.snapshots],
+        }
+
+    def stop(self) -> None:
+        with self._lock:
+            self.snapshots = []
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+
+memory_tracker = MemoryTracker()
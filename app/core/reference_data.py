@@ -0,0 +1,118 @@
+# app/core/reference_data.py
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.models import Parish
+from app.schemas.intelligence import IntelligenceType
+
+# Known characteristics of each parish, shared by feature engineering and allocation.
+# In a real system these would come from census/tourism data.
+# Population density proxy (higher values for urban parishes)
+PARISH_DENSITY: Mapping[int, float] = MappingProxyType({
+    1: 0.9,  # Kingston (urban)
+    2: 0.85, # St. Andrew (urban)
+    3: 0.7,  # St. Catherine (mixed)
+    4: 0.5,  # Clarendon (mixed)
+    5: 0.4,  # Manchester (rural)
+    6: 0.3,  # St. Elizabeth (rural)
+    7: 0.4,  # Westmoreland (rural)
+    8: 0.3,  # Hanover (rural)
+    9: 0.6,  # St. James (urban/tourist)
+    10: 0.4, # Trelawny (rural)
+    11: 0.5, # St. Ann (tourist)
+    12: 0.4, # St. Mary (rural)
+    13: 0.3, # Portland (rural)
+    14: 0.4  # St. Thomas (rural)
+})
+
+# Tourism level proxy
+PARISH_TOURISM: Mapping[int, float] = MappingProxyType({
+    1: 0.5,  # Kingston (moderate)
+    2: 0.4,  # St. Andrew (moderate)
+    3: 0.2,  # St. Catherine (low)
+    4: 0.1,  # Clarendon (low)
+    5: 0.2,  # Manchester (low)
+    6: 0.2,  # St. Elizabeth (low)
+    7: 0.5,  # Westmoreland (high - Negril)
+    8: 0.3,  # Hanover (moderate)
+    9: 0.8,  # St. James (very high - Montego Bay)
+    10: 0.3, # Trelawny (moderate)
+    11: 0.7, # St. Ann (high - Ocho Rios)
+    12: 0.3, # St. Mary (moderate)
+    13: 0.4, # Portland (moderate)
+    14: 0.2  # St. Thomas (low)
+})
+
+# Used for parishes without a known profile
+DEFAULT_DENSITY = 0.5
+DEFAULT_TOURISM = 0.3
+
+# Parish columns captured in the snapshot; updating any of them requires a refresh
+REFERENCE_FIELDS = frozenset({"name", "coordinates"})
+
+INTELLIGENCE_TYPES = frozenset(intel_type.value for intel_type in IntelligenceType)
+
+
+def _frozen(array: np.ndarray) -> np.ndarray:
+    array.setflags(write=False)
+    return array
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    """Immutable snapshot of the parish table plus the static parish profiles"""
+    parish_ids: np.ndarray     # sorted parish ids
+    coordinates: np.ndarray    # (n, 2) lat/lng, aligned with parish_ids
+    density: np.ndarray        # aligned with parish_ids
+    tourism: np.ndarray        # aligned with parish_ids
+    names: Mapping[int, str]
+    parish_id_set: frozenset
+
+    def has_parish(self, parish_id: int) -> bool:
+        return parish_id in self.parish_id_set
+
+
+_reference_data: Optional[ReferenceData] = None
+
+
+def load_reference_data(db: Session) -> ReferenceData:
+    """Build a snapshot from the parish table (one query)"""
+    rows = db.query(Parish.id, Parish.name, Parish.coordinates).order_by(Parish.id).all()
+
+    parish_ids = np.array([row.id for row in rows], dtype=np.int64)
+    coordinates = np.array(
+        [[(row.coordinates or {}).get("lat", np.nan), (row.coordinates or {}).get("lng", np.nan)] for row in rows],
+        dtype=np.float64
+    ).reshape(len(rows), 2)
+
+    return ReferenceData(
+        parish_ids=_frozen(parish_ids),
+        coordinates=_frozen(coordinates),
+        density=_frozen(np.array([PARISH_DENSITY.get(pid, DEFAULT_DENSITY) for pid in parish_ids.tolist()])),
+        tourism=_frozen(np.array([PARISH_TOURISM.get(pid, DEFAULT_TOURISM) for pid in parish_ids.tolist()])),
+        names=MappingProxyType({row.id: row.name for row in rows}),
+        parish_id_set=frozenset(parish_ids.tolist())
+    )
+
+
+def refresh_reference_data(db: Session) -> ReferenceData:
+    """Reload the snapshot; call after parishes are added or edited"""
+    global _reference_data
+    _reference_data = load_reference_data(db)
+    return _reference_data
+
+
+def get_reference_data(db: Session) -> ReferenceData:
+    """The current snapshot, loaded on first use"""
+    if _reference_data is None:
+        return refresh_reference_data(db)
+    return _reference_data
+
+
+def parish_exists(db: Session, parish_id: Optional[int]) -> bool:
+    """Set lookup against the snapshot instead of a query per check"""
+    return parish_id is not None and get_reference_data(db).has_parish(parish_id)
@@ -0,0 +1,160 @@
+# app/core/sql_profiler.py
+"""
+Per-request SQL profiling (DEBUG) and query-count assertions for tests.
+
+The engine listeners in app.db.session pass every executed statement to
+record_statement, which appends it to the active QueryProfile, if any. A
+profile is active for the current request (SQLProfilerMiddleware), inside
+profile_queries(), or, for assert_max_queries(all_threads=True), for every
+thread, so requests served by a TestClient in its own thread are counted too.
+
+Statements are grouped by shape (whitespace collapsed, literals and IN lists
+replaced by ?); a shape executed N_PLUS_ONE_THRESHOLD times or more in one
+profile is reported as a likely N+1 loop.
+"""
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_PLACEHOLDER = re.compile(r"\?|%\(\w+\)s|%s|\$\d+|:\w+")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def statement_shape(statement: str) -> str:
+    """A statement with its literals and parameter lists normalized, for grouping"""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _STRING_LITERAL.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER.sub("?", shape)
+    return _PLACEHOLDER_LIST.sub("(?)", shape)
+
+
+class QueryProfile:
+    """Statements executed while the profile was active, with their durations"""
+    def __init__(self):
+        self.statements: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float) -> None:
+        with self._lock:
+            self.statements.append((statement, seconds))
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(seconds for _, seconds in self.statements)
+
+    def shapes(self) -> Dict[str, Tuple[int, float]]:
+        """(executions, total seconds) per statement shape, most executed first"""
+        shapes: Dict[str, Tuple[int, float]] = {}
+        for statement, seconds in list(self.statements):
+            shape = statement_shape(statement)
+            count, total = shapes.get(shape, (0, 0.0))
+            shapes[shape] = (count + 1, total + seconds)
+        return dict(sorted(shapes.items(), key=lambda item: -item[1][0]))
+
+    def repeated(self, threshold: Optional[int] = None) -> Dict[str, Tuple[int, float]]:
+        """Shapes executed at least threshold times: likely N+1 query loops"""
+        threshold = threshold or settings.SQL_N_PLUS_ONE_THRESHOLD
+        return {shape: stats for shape, stats in self.shapes().items() if stats[0] >= threshold}
+
+    def summary(self, limit: int = 10) -> str:
+        lines = [f"{self.count} queries in {1000 * self.total_seconds:.1f} ms"]
+        for shape, (count, seconds) in list(self.shapes().items())[:limit]:
+            lines.append(f"  {count:4d}x {1000 * seconds:8.1f} ms  {shape[:200]}")
+        return "\n".join(lines)
+
+
+_current_profile: ContextVar[Optional[QueryProfile]] = ContextVar("sql_profile", default=None)
+_all_thread_profiles: List[QueryProfile] = []
+
+
+def record_statement(statement: str, seconds: float) -> None:
+    """Called by the engine listeners for every executed statement"""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.record(statement, seconds)
+    for profile in _all_thread_profiles:
+        profile.record(statement, seconds)
+
+
+@contextmanager
+def profile_queries(all_threads: bool = False) -> Iterator[QueryProfile]:
+    """
+    Record the statements executed inside the block: in this context (and
+    threadpool work started from it) by default, or in any thread
+    """
+    profile = QueryProfile()
+    if all_threads:
+        _all_thread_profiles.append(profile)
+        try:
+            yield profile
+        finally:
+            _all_thread_profiles.remove(profile)
+    else:
+        token = _current_profile.set(profile)
+        try:
+            yield profile
+        finally:
+            _current_profile.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int, all_threads: bool = True) -> Iterator[QueryProfile]:
+    """Fail with the executed statements if the block runs more than limit queries"""
+    with profile_queries(all_threads) as profile:
+        yield profile
+    if profile.count > limit:
+        raise AssertionError(f"Expected at most {limit} queries, got {profile.summary()}")
+
+
+class SQLProfilerMiddleware:
+    """
+    Profiles every HTTP request (DEBUG only): adds X-DB-Queries and X-DB-Time
+    (milliseconds) response headers, plus X-DB-Repeated-Queries and a printed
+    report when a statement shape repeats often enough to look like N+1
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = _current_profile.set(profile)
+        start = time.perf_counter()
+
+        async def send_with_summary(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(profile.count).encode()))
+                headers.append((b"x-db-time", f"{1000 * profile.total_seconds:.2f}".encode()))
+                repeated = profile.repeated()
+                if repeated:
+                    headers.append((b"x-db-repeated-queries", str(sum(count for count, _ in repeated.values())).encode()))
+                    print(
+                        f"Possible N+1 queries in {scope['method']} {scope['path']} "
+                        f"({1000 * (time.perf_counter() - start):.0f} ms):\n" + "\n".join(
+                            f"  {count}x {shape[:200]}" for shape, (count, _) in repeated.items()
+                        )
+                    )
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_summary)
+        finally:
+            _current_profile.reset(token)
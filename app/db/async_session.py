@@ -0,0 +1,77 @@
+# app/db/async_session.py
+"""
+Opt-in async database access (ASYNC_DB_ENABLED). Needs asyncpg for PostgreSQL
+or aiosqlite for SQLite; the engine is only created when first used.
+"""
+from typing import Any, AsyncIterator, Dict, Optional
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.db.session import engine_options
+
+# Async driver for each sync backend
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+
+def async_database_url(database_url: str) -> str:
+    """ASYNC_DATABASE_URL, or DATABASE_URL switched to its async driver"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+
+    url = make_url(database_url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for '{url.get_backend_name()}'")
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def async_engine_options(database_url: str) -> Dict[str, Any]:
+    """Same pool settings as the sync engine (the async engine brings its own pool class)"""
+    options = {
+        key: value for key, value in engine_options(database_url).items()
+        if key not in ("poolclass", "connect_args")
+    }
+    if make_url(database_url).get_backend_name() == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        # asyncpg takes server settings rather than libpq options
+        options["connect_args"] = {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+    return options
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        url = async_database_url(settings.DATABASE_URL)
+        _async_engine = create_async_engine(url, **async_engine_options(url))
+        # Objects stay usable after commit without an implicit (blocking) refresh
+        _async_session_factory = async_sessionmaker(_async_engine, expire_on_commit=False, autoflush=False)
+    return _async_engine
+
+
+def get_async_pool_status() -> Optional[Dict[str, Any]]:
+    """Pool status of the async engine, or None if it has not been created"""
+    if _async_engine is None:
+        return None
+    return {"pool_class": type(_async_engine.pool).__name__, "status": _async_engine.pool.status()}
+
+
+# Dependency to get an async DB session
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    get_async_engine()
+    async with _async_session_factory() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
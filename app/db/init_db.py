@@ -1,13 +1,17 @@
 # app/db/init_db.py
 from sqlalchemy.orm import Session
 
-from app.db.session import Base, engine
+from app.db.schema import create_schema
+from app.db.session import engine
 from app.models.models import Parish, SystemSettings  # Added SystemSettings import
 
 def init_db(db: Session) -> None:
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
-    
+    """Create missing tables (scripts and benchmarks; the API only checks the revision) and seed"""
+    create_schema(engine)
+    seed_reference_data(db)
+
+def seed_reference_data(db: Session) -> None:
+    """Insert the parishes and default system settings if they are missing"""
     # Check if parishes already exist
     if db.query(Parish).count() == 0:
         # Add the 14 parishes of Jamaica with approximate coordinates
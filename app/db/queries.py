@@ -0,0 +1,100 @@
+# app/db/queries.py
+"""
+Statement builders shared by the sync (Session) and async (AsyncSession) code paths.
+Each function only builds a select(); callers execute it with their own session.
+"""
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import Select, case, func, select
+
+from app.models.models import Intelligence, Parish
+
+
+def supports_filter_clause(dialect) -> bool:
+    """Whether the database accepts aggregate FILTER (WHERE ...) clauses"""
+    if dialect.name == "postgresql":
+        return True
+    if dialect.name == "sqlite":
+        return dialect.dbapi.sqlite_version_info >= (3, 30, 0)
+    return False
+
+
+def count_where(condition, use_filter: bool):
+    """COUNT(*) FILTER (WHERE condition), or the portable SUM(CASE ...) equivalent"""
+    if use_filter:
+        return func.count(Intelligence.id).filter(condition)
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+# Intelligence
+
+def intelligence_list(
+    skip: int = 0,
+    limit: int = 100,
+    parish_id: Optional[int] = None,
+    intelligence_type: Optional[str] = None
+) -> Select:
+    """Newest intelligence first, optionally filtered by parish and type"""
+    stmt = select(Intelligence)
+    if parish_id:
+        stmt = stmt.where(Intelligence.parish_id == parish_id)
+    if intelligence_type:
+        stmt = stmt.where(Intelligence.type == intelligence_type)
+    return stmt.order_by(Intelligence.timestamp.desc()).offset(skip).limit(limit)
+
+
+def intelligence_by_id(intelligence_id: int) -> Select:
+    return select(Intelligence).where(Intelligence.id == intelligence_id)
+
+
+def recent_parish_intelligence(parish_id: int, since: datetime, limit: int = 10) -> Select:
+    return select(Intelligence).where(
+        Intelligence.parish_id == parish_id,
+        Intelligence.timestamp > since
+    ).order_by(Intelligence.timestamp.desc()).limit(limit)
+
+
+def intelligence_trends(parish_id: int, since: datetime, intel_types: List[str], use_filter: bool) -> Select:
+    """
+    One scan of a parish's rows: total, average severity, verified count,
+    count since `since`, then one count per intelligence type
+    """
+    return select(
+        func.count(Intelligence.id),
+        func.avg(Intelligence.severity),
+        count_where(Intelligence.is_verified == True, use_filter),
+        count_where(Intelligence.timestamp > since, use_filter),
+        *[count_where(Intelligence.type == intel_type, use_filter) for intel_type in intel_types]
+    ).where(Intelligence.parish_id == parish_id)
+
+
+# Parishes
+
+def parish_list(skip: int = 0, limit: int = 100) -> Select:
+    return select(Parish).offset(skip).limit(limit)
+
+
+def parish_by_id(parish_id: int) -> Select:
+    return select(Parish).where(Parish.id == parish_id)
+
+
+def parish_status(parish_id: int) -> Select:
+    """The parish columns that change between allocations"""
+    return select(Parish.current_crime_level, Parish.police_allocated).where(Parish.id == parish_id)
+
+
+def parishes_with_stats() -> Select:
+    """Every parish with its intelligence count and average severity, in one grouped statement"""
+    return select(
+        Parish.id,
+        Parish.name,
+        Parish.coordinates,
+        Parish.current_crime_level,
+        Parish.police_allocated,
+        Parish.recommended_allocation,
+        func.count(Intelligence.id),
+        func.avg(Intelligence.severity)
+    ).outerjoin(
+        Intelligence, Intelligence.parish_id == Parish.id
+    ).group_by(Parish.id).order_by(Parish.id)
@@ -0,0 +1,172 @@
+# app/db/replicas.py
+"""
+Routing of heavy read-only work (stats, insights, history, training scans) to
+read replicas listed in DATABASE_READ_URLS. Writes and read-your-writes paths
+keep using app.db.session. A replica whose lag exceeds READ_REPLICA_MAX_LAG_SECONDS
+is skipped; with no usable replica, reads fall back to the primary.
+"""
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.db.session import SessionLocal, engine as primary_engine, engine_options
+from app.models.models import Intelligence
+
+# Seconds since the last replayed transaction, or 0 when the replica has replayed
+# everything it received (an idle primary must not look like lag)
+POSTGRES_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+def parse_read_urls(value: str) -> List[str]:
+    return [url.strip() for url in value.split(",") if url.strip()]
+
+
+class ReadReplicaRouter:
+    """Round-robin over the replicas that are within the lag limit"""
+    def __init__(
+        self,
+        urls: List[str],
+        max_lag_seconds: Optional[float] = None,
+        check_interval_seconds: Optional[float] = None,
+        primary: Engine = primary_engine
+    ):
+        self.urls = urls
+        self.max_lag_seconds = settings.READ_REPLICA_MAX_LAG_SECONDS if max_lag_seconds is None else max_lag_seconds
+        self.check_interval_seconds = (
+            settings.READ_REPLICA_LAG_CHECK_SECONDS if check_interval_seconds is None else check_interval_seconds
+        )
+        self.primary = primary
+        # Plain pools: the instrumented pool reports on the primary only
+        self.engines = [
+            create_engine(url, **{key: value for key, value in engine_options(url).items() if key != "poolclass"})
+            for url in urls
+        ]
+        self.session_factories = [
+            sessionmaker(autocommit=False, autoflush=False, bind=replica) for replica in self.engines
+        ]
+
+        self._next = itertools.count()
+        self._lag: List[Optional[float]] = [None] * len(urls)
+        self._checked_at: List[float] = [0.0] * len(urls)
+        self._served: List[int] = [0] * len(urls)
+        self._primary_fallbacks = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.engines)
+
+    def measure_lag(self, index: int) -> float:
+        """Replication lag of one replica in seconds (infinite if it cannot be reached)"""
+        replica = self.engines[index]
+        try:
+            if replica.dialect.name == "postgresql":
+                with replica.connect() as conn:
+                    return float(conn.execute(POSTGRES_LAG_QUERY).scalar() or 0.0)
+
+            # Other backends (e.g. SQLite stand-ins): compare the newest report on each side
+            latest = select(func.max(Intelligence.timestamp))
+            with self.primary.connect() as conn:
+                primary_latest = conn.execute(latest).scalar()
+            with replica.connect() as conn:
+                replica_latest = conn.execute(latest).scalar()
+        except Exception as e:
+            print(f"Warning: Could not check read replica {index}: {str(e)}")
+            return float("inf")
+
+        if primary_latest is None:
+            return 0.0
+        if replica_latest is None:
+            return float("inf")
+        return max(0.0, (primary_latest - replica_latest).total_seconds())
+
+    def lag(self, index: int) -> float:
+        """Last measured lag, re-measured every READ_REPLICA_LAG_CHECK_SECONDS"""
+        now = time.monotonic()
+        lag = self._lag[index]
+        if lag is None or now - self._checked_at[index] > self.check_interval_seconds:
+            lag = self.measure_lag(index)
+            with self._lock:
+                self._lag[index] = lag
+                self._checked_at[index] = now
+        return lag
+
+    def choose(self) -> Optional[int]:
+        """Index of the next usable replica, or None to read from the primary"""
+        if not self.enabled:
+            return None
+
+        start = next(self._next)
+        for offset in range(len(self.engines)):
+            index = (start + offset) % len(self.engines)
+            if self.lag(index) <= self.max_lag_seconds:
+                with self._lock:
+                    self._served[index] += 1
+                return index
+
+        with self._lock:
+            self._primary_fallbacks += 1
+        return None
+
+    def session(self) -> Session:
+        """Session on a usable replica, or on the primary"""
+        index = self.choose()
+        if index is None:
+            return SessionLocal()
+        return self.session_factories[index]()
+
+    def mark_stale(self) -> None:
+        """Force a lag check on next use"""
+        with self._lock:
+            self._lag = [None] * len(self.engines)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "max_lag_seconds": self.max_lag_seconds,
+                "primary_fallbacks": self._primary_fallbacks,
+                "replicas": [
+                    {
+                        "url": replica.url.render_as_string(hide_password=True),
+                        # None until checked, or when the replica could not be reached
+                        "lag_seconds": self._lag[index] if self._lag[index] != float("inf") else None,
+                        "usable": self._lag[index] is not None and self._lag[index] <= self.max_lag_seconds,
+                        "served": self._served[index],
+                    }
+                    for index, replica in enumerate(self.engines)
+                ],
+            }
+
+
+read_replicas = ReadReplicaRouter(parse_read_urls(settings.DATABASE_READ_URLS))
+
+
+# Dependency to get a read-only DB session (replica when one is usable)
+def get_read_db():
+    db = read_replicas.session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@contextmanager
+def read_session_scope() -> Iterator[Session]:
+    """Read-only session outside a request, e.g. for training scans"""
+    db = read_replicas.session()
+    try:
+        yield db
+    finally:
+        db.close()
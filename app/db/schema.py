@@ -0,0 +1,88 @@
+# app/db/schema.py
+"""
+Schema versioning with Alembic (alembic/versions, `alembic upgrade head`).
+
+The API checks the database's revision against the newest revision file on
+startup instead of running create_all. The check reads the revision ids from
+the files and alembic_version with one query; importing Alembic itself costs
+about 0.3 s, so it is only imported to stamp freshly created databases.
+"""
+import ast
+import os
+import re
+from typing import Set
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from app.models.models import Base
+
+ALEMBIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic")
+VERSIONS_DIR = os.path.join(ALEMBIC_DIR, "versions")
+
+_REVISION_LINE = re.compile(r"^(revision|down_revision)\b[^=]*=\s*(.+)$", re.MULTILINE)
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+def head_revisions() -> Set[str]:
+    """Revision ids that no other revision builds on (normally one)"""
+    revisions, parents = set(), set()
+    for name in os.listdir(VERSIONS_DIR):
+        if not name.endswith(".py"):
+            continue
+        with open(os.path.join(VERSIONS_DIR, name)) as f:
+            for key, value in _REVISION_LINE.findall(f.read()):
+                value = ast.literal_eval(value.strip())
+                if key == "revision":
+                    revisions.add(value)
+                elif isinstance(value, str):
+                    parents.add(value)
+                elif value:
+                    parents.update(value)
+    return revisions - parents
+
+
+def current_revisions(bind: Engine) -> Set[str]:
+    with bind.connect() as conn:
+        if not inspect(conn).has_table("alembic_version"):
+            return set()
+        return set(conn.execute(text("SELECT version_num FROM alembic_version")).scalars())
+
+
+def check_schema_version(bind: Engine) -> str:
+    """Raise SchemaVersionError unless the database is at the head revision; returns it"""
+    expected, current = head_revisions(), current_revisions(bind)
+    if current == expected:
+        return ", ".join(sorted(current))
+
+    if not current:
+        if inspect(bind).has_table("intelligence"):
+            hint = ("its tables were created without migrations; if they match the baseline revision, "
+                    "run `alembic stamp 0001` and then `alembic upgrade head`")
+        else:
+            hint = "it has no tables; run `alembic upgrade head` and `python init_db.py`"
+        raise SchemaVersionError(f"Database has no schema revision: {hint}")
+    raise SchemaVersionError(
+        f"Database schema is at revision {', '.join(sorted(current))} but the code expects "
+        f"{', '.join(sorted(expected))}; run `alembic upgrade head`"
+    )
+
+
+def create_schema(bind: Engine) -> None:
+    """
+    create_all for scripts and benchmarks. A database that had none of the
+    tables is stamped with the head revision, which create_all matches;
+    existing databases only get missing tables and keep their revision.
+    """
+    fresh = not set(inspect(bind).get_table_names()) & set(Base.metadata.tables)
+    Base.metadata.create_all(bind=bind)
+    if fresh:
+        # Optional dependency, only needed for stamping new databases
+        from alembic.runtime.migration import MigrationContext
+        from alembic.script import ScriptDirectory
+
+        with bind.begin() as conn:
+            MigrationContext.configure(conn).stamp(ScriptDirectory(ALEMBIC_DIR), "head")
@@ -1,17 +1,22 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 import json
 import uvicorn
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.sql_profiler import SQLProfilerMiddleware
 # Import all endpoint routers together
-from app.api.v1.endpoints import intelligence, parishes, insights
+from app.api.v1.endpoints import intelligence, parishes, insights, system
 from app.socket.manager import manager
 from app.socket.events import handle_subscribe, handle_intelligence_create
-from app.db.session import get_db
-from app.db.init_db import init_db
+from app.db.session import engine, session_scope
+from app.db.schema import check_schema_version
 from app.ml.active_learning import ActiveLearningSystem
+from app.ml.warmup import start_warmup, warmup_state
+from app.services.duplicates import recent_reports
 
 
 app = FastAPI(
@@ -29,14 +34,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and per-request query counts for /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Every statement of a request, summarised in X-DB-Queries / X-DB-Time headers
+if settings.DEBUG:
+    app.add_middleware(SQLProfilerMiddleware)
+
+# On-demand profiling, not installed at all without a token
+if settings.PROFILING_TOKEN:
+    from app.core.profiling import RequestProfilerMiddleware
+    app.add_middleware(RequestProfilerMiddleware)
+
+# With the async database layer enabled, the intelligence and parish endpoints
+# that have async versions are served by those instead
+intelligence_router = intelligence.router
+parishes_router = parishes.router
+if settings.ASYNC_DB_ENABLED:
+    from app.api.v1.endpoints import intelligence_async, parishes_async
+    from app.api.v1.routing import with_async_routes
+    intelligence_router = with_async_routes(intelligence.router, intelligence_async.router)
+    parishes_router = with_async_routes(parishes.router, parishes_async.router)
+
 # Include API routers
 app.include_router(
-    intelligence.router,
+    intelligence_router,
     prefix=f"{settings.API_V1_STR}/intelligence",
     tags=["intelligence"]
 )
 app.include_router(
-    parishes.router,
+    parishes_router,
     prefix=f"{settings.API_V1_STR}/parishes",
     tags=["parishes"]
 )
@@ -45,11 +72,33 @@ app.include_router(
     prefix=f"{settings.API_V1_STR}/insights",
     tags=["insights"]
 )
+app.include_router(
+    system.router,
+    prefix=f"{settings.API_V1_STR}/system",
+    tags=["system"]
+)
+if settings.PROFILING_TOKEN:
+    from app.api.v1.endpoints import profiling
+    app.include_router(
+        profiling.router,
+        prefix=f"{settings.API_V1_STR}/profiling",
+        tags=["profiling"]
+    )
 
 @app.get("/")
 async def root():
     return {"message": "Jamaica Police Intelligence System API"}
 
+@app.get("/ready", include_in_schema=False)
+async def ready():
+    """Readiness probe: 503 until the warm-up has loaded the model and run a prediction"""
+    return JSONResponse(warmup_state.as_dict(), status_code=200 if warmup_state.ready else 503)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await manager.connect(websocket)
@@ -57,9 +106,6 @@ async def websocket_endpoint(websocket: WebSocket):
         while True:
             data = await websocket.receive_text()
             
-            # Create a database session for this connection
-            db = next(get_db())
-            
             try:
                 message = json.loads(data)
                 action = message.get("action", "")
@@ -72,7 +118,9 @@ async def websocket_endpoint(websocket: WebSocket):
                 elif action == "create_intelligence":
                     intelligence_data = message.get("data")
                     if intelligence_data:
-                        await handle_intelligence_create(intelligence_data, db)
+                        # Session for this message only, returned to the pool when done
+                        with session_scope() as db:
+                            await handle_intelligence_create(intelligence_data, db)
                 
                 # Add more action handlers as needed
                 
@@ -91,11 +139,23 @@ active_learning = ActiveLearningSystem()
 
 @app.on_event("startup")
 async def startup_event():
-    # Create a database session
-    db = next(get_db())
+    # Refuse to start on a database that is not at the current migration
+    # (tables are created by `alembic upgrade head`, parishes by init_db.py)
+    revision = check_schema_version(engine)
+    print(f"Database schema at revision {revision}")
     
-    # Initialize the database
-    init_db(db)
+    with session_scope() as db:
+        # Load the last hour of submissions for duplicate detection
+        recent_reports.seed(db)
+    
+    # Reference data, model and a synthetic prediction; /ready reports when done
+    start_warmup(session_scope)
     
     # Start active learning monitoring
-    active_learning.start_monitoring(get_db)
\ No newline at end of file
+    active_learning.start_monitoring(session_scope)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if settings.ASYNC_DB_ENABLED:
+        from app.db.async_session import dispose_async_engine
+        await dispose_async_engine()
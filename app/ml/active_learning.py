@@ -4,9 +4,9 @@ from datetime import datetime, timedelta
 import threading
 import time
 
+from app.core.metrics import retrain_duration, training_set_rows
+from app.db.replicas import read_session_scope
 from app.models.models import Intelligence, ModelVersion
-from app.ml.models.crime_prediction import CrimePredictionModel
-from app.ml.models.resource_allocator import ResourceAllocator
 
 class ActiveLearningSystem:
     def __init__(self):
@@ -29,52 +29,80 @@ class ActiveLearningSystem:
     
     def train_model(self, db: Session) -> float:
         """Train model with latest data"""
-        # Get all intelligence data
-        intelligence_records = db.query(Intelligence).all()
-        
-        # Convert to list of dictionaries
-        data = [{
-            "type": record.type,
-            "parish_id": record.parish_id,
-            "severity": record.severity,
-            "confidence": record.confidence,
-            "is_verified": record.is_verified,
-            "feedback_score": record.feedback_score,
-            "timestamp": record.timestamp
-        } for record in intelligence_records]
-        
-        # Train the model
-        prediction_model = CrimePredictionModel()
-        accuracy = prediction_model.train(db, data)
+        start = time.perf_counter()
+        try:
+            accuracy = self._train_prediction_model(db)
+        except Exception:
+            retrain_duration.observe(time.perf_counter() - start, ("error",))
+            raise
+        retrain_duration.observe(time.perf_counter() - start, ("success",))
         
         # Update last training time
         self.last_training_time = datetime.now()
         
         # Update resource allocation
+        from app.ml.models.resource_allocator import ResourceAllocator
         allocator = ResourceAllocator()
         allocator.allocate_resources(db)
         
         return accuracy
     
-    def start_monitoring(self, db_func):
-        """Start a background thread to monitor for retraining opportunities"""
+    def _train_prediction_model(self, db: Session) -> float:
+        """Fit and save a new CrimePredictionModel on the latest features, returning its accuracy"""
+        # Imported on the first retrain, keeping pandas and scikit-learn out of the worker's startup
+        from app.ml.features.feature_store import feature_store
+        from app.ml.features.materialized import load_static_training_frame
+        from app.ml.models.crime_prediction import CrimePredictionModel
+        from app.ml.training.reservoir import training_reservoir
+
+        prediction_model = CrimePredictionModel(db)
+        
+        # The scans go to a read replica when one is configured
+        sample_weight = None
+        if training_reservoir.enabled:
+            # Recent reports plus a weighted sample of the older ones, updated with the rows added since the last retrain
+            with read_session_scope() as read_db:
+                static_features, sample_weight = training_reservoir.training_set(read_db)
+            snapshot = None
+        elif feature_store.enabled:
+            # Featurize only what changed since the last snapshot, memory-map the rest
+            with read_session_scope() as read_db:
+                snapshot = feature_store.snapshot(read_db)
+            static_features = feature_store.load(snapshot["id"])
+        else:
+            # Stream the static feature vectors stored at ingestion
+            with read_session_scope() as read_db:
+                static_features = load_static_training_frame(read_db)
+            snapshot = None
+        
+        training_set_rows.set(len(static_features))
+        accuracy = prediction_model.train_on_features(db, static_features, sample_weight=sample_weight)
+        if snapshot is not None:
+            feature_store.tag_model_version(snapshot["id"], prediction_model.model_version)
+        return accuracy
+    
+    def start_monitoring(self, session_scope):
+        """
+        Start a background thread to monitor for retraining opportunities.
+        session_scope is a context manager factory; each check gets its own session.
+        """
         def monitor_loop():
             while True:
+                # Sleep first so the checks stay off the startup path
+                time.sleep(60)  # Check every minute
+                
                 try:
-                    db = next(db_func())
-                    if self.should_retrain(db):
-                        print(f"Active learning system: Retraining model with new data...")
-                        accuracy = self.train_model(db)
-                        print(f"Model retrained with accuracy: {accuracy:.2f}")
-                    db.close()
+                    with session_scope() as db:
+                        if self.should_retrain(db):
+                            print(f"Active learning system: Retraining model with new data...")
+                            accuracy = self.train_model(db)
+                            print(f"Model retrained with accuracy: {accuracy:.2f}")
                 except Exception as e:
                     print(f"Error in active learning monitoring: {str(e)}")
-                
-                # Sleep for a while before checking again
-                time.sleep(60)  # Check every minute
         
         # Start monitoring in a background thread
-        thread = threading.Thread(target=monitor_loop, daemon=True)
+        # Named so the profiling sampler can pick this thread out
+        thread = threading.Thread(target=monitor_loop, daemon=True, name="active-learning")
         thread.start()
         
         return thread
\ No newline at end of file
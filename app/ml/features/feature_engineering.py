@@ -2,18 +2,41 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.reference_data import INTELLIGENCE_TYPES, PARISH_DENSITY, PARISH_TOURISM
+
+# Fixed one-hot vocabularies (categories missing from a batch still get a column)
+PARISH_IDS = sorted(PARISH_DENSITY)
+TYPE_VOCABULARY = sorted(INTELLIGENCE_TYPES)
 
 class FeatureEngineer:
     def __init__(self):
         # Feature importance tracking for active learning
         self.feature_importance = {}
+        # Reference time and normalization statistics of the last fit (see finalize_features)
+        self.feature_stats = None
 
-    def extract_features(self, df: pd.DataFrame) -> Tuple[np.ndarray, List[str]]:
+    def extract_features(
+        self,
+        df: pd.DataFrame,
+        reference_time: Optional[datetime] = None,
+        stats: Optional[Dict[str, Any]] = None
+    ) -> Tuple[np.ndarray, List[str]]:
         """
         Enhanced feature extraction with more sophisticated transformations
         Returns the feature matrix and feature names
         """
+        return self.finalize_features(self.add_static_features(df), reference_time, stats)
+    
+    def add_static_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Per-row features that do not depend on the rest of the batch (temporal,
+        spatial, type and interaction features). One-hot columns use fixed
+        vocabularies so every batch, and every feature store partition, has the
+        same columns. Text columns are dropped; the result can be stored and
+        later passed to finalize_features.
+        """
         # Make a copy to avoid modifying the original
         df_processed = df.copy()
         
@@ -32,29 +55,51 @@ class FeatureEngineer:
         # Add interaction features
         df_processed = self._add_interaction_features(df_processed)
         
+        # Drop non-numeric columns (the timestamp is kept for the recency features)
+        drop_columns = [
+            col for col in df_processed.columns
+            if df_processed[col].dtype == 'object' or df_processed[col].dtype.name == 'category'
+        ]
+        return df_processed.drop(columns=drop_columns + ['time_period', 'description'], errors='ignore')
+    
+    def finalize_features(
+        self,
+        df_processed: pd.DataFrame,
+        reference_time: Optional[datetime] = None,
+        stats: Optional[Dict[str, Any]] = None
+    ) -> Tuple[np.ndarray, List[str]]:
+        """
+        Time-relative features (recency, normalization) on top of
+        add_static_features output.
+        
+        Recency is measured from reference_time. Without stats (training) the
+        reference time defaults to the newest report, normalization statistics
+        are computed from the batch, and both are kept in self.feature_stats to
+        be stored with the model. With stats (inference) the stored statistics
+        are applied, so a report gets the same features whatever batch it is in.
+        Returns the feature matrix and feature names
+        """
+        if stats is not None and reference_time is None:
+            reference_time = stats.get("reference_time")
+        
         # Add recency features
         if 'timestamp' in df_processed.columns:
-            df_processed = self._add_recency_features(df_processed)
+            df_processed = self._add_recency_features(df_processed, reference_time)
         
         # Feature normalization
-        df_processed = self._normalize_features(df_processed)
-        
-        # Drop non-numeric columns
-        drop_columns = []
-        for col in df_processed.columns:
-            if df_processed[col].dtype == 'object' or df_processed[col].dtype.name == 'category' or col == 'timestamp':
-                drop_columns.append(col)
-        
-        # Also drop specific columns that might cause issues
-        specific_drops = ['time_period', 'description']
-        for col in specific_drops:
-            if col in df_processed.columns:
-                drop_columns.append(col)
-        
-        # Remove duplicates from drop_columns
-        drop_columns = list(set(drop_columns))
-            
-        df_final = df_processed.drop(columns=drop_columns, errors='ignore')
+        if stats is None:
+            df_processed, normalization = self._normalize_features(df_processed)
+            self.feature_stats = {
+                "reference_time": (
+                    self._reference_timestamp(df_processed['timestamp'], reference_time).isoformat()
+                    if 'timestamp' in df_processed.columns else None
+                ),
+                "normalization": normalization,
+            }
+        else:
+            df_processed = self._apply_normalization(df_processed, stats.get("normalization", {}))
+        
+        df_final = df_processed.drop(columns=['timestamp'], errors='ignore')
         
         # Convert boolean columns to int
         for col in df_final.columns:
@@ -138,60 +183,26 @@ class FeatureEngineer:
     def _add_spatial_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Add spatial features based on parish information"""
         # One-hot encode parishes
-        parish_dummies = pd.get_dummies(df['parish_id'], prefix='parish')
+        parish_dummies = pd.get_dummies(
+            pd.Series(pd.Categorical(df['parish_id'], categories=PARISH_IDS), index=df.index),
+            prefix='parish'
+        )
         df = pd.concat([df, parish_dummies], axis=1)
         
-        # Add parish-based features
-        # In a real system, you would incorporate known characteristics about parishes
-        # such as population density, urbanization level, etc.
-        # For this example, we'll create simple mappings
-        
-        # Population density proxy (higher values for urban parishes)
-        parish_density = {
-            1: 0.9,  # Kingston (urban)
-            2: 0.85, # St. Andrew (urban)
-            3: 0.7,  # St. Catherine (mixed)
-            4: 0.5,  # Clarendon (mixed)
-            5: 0.4,  # Manchester (rural)
-            6: 0.3,  # St. Elizabeth (rural)
-            7: 0.4,  # Westmoreland (rural)
-            8: 0.3,  # Hanover (rural)
-            9: 0.6,  # St. James (urban/tourist)
-            10: 0.4, # Trelawny (rural)
-            11: 0.5, # St. Ann (tourist)
-            12: 0.4, # St. Mary (rural)
-            13: 0.3, # Portland (rural)
-            14: 0.4  # St. Thomas (rural)
-        }
-        
-        # Tourism level proxy
-        parish_tourism = {
-            1: 0.5,  # Kingston (moderate)
-            2: 0.4,  # St. Andrew (moderate)
-            3: 0.2,  # St. Catherine (low)
-            4: 0.1,  # Clarendon (low)
-            5: 0.2,  # Manchester (low)
-            6: 0.2,  # St. Elizabeth (low)
-            7: 0.5,  # Westmoreland (high - Negril)
-            8: 0.3,  # Hanover (moderate)
-            9: 0.8,  # St. James (very high - Montego Bay)
-            10: 0.3, # Trelawny (moderate)
-            11: 0.7, # St. Ann (high - Ocho Rios)
-            12: 0.3, # St. Mary (moderate)
-            13: 0.4, # Portland (moderate)
-            14: 0.2  # St. Thomas (low)
-        }
-        
+        # Add parish-based features from the shared reference profiles
         # Apply these features
-        df['population_density'] = df['parish_id'].map(parish_density)
-        df['tourism_level'] = df['parish_id'].map(parish_tourism)
+        df['population_density'] = df['parish_id'].map(PARISH_DENSITY)
+        df['tourism_level'] = df['parish_id'].map(PARISH_TOURISM)
         
         return df
     
     def _add_type_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Add features based on intelligence type"""
         # One-hot encode intelligence types
-        type_dummies = pd.get_dummies(df['type'], prefix='type')
+        type_dummies = pd.get_dummies(
+            pd.Series(pd.Categorical(df['type'], categories=TYPE_VOCABULARY), index=df.index),
+            prefix='type'
+        )
         df = pd.concat([df, type_dummies], axis=1)
         
         # Add severity weighting by type
@@ -231,11 +242,22 @@ class FeatureEngineer:
         
         return df
     
-    def _add_recency_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _reference_timestamp(self, timestamps: pd.Series, reference_time: Optional[Any]) -> pd.Timestamp:
+        """reference_time (default: the newest report) in the timezone of the timestamps"""
+        if reference_time is None:
+            return timestamps.max()
+        
+        reference = pd.Timestamp(reference_time)
+        if timestamps.dt.tz is not None:
+            return reference.tz_localize(timestamps.dt.tz) if reference.tzinfo is None else reference.tz_convert(timestamps.dt.tz)
+        # Naive timestamps (SQLite) are stored in UTC
+        return reference.tz_convert('UTC').tz_localize(None) if reference.tzinfo is not None else reference
+    
+    def _add_recency_features(self, df: pd.DataFrame, reference_time: Optional[Any] = None) -> pd.DataFrame:
         """Add recency-based features"""
-        # Calculate days since the most recent intelligence
-        most_recent = df['timestamp'].max()
-        df['days_since'] = (most_recent - df['timestamp']).dt.total_seconds() / (24 * 3600)
+        # Calculate days since the reference time (reports after it count as current)
+        reference = self._reference_timestamp(df['timestamp'], reference_time)
+        df['days_since'] = ((reference - df['timestamp']).dt.total_seconds() / (24 * 3600)).clip(lower=0)
         
         # Apply recency decay factor
         df['recency_weight'] = np.exp(-0.1 * df['days_since'])
@@ -245,17 +267,30 @@ class FeatureEngineer:
         
         return df
     
-    def _normalize_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Normalize numerical features for better model performance"""
+    def _normalize_features(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, List[float]]]:
+        """
+        Normalize numerical features for better model performance
+        Returns the frame and the mean and standard deviation used per column
+        """
         # Select numeric columns only (excluding the target if present)
         numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
         if 'severity' in numeric_cols:
             numeric_cols.remove('severity')  # Don't normalize the target variable
         
         # Standard scaling (z-score normalization)
+        normalization = {}
         for col in numeric_cols:
-            if df[col].std() > 0:  # Avoid division by zero
-                df[f"{col}_norm"] = (df[col] - df[col].mean()) / df[col].std()
+            std = df[col].std()
+            if std > 0:  # Avoid division by zero
+                normalization[col] = [float(df[col].mean()), float(std)]
+        
+        return self._apply_normalization(df, normalization), normalization
+    
+    def _apply_normalization(self, df: pd.DataFrame, normalization: Dict[str, List[float]]) -> pd.DataFrame:
+        """Add the _norm columns using stored means and standard deviations"""
+        for col, (mean, std) in normalization.items():
+            if col in df.columns:
+                df[f"{col}_norm"] = (df[col] - mean) / std
         
         return df
     
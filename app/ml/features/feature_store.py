@@ -0,0 +1,271 @@
+# app/ml/features/feature_store.py
+"""
+Append-only local store of featurized intelligence (FeatureEngineer.add_static_features
+output) as Parquet files partitioned by month and parish:
+
+    FEATURE_STORE_PATH/manifest.json
+    FEATURE_STORE_PATH/month=2025-03/parish=1/part-00004-1a2b3c4d.parquet
+
+Every snapshot in the manifest lists the complete set of files it is made of.
+Files are never rewritten or deleted, so an earlier snapshot, and with it the
+training data of any ModelVersion tagged on it, can be loaded again.
+
+A new snapshot featurizes only the rows added since the previous one, plus
+whole partitions whose stored rows were edited or deleted (detected with
+per-partition checksums computed in SQL). Everything else is memory-mapped
+from the existing files. Requires the optional pyarrow package.
+"""
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import Integer, and_, case, cast, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.ml.features.feature_engineering import TYPE_VOCABULARY, FeatureEngineer
+from app.ml.training.data_loader import (
+    PARTITION_COLUMNS, feature_query, load_training_frame, read_intelligence_frame, usable_rows
+)
+from app.models.models import Intelligence
+
+MANIFEST_NAME = "manifest.json"
+
+# Above this share of changed partitions a snapshot is simply rebuilt from scratch
+REBUILD_FRACTION = 0.5
+
+
+def partition_key(year: int, month: int, parish_id: int) -> str:
+    return f"{year:04d}-{month:02d}/{parish_id}"
+
+
+def partition_checksums(db: Session, max_id: int, stored_max_id: int = 0) -> Tuple[Dict[str, List[int]], Dict[str, List[int]]]:
+    """
+    Row count and id-weighted sums of every mutable feature column per partition,
+    over the usable rows with id <= max_id and, from the same scan, over the rows
+    with id <= stored_max_id. A partition whose stored checksum no longer matches
+    the second set has had rows edited, moved or deleted.
+    """
+    type_code = case(
+        *[(Intelligence.type == value, index + 1) for index, value in enumerate(TYPE_VOCABULARY)],
+        else_=0
+    )
+    verified = case((Intelligence.is_verified == True, 1), else_=0)
+    confidence = cast(func.round(func.coalesce(Intelligence.confidence, 0.5) * 1000), Integer)
+    terms = [
+        1,
+        Intelligence.id,
+        Intelligence.id * Intelligence.severity,
+        Intelligence.id * func.coalesce(Intelligence.feedback_score, 0),
+        Intelligence.id * verified,
+        Intelligence.id * type_code,
+        Intelligence.id * confidence,
+    ]
+
+    year, month = PARTITION_COLUMNS
+    rows = db.execute(
+        select(
+            year, month, Intelligence.parish_id,
+            *[func.sum(term) for term in terms],
+            *[func.sum(case((Intelligence.id <= stored_max_id, term), else_=0)) for term in terms],
+        )
+        .where(*usable_rows(), Intelligence.id <= max_id)
+        .group_by(year, month, Intelligence.parish_id)
+    ).all()
+
+    current, stored = {}, {}
+    for row in rows:
+        key = partition_key(int(row[0]), int(row[1]), int(row[2]))
+        current[key] = [int(value or 0) for value in row[3:3 + len(terms)]]
+        if row[3 + len(terms)]:
+            stored[key] = [int(value or 0) for value in row[3 + len(terms):]]
+    return current, stored
+
+
+class FeatureStore:
+    """Parquet snapshots of static features under one directory"""
+    def __init__(self, path: str):
+        self.path = path
+        self.feature_engineer = FeatureEngineer()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    # Manifest
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.path, MANIFEST_NAME)
+
+    def read_manifest(self) -> Dict[str, Any]:
+        if not os.path.exists(self._manifest_path()):
+            return {"snapshots": []}
+        with open(self._manifest_path()) as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        # Write-then-rename so readers never see a half-written manifest
+        os.makedirs(self.path, exist_ok=True)
+        temporary = f"{self._manifest_path()}.{uuid.uuid4().hex}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(temporary, self._manifest_path())
+
+    def get_snapshot(self, snapshot_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """A snapshot by id, or the latest one"""
+        snapshots = self.read_manifest()["snapshots"]
+        if snapshot_id is None:
+            return snapshots[-1] if snapshots else None
+        return next((snapshot for snapshot in snapshots if snapshot["id"] == snapshot_id), None)
+
+    def snapshot_for_model_version(self, model_version: int) -> Optional[Dict[str, Any]]:
+        """The snapshot a ModelVersion was trained on"""
+        return next(
+            (snapshot for snapshot in self.read_manifest()["snapshots"]
+             if model_version in snapshot.get("model_versions", [])),
+            None
+        )
+
+    def tag_model_version(self, snapshot_id: int, model_version: int) -> None:
+        """Record that a ModelVersion was trained on a snapshot"""
+        with self._lock:
+            manifest = self.read_manifest()
+            for snapshot in manifest["snapshots"]:
+                if snapshot["id"] == snapshot_id:
+                    snapshot.setdefault("model_versions", []).append(model_version)
+            self._write_manifest(manifest)
+
+    # Writing
+
+    def _schema(self, db: Session) -> Optional[List[List[str]]]:
+        """Static feature columns and dtypes, from featurizing one stored row"""
+        sample = read_intelligence_frame(db, feature_query().limit(1))
+        if sample.empty:
+            return None
+        static = self.feature_engineer.add_static_features(sample)
+        return [[column, str(dtype)] for column, dtype in static.dtypes.items()]
+
+    def _write_partitions(self, frame: pd.DataFrame, snapshot_id: int) -> Dict[str, Tuple[str, int]]:
+        """Featurize loaded rows and write one file per partition"""
+        import pyarrow as pa  # Optional dependency, only needed for the feature store
+        import pyarrow.parquet as pq
+
+        keys = frame[["year", "month", "parish_id"]]
+        static = self.feature_engineer.add_static_features(frame.drop(columns=["year", "month"]))
+
+        written = {}
+        for (year, month, parish_id), index in keys.groupby(["year", "month", "parish_id"]).groups.items():
+            key = partition_key(year, month, parish_id)
+            relative = os.path.join(
+                f"month={year:04d}-{month:02d}", f"parish={parish_id}",
+                f"part-{snapshot_id:05d}-{uuid.uuid4().hex[:8]}.parquet"
+            )
+            os.makedirs(os.path.dirname(os.path.join(self.path, relative)), exist_ok=True)
+            table = pa.Table.from_pandas(static.loc[index], preserve_index=False)
+            pq.write_table(table, os.path.join(self.path, relative))
+            written[key] = (relative, len(index))
+        return written
+
+    def snapshot(self, db: Session) -> Dict[str, Any]:
+        """
+        Bring the store up to date with the database and return the new snapshot.
+        Only rows added since the last snapshot and partitions with changed rows
+        are read and featurized.
+        """
+        with self._lock:
+            manifest = self.read_manifest()
+            previous = manifest["snapshots"][-1] if manifest["snapshots"] else None
+            snapshot_id = previous["id"] + 1 if previous else 1
+
+            schema = self._schema(db)
+            max_id = db.scalar(select(func.max(Intelligence.id)).where(*usable_rows())) or 0
+            checksums, stored = partition_checksums(db, max_id, previous["max_intelligence_id"] if previous else 0)
+
+            # Partitions whose already-stored rows no longer match the database
+            changed = set()
+            if previous and previous["schema"] == schema:
+                changed = {
+                    key for key in set(stored) | set(previous["partitions"])
+                    if stored.get(key) != previous["partitions"].get(key, {}).get("checksum")
+                }
+                if len(changed) > REBUILD_FRACTION * max(len(previous["partitions"]), 1):
+                    previous = None
+            else:
+                previous = None
+
+            if previous is None:
+                conditions = []
+                partitions = {}
+                rebuilt = True
+            else:
+                year, month = PARTITION_COLUMNS
+                conditions = [or_(
+                    Intelligence.id > previous["max_intelligence_id"],
+                    *[
+                        and_(year == int(key[:4]), month == int(key[5:7]), Intelligence.parish_id == int(key[8:]))
+                        for key in changed
+                    ]
+                )]
+                partitions = {
+                    key: dict(entry) for key, entry in previous["partitions"].items() if key not in changed
+                }
+                rebuilt = False
+
+            frame = load_training_frame(
+                db, conditions=[*conditions, Intelligence.id <= max_id], key_columns=PARTITION_COLUMNS
+            )
+            written = self._write_partitions(frame, snapshot_id) if len(frame) else {}
+            featurized = len(frame)
+            del frame
+
+            for key, (relative, rows) in written.items():
+                entry = partitions.get(key, {"files": [], "rows": 0})
+                partitions[key] = {"files": entry["files"] + [relative], "rows": entry["rows"] + rows}
+            for key in list(partitions):
+                if key not in checksums:
+                    del partitions[key]  # every row deleted or moved away
+                    continue
+                partitions[key]["checksum"] = checksums[key]
+
+            snapshot = {
+                "id": snapshot_id,
+                "created_at": datetime.now().isoformat(),
+                "max_intelligence_id": max_id,
+                "schema": schema,
+                "rows": sum(entry["rows"] for entry in partitions.values()),
+                "featurized_rows": featurized,
+                "rebuilt": rebuilt,
+                "partitions": dict(sorted(partitions.items())),
+                "model_versions": [],
+            }
+            manifest["snapshots"].append(snapshot)
+            self._write_manifest(manifest)
+            return snapshot
+
+    # Reading
+
+    def load(self, snapshot_id: Optional[int] = None) -> pd.DataFrame:
+        """Static features of a snapshot (the latest by default), memory-mapped from Parquet"""
+        import pyarrow as pa  # Optional dependency, only needed for the feature store
+        import pyarrow.parquet as pq
+
+        snapshot = self.get_snapshot(snapshot_id)
+        if snapshot is None:
+            raise ValueError(f"No feature store snapshot {snapshot_id if snapshot_id is not None else ''}".strip())
+
+        tables = [
+            pq.read_table(os.path.join(self.path, relative), memory_map=True)
+            for entry in snapshot["partitions"].values()
+            for relative in entry["files"]
+        ]
+        if not tables:
+            return pd.DataFrame(columns=[column for column, _ in snapshot["schema"] or []])
+        return pa.concat_tables(tables).to_pandas(split_blocks=True, self_destruct=True)
+
+
+feature_store = FeatureStore(settings.FEATURE_STORE_PATH)
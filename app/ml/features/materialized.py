@@ -0,0 +1,243 @@
+# app/ml/features/materialized.py
+"""
+Static per-row features materialized at ingestion time.
+
+The output of FeatureEngineer.add_static_features depends only on the report
+itself, so it is computed once when a report is created or edited and stored
+in intelligence_features as a compact float32 vector. Prediction and training
+read the vectors back and only compute the time-relative features
+(finalize_features). Reports without a vector for the current schema, e.g.
+written before this table existed, are featurized on the fly until
+backfill_features.py has been run.
+"""
+import hashlib
+import json
+from functools import lru_cache
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import ColumnElement, Select, and_, delete, exists, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.ml.features.feature_engineering import FeatureEngineer
+from app.ml.training.data_loader import (
+    COLUMN_DTYPES, load_training_frame, records_frame, timestamp_nanoseconds, usable_rows
+)
+from app.models.models import Intelligence, IntelligenceFeatures
+
+feature_engineer = FeatureEngineer()
+
+
+@lru_cache(maxsize=1)
+def static_schema() -> Tuple[Tuple[str, str], ...]:
+    """Static feature columns and dtypes, in order (the timestamp stays in the intelligence table)"""
+    sample = pd.DataFrame({
+        "type": ["Crime"],
+        **{column: pd.Series([0], dtype=dtype) for column, dtype in COLUMN_DTYPES.items()},
+        "timestamp": pd.to_datetime(["2024-01-01"]),
+    })
+    static = feature_engineer.add_static_features(sample)
+    return tuple((column, str(dtype)) for column, dtype in static.dtypes.items())
+
+
+@lru_cache(maxsize=1)
+def schema_version() -> str:
+    return hashlib.sha1(json.dumps(static_schema()).encode()).hexdigest()[:16]
+
+
+def _vector_columns() -> List[Tuple[str, str]]:
+    return [(column, dtype) for column, dtype in static_schema() if column != "timestamp"]
+
+
+def encode_vectors(static: pd.DataFrame) -> List[bytes]:
+    """One float32 vector per row of add_static_features output"""
+    matrix = static[[column for column, _ in _vector_columns()]].to_numpy(dtype=np.float32)
+    return [row.tobytes() for row in matrix]
+
+
+def _static_frame(matrix: np.ndarray, timestamps: pd.DatetimeIndex) -> pd.DataFrame:
+    """Rebuild add_static_features output (original dtypes) from decoded vectors"""
+    columns = {}
+    vector_columns = iter(enumerate(_vector_columns()))
+    for column, dtype in static_schema():
+        if column == "timestamp":
+            columns[column] = timestamps
+        else:
+            index, (_, vector_dtype) = next(vector_columns)
+            columns[column] = matrix[:, index].astype(vector_dtype)
+    return pd.DataFrame(columns, copy=False)
+
+
+def _decode(vectors: Sequence) -> np.ndarray:
+    # PostgreSQL returns bytea as memoryview
+    return np.frombuffer(b"".join(bytes(vector) for vector in vectors), dtype=np.float32).reshape(
+        len(vectors), len(_vector_columns())
+    )
+
+
+def _current_vector_join():
+    return and_(
+        IntelligenceFeatures.intelligence_id == Intelligence.id,
+        IntelligenceFeatures.schema_version == schema_version()
+    )
+
+
+def store_static_features(db: Session, records: Sequence[Intelligence], replace: bool = False) -> int:
+    """
+    Compute and store the vectors of flushed ORM rows (ids assigned) in the
+    caller's transaction. replace=True overwrites existing vectors, e.g. after an edit.
+    """
+    records = [record for record in records if record.parish_id is not None and record.severity is not None]
+    if not records:
+        return 0
+
+    vectors = encode_vectors(feature_engineer.add_static_features(records_frame(records)))
+    for record, vector in zip(records, vectors):
+        row = IntelligenceFeatures(intelligence_id=record.id, schema_version=schema_version(), vector=vector)
+        if replace:
+            db.merge(row)
+        else:
+            db.add(row)
+    return len(records)
+
+
+def delete_static_features(db: Session, intelligence_id: int) -> None:
+    """Remove a report's vector (SQLite does not enforce the ON DELETE CASCADE)"""
+    db.execute(delete(IntelligenceFeatures).where(IntelligenceFeatures.intelligence_id == intelligence_id))
+
+
+def backfill_static_features(db: Session, chunk_size: Optional[int] = None) -> int:
+    """Write vectors for every usable report without one for the current schema"""
+    chunk_size = chunk_size or settings.TRAINING_CHUNK_SIZE
+    db.execute(delete(IntelligenceFeatures).where(IntelligenceFeatures.schema_version != schema_version()))
+    db.commit()
+
+    missing = [*usable_rows(), ~exists().where(_current_vector_join())]
+    written, last_id = 0, 0
+    while True:
+        # Id of the chunk_size-th missing report, so each chunk is one id range
+        upper = db.scalar(
+            select(Intelligence.id).where(*missing, Intelligence.id > last_id)
+            .order_by(Intelligence.id).offset(chunk_size - 1).limit(1)
+        )
+        conditions = [*missing, Intelligence.id > last_id]
+        if upper is not None:
+            conditions.append(Intelligence.id <= upper)
+
+        batch = load_training_frame(db, conditions=conditions, key_columns=[Intelligence.id.label("id")])
+        if batch.empty:
+            return written
+
+        vectors = encode_vectors(feature_engineer.add_static_features(batch.drop(columns=["id"])))
+        db.execute(insert(IntelligenceFeatures), [
+            {"intelligence_id": int(intelligence_id), "schema_version": schema_version(), "vector": vector}
+            for intelligence_id, vector in zip(batch["id"], vectors)
+        ])
+        db.commit()
+        written += len(batch)
+        last_id = int(batch["id"].max())
+        print(f"Backfilled {written} feature vectors (up to intelligence id {last_id})")
+
+
+def with_static_vectors(stmt: Select) -> Select:
+    """Add the stored vector (None when missing) to a select of feature columns"""
+    return stmt.add_columns(IntelligenceFeatures.vector.label("vector")).outerjoin(
+        IntelligenceFeatures, _current_vector_join()
+    )
+
+
+def static_features_from_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    add_static_features output for a small frame of feature columns plus the
+    stored vectors (with_static_vectors); rows without a vector are featurized
+    """
+    if df.empty:
+        return feature_engineer.add_static_features(df.drop(columns=["vector"]))
+    
+    stored = df["vector"].notna().to_numpy()
+    parts = []
+    if stored.any():
+        rows = df[stored]
+        static = _static_frame(_decode(rows["vector"].tolist()), pd.DatetimeIndex(rows["timestamp"]))
+        parts.append(static.set_axis(rows.index))
+    if not stored.all():
+        parts.append(feature_engineer.add_static_features(df[~stored].drop(columns=["vector"])))
+
+    static = pd.concat(parts) if len(parts) > 1 else parts[0]
+    return static.loc[df.index]
+
+
+def load_static_training_frame(
+    db: Session,
+    since: Optional[datetime] = None,
+    chunk_size: Optional[int] = None,
+    conditions: Sequence[ColumnElement] = (),
+    key_columns: Sequence[ColumnElement] = ()
+) -> pd.DataFrame:
+    """
+    add_static_features output for every usable report, streamed from the
+    stored vectors into one float32 matrix; reports without a vector are
+    loaded and featurized as usual. Extra conditions narrow the scan and
+    key_columns (labelled integer expressions, e.g. the id) are appended as
+    int64 columns, as in load_training_frame.
+    """
+    chunk_size = chunk_size or settings.TRAINING_CHUNK_SIZE
+    conditions = [*usable_rows(since), *conditions]
+    key_names = [column.name for column in key_columns]
+
+    total, max_id = db.execute(
+        select(func.count(), func.max(Intelligence.id))
+        .join(IntelligenceFeatures, _current_vector_join())
+        .where(*conditions)
+    ).one()
+
+    parts = []
+    if total:
+        matrix = np.empty((total, len(_vector_columns())), dtype=np.float32)
+        timestamps = np.empty(total, dtype=np.int64)
+        keys = {name: np.empty(total, dtype=np.int64) for name in key_names}
+        timezone_aware = False
+
+        filled = 0
+        result = db.execute(
+            select(Intelligence.timestamp, IntelligenceFeatures.vector, *key_columns)
+            .join(IntelligenceFeatures, _current_vector_join())
+            .where(*conditions, Intelligence.id <= max_id)
+            .execution_options(yield_per=chunk_size)
+        )
+        for chunk in result.partitions():
+            end = min(filled + len(chunk), total)
+            times, vectors, *key_values = zip(*chunk[:end - filled])
+            matrix[filled:end] = _decode(vectors)
+            timestamps[filled:end], timezone_aware = timestamp_nanoseconds(times, timezone_aware)
+            for name, values in zip(key_names, key_values):
+                keys[name][filled:end] = values
+            filled = end
+            if filled == total:
+                break
+        result.close()
+
+        static = _static_frame(matrix[:filled], pd.to_datetime(timestamps[:filled], unit="ns", utc=timezone_aware))
+        for name, values in keys.items():
+            static[name] = values[:filled]
+        parts.append(static)
+        del matrix
+
+    # Reports the backfill has not reached yet
+    missing = load_training_frame(
+        db, chunk_size=chunk_size, conditions=[*conditions, ~exists().where(_current_vector_join())],
+        key_columns=key_columns
+    )
+    # Keys stay out of the featurization (integer columns would become features)
+    missing_keys = missing[key_names]
+    missing = missing.drop(columns=key_names)
+    if len(missing):
+        print(f"Featurizing {len(missing)} reports without stored feature vectors (run backfill_features.py)")
+        parts.append(pd.concat([feature_engineer.add_static_features(missing), missing_keys], axis=1))
+
+    if not parts:
+        return pd.concat([feature_engineer.add_static_features(missing), missing_keys], axis=1)
+    return pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
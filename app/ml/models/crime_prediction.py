@@ -3,69 +3,197 @@ import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 import pickle
-from datetime import datetime
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
 
+from app.core.cache import response_cache
+from app.core.metrics import ml_stage_duration, model_load_duration, prediction_fallbacks
 from app.models.models import Intelligence, ModelVersion, Parish
 from app.ml.features.feature_engineering import FeatureEngineer
+from app.ml.features.materialized import static_features_from_frame, with_static_vectors
+from app.ml.models.flat_forest import FlatForest, shared_models
+from app.ml.training.data_loader import FEATURE_COLUMNS, feature_query, read_intelligence_frame
 
 
-class CrimePredictionModel:
+def new_estimator() -> RandomForestClassifier:
+    return RandomForestClassifier(n_estimators=100, random_state=42)
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    version: int
+    estimator: FlatForest
+    features: List[str]
+    feature_stats: Optional[Dict[str, Any]]
+
+
+class ModelCache:
+    """
+    The newest trained model, shared by every CrimePredictionModel in the
+    process. Each lookup only reads the newest version id; the binary is
+    fetched, unpickled and flattened once per version, and predictions use the
+    flattened forest. Training always fits a new estimator.
+
+    With MODEL_SHARE_PATH set, the flattened forest is mapped from disk, which
+    all workers on the host share. The first worker to need a version exports
+    it; the others only map the file.
+    """
     def __init__(self):
-        self.model = RandomForestClassifier(n_estimators=100, random_state=42)
+        self.entry: Optional[LoadedModel] = None
+        self._lock = threading.Lock()
+
+    def latest(self, db: Session) -> Optional[LoadedModel]:
+        """The newest model with a binary, or None when none has been trained"""
+        with model_load_duration.time(("query",)):
+            version = db.scalar(
+                select(ModelVersion.id).where(
+                    ModelVersion.model_type == "crime_prediction",
+                    ModelVersion.binary_data.isnot(None)
+                ).order_by(ModelVersion.id.desc()).limit(1)
+            )
+        if version is None:
+            return None
+
+        entry = self.entry
+        if entry is not None and entry.version == version:
+            return entry
+        with self._lock:
+            # Another request may have loaded it while this one waited
+            if self.entry is None or self.entry.version != version:
+                self.entry = self._load(db, version)
+                print(f"Loaded model version {version}")
+            return self.entry
+
+    def _load(self, db: Session, version: int) -> LoadedModel:
+        if shared_models.enabled:
+            with model_load_duration.time(("map",)):
+                estimator = shared_models.load(version)
+            if estimator is not None:
+                features, feature_stats = db.execute(
+                    select(ModelVersion.features, ModelVersion.feature_stats).where(ModelVersion.id == version)
+                ).one()
+                return LoadedModel(version, estimator, features or [], feature_stats)
+
+        row = db.get(ModelVersion, version)
+        with model_load_duration.time(("unpickle",)):
+            estimator = pickle.loads(row.binary_data)
+        return LoadedModel(version, self._flatten(version, estimator), row.features or [], row.feature_stats)
+
+    @staticmethod
+    def _flatten(version: int, estimator: RandomForestClassifier) -> FlatForest:
+        """The estimator's flattened forest, mapped from MODEL_SHARE_PATH when sharing is on"""
+        if shared_models.enabled:
+            try:
+                with model_load_duration.time(("export",)):
+                    return shared_models.export(version, estimator)
+            except Exception as e:
+                print(f"Warning: Could not export model version {version} to {shared_models.path}: {str(e)}")
+        with model_load_duration.time(("flatten",)):
+            return FlatForest.from_estimator(estimator)
+
+    def put(self, version: int, estimator: RandomForestClassifier, features: List[str],
+            feature_stats: Optional[Dict[str, Any]]) -> None:
+        """Share a model this process has just trained and saved"""
+        entry = LoadedModel(version, self._flatten(version, estimator), features, feature_stats)
+        with self._lock:
+            if self.entry is None or entry.version >= self.entry.version:
+                self.entry = entry
+
+
+model_cache = ModelCache()
+
+
+class CrimePredictionModel:
+    def __init__(self, db: Optional[Session] = None):
+        # None until a trained model is loaded (a FlatForest from the cache) or fitted
+        self.model: Optional[Union[RandomForestClassifier, FlatForest]] = None
         self.model_version = None
         self.feature_engineer = FeatureEngineer()
         self.features = []
+        self.feature_stats = None  # Reference time and normalization statistics from training
         
-        # Try to load the latest model from the database
+        # Try to load the latest model from the database; training works without one
         try:
-            self._load_latest_model()
+            self._load_latest_model(db)
         except Exception as e:
-            print(f"Warning: Could not load trained model: {str(e)}")
+            print(f"Warning: Could not load trained model, predictions fall back to the severity heuristic: {str(e)}")
     
-    def _load_latest_model(self):
-        """Load the latest model from the database"""
-        from app.db.session import SessionLocal
-        db = SessionLocal()
-        try:
-            # Get the latest model version
-            latest_model = db.query(ModelVersion).filter(
-                ModelVersion.model_type == "crime_prediction"
-            ).order_by(ModelVersion.id.desc()).first()
-            
-            if latest_model and latest_model.binary_data:
-                # Deserialize the model
-                self.model = pickle.loads(latest_model.binary_data)
-                self.model_version = latest_model.id
-                self.features = latest_model.features
-                print(f"Loaded model version {self.model_version}")
-                return True
+    @property
+    def is_trained(self) -> bool:
+        return self.model is not None
+    
+    def _load_latest_model(self, db: Optional[Session] = None):
+        """
+        Take the latest model from the shared cache, using the caller's session
+        when there is one rather than checking out another connection
+        """
+        if db is None:
+            from app.db.session import session_scope
+            with session_scope() as own_db:
+                return self._load_latest_model(own_db)
+        
+        loaded = model_cache.latest(db)
+        if loaded is None:
             return False
-        finally:
-            db.close()
+        self.model = loaded.estimator
+        self.model_version = loaded.version
+        self.features = loaded.features
+        self.feature_stats = loaded.feature_stats
+        return True
     
     # Update the train method
-    def train(self, db: Session, intelligence_data: List[Dict[str, Any]]) -> float:
+    def train(
+        self,
+        db: Session,
+        intelligence_data: Union[pd.DataFrame, List[Dict[str, Any]]],
+        reference_time: Optional[datetime] = None
+    ) -> float:
         """
-        Train the model using the provided intelligence data
+        Train the model using the provided intelligence data, either a frame from
+        load_training_frame or a list of records (e.g. synthetic data)
         Returns the model accuracy
         """
         # Convert to DataFrame for easier processing
-        df = pd.DataFrame(intelligence_data)
+        if isinstance(intelligence_data, pd.DataFrame):
+            df = intelligence_data
+        else:
+            df = pd.DataFrame(intelligence_data)
         
-        # Extract features using the enhanced feature engineering
-        X, feature_names = self.feature_engineer.extract_features(df)
-        self.features = feature_names
+        return self.train_on_features(db, self.feature_engineer.add_static_features(df), reference_time)
+    
+    def train_on_features(
+        self,
+        db: Session,
+        static_features: pd.DataFrame,
+        reference_time: Optional[datetime] = None,
+        sample_weight: Optional[np.ndarray] = None
+    ) -> float:
+        """
+        Train the model on add_static_features output, e.g. a feature store snapshot.
+        Recency is measured from reference_time (default: the newest report); it
+        and the normalization statistics are saved with the model for inference.
+        sample_weight (e.g. from the training reservoir) weights the fit and the accuracy.
+        Returns the model accuracy
+        """
+        y = static_features['severity'].values  # Use severity as the target for now
         
-        y = df['severity'].values  # Use severity as the target for now
+        # Finish feature extraction (recency and normalization statistics come from this batch)
+        X, feature_names = self.feature_engineer.finalize_features(static_features, reference_time)
+        self.features = feature_names
+        self.feature_stats = self.feature_engineer.feature_stats
         
-        # Train the model
-        self.model.fit(X, y)
+        # Train a new estimator; the loaded one may be in use by other requests
+        self.model = new_estimator()
+        self.model.fit(X, y, sample_weight=sample_weight)
         
         # Calculate accuracy (simplified - in reality would use cross-validation)
         y_pred = self.model.predict(X)
-        accuracy = np.mean(y_pred == y)
+        accuracy = np.average(y_pred == y, weights=sample_weight)
         
         # Update feature importance tracking
         if hasattr(self.model, 'feature_importances_'):
@@ -87,53 +215,114 @@ class CrimePredictionModel:
         """
         try:
             # Get recent intelligence for the parish
-            recent_intelligence = (
-                db.query(Intelligence)
-                .filter(Intelligence.parish_id == parish_id)
+            df = read_intelligence_frame(
+                db,
+                with_static_vectors(feature_query())
+                .where(Intelligence.parish_id == parish_id)
                 .order_by(Intelligence.timestamp.desc())
                 .limit(50)
-                .all()
             )
             
             # If no intelligence, return default value
-            if not recent_intelligence:
+            if df.empty:
                 return 20  # Default baseline
             
-            # Convert to DataFrame
-            df = pd.DataFrame([{
-                'type': item.type,
-                'parish_id': item.parish_id,
-                'severity': item.severity,
-                'confidence': item.confidence,
-                'is_verified': item.is_verified,
-                'feedback_score': item.feedback_score,
-                'timestamp': item.timestamp,
-            } for item in recent_intelligence])
+            return self._crime_level_from_frame(df)
             
-            # Extract features using the enhanced feature engineering
-            X, _ = self.feature_engineer.extract_features(df)
+        except Exception as e:
+            print(f"Error in predict_crime_level: {str(e)}")
+            return 50  # Default fallback value
+    
+    def predict_crime_levels(self, db: Session, parish_ids: List[int], per_parish: int = 50) -> Dict[int, int]:
+        """
+        Predict crime levels for several parishes, loading the latest reports of
+        all of them in one windowed query instead of one query per parish
+        """
+        try:
+            recent = with_static_vectors(select(
+                *FEATURE_COLUMNS,
+                func.row_number().over(
+                    partition_by=Intelligence.parish_id,
+                    order_by=Intelligence.timestamp.desc()
+                ).label('row_number')
+            )).where(
+                Intelligence.parish_id.in_(parish_ids),
+                Intelligence.severity.isnot(None)
+            ).subquery()
+            
+            df_all = read_intelligence_frame(
+                db,
+                select(recent).where(recent.c.row_number <= per_parish)
+            )
+        except Exception as e:
+            print(f"Error in predict_crime_levels: {str(e)}")
+            return {parish_id: 50 for parish_id in parish_ids}  # Default fallback value
+        
+        crime_levels = {}
+        for parish_id in parish_ids:
+            if df_all.empty or not (df_all['parish_id'] == parish_id).any():
+                crime_levels[parish_id] = 20  # Default baseline
+                continue
             
-            # Make prediction with error handling
+            df = df_all[df_all['parish_id'] == parish_id].drop(columns=['row_number']).reset_index(drop=True)
             try:
-                severity_predictions = self.model.predict(X)
-                
-                # Convert to crime level (0-100 scale)
-                avg_severity = np.mean(severity_predictions)
-                crime_level = int(min(100, max(0, avg_severity * 10)))
+                crime_levels[parish_id] = self._crime_level_from_frame(df)
             except Exception as e:
-                # If model fails for any reason, use a simple heuristic
-                print(f"Warning: Prediction model error: {str(e)}")
-                avg_severity = df['severity'].mean() if 'severity' in df.columns else 5
-                crime_level = int(min(100, max(0, avg_severity * 10)))
-            
-            # Apply additional adjustments based on parish characteristics
-            parish = db.query(Parish).filter(Parish.id == parish_id).first()
-            
-            return crime_level
-            
+                print(f"Error in predict_crime_levels: {str(e)}")
+                crime_levels[parish_id] = 50  # Default fallback value
+        
+        return crime_levels
+    
+    def predict_severities(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Predicted severity of each row of intelligence (feature columns plus
+        stored vectors); raises when there is no trained model
+        """
+        if self.model is None:
+            raise RuntimeError("No trained crime_prediction model has been loaded")
+        
+        # Static features come from the vectors stored at ingestion; only the
+        # time-relative ones are computed, as of now and with the training statistics
+        start = time.perf_counter()
+        X, feature_names = self.feature_engineer.finalize_features(
+            static_features_from_frame(df), reference_time=datetime.now(timezone.utc), stats=self.feature_stats
+        )
+        
+        # Line the columns up with the ones the model was trained on
+        if self.features:
+            X = pd.DataFrame(X, columns=feature_names).reindex(columns=self.features, fill_value=0).values
+        ml_stage_duration.observe(time.perf_counter() - start, ("featurize",))
+        
+        with ml_stage_duration.time(("predict",)):
+            return self.model.predict(X)
+    
+    def _crime_level_from_frame(self, df: pd.DataFrame) -> int:
+        """
+        Turn a parish's recent intelligence (feature columns plus stored vectors)
+        into a 0-100 crime level
+        """
+        if self.model is None:
+            # Never predict with an unfitted estimator; the fallback is counted in /metrics
+            prediction_fallbacks.inc(labels=("untrained",))
+            return self._heuristic_crime_level(df)
+        
+        # Make prediction with error handling
+        try:
+            severity_predictions = self.predict_severities(df)
         except Exception as e:
-            print(f"Error in predict_crime_level: {str(e)}")
-            return 50  # Default fallback value
+            # If model fails for any reason, use a simple heuristic
+            print(f"Warning: Prediction model error: {str(e)}")
+            prediction_fallbacks.inc(labels=("error",))
+            return self._heuristic_crime_level(df)
+        
+        # Convert to crime level (0-100 scale)
+        avg_severity = np.mean(severity_predictions)
+        return int(min(100, max(0, avg_severity * 10)))
+    
+    @staticmethod
+    def _heuristic_crime_level(df: pd.DataFrame) -> int:
+        avg_severity = df['severity'].mean() if 'severity' in df.columns else 5
+        return int(min(100, max(0, avg_severity * 10)))
     
     def _save_model_to_db(self, db: Session, accuracy: float) -> None:
         """Save the trained model to the database"""
@@ -145,6 +334,7 @@ class CrimePredictionModel:
             model_type="crime_prediction",
             accuracy=accuracy,
             features=self.features,
+            feature_stats=self.feature_stats,
             binary_data=model_binary
         )
         
@@ -152,4 +342,6 @@ class CrimePredictionModel:
         db.commit()
         db.refresh(model_version)
         
-        self.model_version = model_version.id
\ No newline at end of file
+        self.model_version = model_version.id
+        model_cache.put(self.model_version, self.model, self.features, self.feature_stats)
+        response_cache.invalidate("insights")
\ No newline at end of file
@@ -1,10 +1,13 @@
 # Updated app/ml/models/resource_allocator.py
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 
-from app.models.models import Parish, SystemSettings, Prediction
+from app.models.models import Parish, SystemSettings, Prediction, ResourceAllocation
 from app.core.config import settings
+from app.core.cache import response_cache
+from app.core.metrics import ml_stage_duration
+from app.core.reference_data import PARISH_DENSITY, PARISH_TOURISM, DEFAULT_DENSITY, DEFAULT_TOURISM
 from datetime import datetime
 
 class ResourceAllocator:
@@ -12,55 +15,87 @@ class ResourceAllocator:
         self.total_officers = settings.TOTAL_OFFICERS
         self.min_officers_per_parish = settings.MIN_OFFICERS_PER_PARISH
     
-    def allocate_resources(self, db: Session) -> Dict[int, int]:
-        """
-        Allocate police officers across parishes based on crime levels
-        Returns a dictionary mapping parish_id to officer count
-        """
-        # Get total officers from database
+    def _load_total_officers(self, db: Session) -> None:
+        """Read the total officer count from system settings"""
         total_officers_setting = db.query(SystemSettings).filter(SystemSettings.key == "total_officers").first()
         if total_officers_setting:
             self.total_officers = int(total_officers_setting.value)
         else:
             # Fall back to config setting if database value not found
             self.total_officers = settings.TOTAL_OFFICERS
-            
-        # Get all parishes with their crime levels
+    
+    def plan_allocation(
+        self,
+        db: Session,
+        crime_levels: Optional[Dict[int, int]] = None
+    ) -> Tuple[Dict[int, int], Dict[int, int]]:
+        """
+        Compute (recommendations, allocations) without writing anything.
+        crime_levels overrides the parishes' stored current_crime_level (dry runs).
+        """
+        self._load_total_officers(db)
         parishes = db.query(Parish).all()
-        
-        # Extract crime levels and parish IDs
+        return self._plan(parishes, crime_levels)
+    
+    def _plan(
+        self,
+        parishes: List[Parish],
+        crime_levels: Optional[Dict[int, int]] = None
+    ) -> Tuple[Dict[int, int], Dict[int, int]]:
         parish_ids = [parish.id for parish in parishes]
-        crime_levels = [parish.current_crime_level or 0 for parish in parishes]
-        
-        # Calculate recommended officer allocation (purely based on crime level ratio)
-        recommendations = self._calculate_recommended_allocation(parish_ids, crime_levels)
+        if crime_levels is None:
+            levels = [parish.current_crime_level or 0 for parish in parishes]
+        else:
+            levels = [crime_levels.get(parish.id, parish.current_crime_level or 0) for parish in parishes]
         
-        # Calculate actual allocation (with other factors considered)
-        allocations = self._calculate_actual_allocation(parish_ids, crime_levels)
+        with ml_stage_duration.time(("allocate",)):
+            # Calculate recommended officer allocation (purely based on crime level ratio)
+            recommendations = self._calculate_recommended_allocation(parish_ids, levels)
+            
+            # Calculate actual allocation (with other factors considered)
+            allocations = self._calculate_actual_allocation(parish_ids, levels)
         
-        # Update parishes with the allocations and recommendations
-        for parish_id in parish_ids:
-            parish = db.query(Parish).filter(Parish.id == parish_id).first()
-            if parish:
-                # Use DIFFERENT algorithms for these two values
-                parish.police_allocated = allocations[parish_id]
-                parish.recommended_allocation = recommendations[parish_id]
+        return recommendations, allocations
+    
+    def allocate_resources(self, db: Session) -> Dict[int, int]:
+        """
+        Allocate police officers across parishes based on crime levels
+        Returns a dictionary mapping parish_id to officer count
+        """
+        # Get total officers from database
+        self._load_total_officers(db)
+            
+        # Get all parishes with their crime levels
+        parishes = db.query(Parish).all()
+        recommendations, allocations = self._plan(parishes)
         
-        # Create/update prediction records 
-        for parish_id in parish_ids:
-            parish = db.query(Parish).filter(Parish.id == parish_id).first()
-            if parish:
-                # Create new prediction record
-                prediction = Prediction(
-                    parish_id=parish_id,
-                    predicted_crime_level=parish.current_crime_level or 0,
-                    recommended_officers=recommendations[parish_id],
-                    timestamp=datetime.now()
-                )
-                db.add(prediction)
+        for parish in parishes:
+            # Update parishes with the allocations and recommendations
+            # Use DIFFERENT algorithms for these two values
+            parish.police_allocated = allocations[parish.id]
+            parish.recommended_allocation = recommendations[parish.id]
+            
+            # Create new prediction record
+            prediction = Prediction(
+                parish_id=parish.id,
+                predicted_crime_level=parish.current_crime_level or 0,
+                recommended_officers=recommendations[parish.id],
+                timestamp=datetime.now()
+            )
+            db.add(prediction)
+            
+            # Keep an allocation history record alongside the prediction
+            db.add(ResourceAllocation(
+                parish_id=parish.id,
+                recommended_officers=recommendations[parish.id],
+                allocated_officers=allocations[parish.id],
+                crime_level=parish.current_crime_level or 0,
+                timestamp=datetime.now()
+            ))
         
         # Commit all changes
         db.commit()
+        response_cache.invalidate("parishes", "parish_stats", "insights")
         
         return allocations
     
@@ -115,48 +150,12 @@ class ResourceAllocator:
         population density and tourism factors.
         This creates a difference from the recommended allocation.
         """
-        # Population density approximation (higher values for urban parishes)
-        population_density = {
-            1: 0.9,  # Kingston (urban)
-            2: 0.85, # St. Andrew (urban) 
-            3: 0.7,  # St. Catherine (mixed)
-            4: 0.5,  # Clarendon (mixed)
-            5: 0.4,  # Manchester (rural)
-            6: 0.3,  # St. Elizabeth (rural)
-            7: 0.4,  # Westmoreland (rural)
-            8: 0.3,  # Hanover (rural)
-            9: 0.6,  # St. James (urban/tourist)
-            10: 0.4, # Trelawny (rural)
-            11: 0.5, # St. Ann (tourist)
-            12: 0.4, # St. Mary (rural)
-            13: 0.3, # Portland (rural)
-            14: 0.4  # St. Thomas (rural)
-        }
-        
-        # Tourism level proxy (additional weight)
-        tourism_factor = {
-            1: 0.5,  # Kingston (moderate)
-            2: 0.4,  # St. Andrew (moderate)
-            3: 0.2,  # St. Catherine (low)
-            4: 0.1,  # Clarendon (low)
-            5: 0.2,  # Manchester (low)
-            6: 0.2,  # St. Elizabeth (low)
-            7: 0.5,  # Westmoreland (high - Negril)
-            8: 0.3,  # Hanover (moderate)
-            9: 0.8,  # St. James (very high - Montego Bay)
-            10: 0.3, # Trelawny (moderate)
-            11: 0.7, # St. Ann (high - Ocho Rios)
-            12: 0.3, # St. Mary (moderate)
-            13: 0.4, # Portland (moderate)
-            14: 0.2  # St. Thomas (low)
-        }
-        
         # Calculate weighted scores for each parish using crime level, population density, and tourism
         weighted_scores = {}
         for i, parish_id in enumerate(parish_ids):
             crime_score = crime_levels[i] if crime_levels[i] > 0 else 1  # Default to 1 if no crime data
-            density_factor = population_density.get(parish_id, 0.5)  # Default to 0.5 if not found
-            tourism_weight = tourism_factor.get(parish_id, 0.3)  # Default to 0.3 if not found
+            density_factor = PARISH_DENSITY.get(parish_id, DEFAULT_DENSITY)
+            tourism_weight = PARISH_TOURISM.get(parish_id, DEFAULT_TOURISM)
             
             # Calculate weighted score - high density and tourism areas get more officers
             weighted_scores[parish_id] = crime_score * (1 + density_factor + tourism_weight)
@@ -0,0 +1,167 @@
+# app/ml/training/data_loader.py
+"""
+Column-oriented loading of intelligence rows for training and prediction.
+
+Only the feature columns are selected (never the description text). Training
+scans stream the rows in chunks of TRAINING_CHUNK_SIZE (server-side cursor on
+PostgreSQL) and copy each chunk straight into preallocated, typed NumPy arrays,
+so the scan never holds ORM objects, per-row dicts and the DataFrame at once.
+Small reads go through pd.read_sql with the same dtype hints.
+
+Timestamps are returned in UTC when the database returns timezone-aware values
+(PostgreSQL) and naive otherwise (SQLite), the same on both paths so training
+and prediction see identical temporal features.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import ColumnElement, Select, extract, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.models import Intelligence
+
+# Feature columns, with NULLs replaced by the model's column defaults in SQL
+FEATURE_COLUMNS = (
+    Intelligence.type.label("type"),
+    Intelligence.parish_id.label("parish_id"),
+    Intelligence.severity.label("severity"),
+    func.coalesce(Intelligence.confidence, 0.5).label("confidence"),
+    func.coalesce(Intelligence.is_verified, False).label("is_verified"),
+    func.coalesce(Intelligence.feedback_score, 0).label("feedback_score"),
+    Intelligence.timestamp.label("timestamp"),
+)
+
+# dtypes the feature engineering expects (type is object, timestamp datetime64)
+COLUMN_DTYPES = {
+    "parish_id": "int64",
+    "severity": "int64",
+    "confidence": "float64",
+    "is_verified": "bool",
+    "feedback_score": "int64",
+}
+
+
+# Month of each report, as computed by the database (feature store partitioning)
+PARTITION_COLUMNS = (
+    extract("year", Intelligence.timestamp).label("year"),
+    extract("month", Intelligence.timestamp).label("month"),
+)
+
+
+def usable_rows(since: Optional[datetime] = None) -> List[ColumnElement]:
+    """Reports that can be trained on (severity is the training target)"""
+    conditions = [Intelligence.parish_id.isnot(None), Intelligence.severity.isnot(None)]
+    if since is not None:
+        conditions.append(Intelligence.timestamp >= since)
+    return conditions
+
+
+def feature_query(since: Optional[datetime] = None) -> Select:
+    """Feature columns of every usable report"""
+    return select(*FEATURE_COLUMNS).where(*usable_rows(since))
+
+
+def timestamp_nanoseconds(times: Sequence[Optional[datetime]], timezone_aware: bool = False) -> Tuple[np.ndarray, bool]:
+    """
+    Nanoseconds since the epoch (UTC for timezone-aware values) and whether the
+    values are timezone-aware, which stays True once seen
+    """
+    first = next((value for value in times if value is not None), None)
+    timezone_aware = timezone_aware or (first is not None and first.tzinfo is not None)
+    return pd.to_datetime(list(times), utc=timezone_aware).asi8, timezone_aware
+
+
+def records_frame(records: Sequence[Intelligence]) -> pd.DataFrame:
+    """Feature columns of ORM rows, typed like load_training_frame output"""
+    defaults = {"confidence": 0.5, "is_verified": False, "feedback_score": 0}
+    timestamps, timezone_aware = timestamp_nanoseconds([record.timestamp for record in records])
+    return pd.DataFrame({
+        # Freshly created rows may still hold the IntelligenceType enum member
+        "type": np.array([getattr(record.type, "value", record.type) for record in records], dtype=object),
+        **{
+            column: np.array(
+                [getattr(record, column) if getattr(record, column) is not None else defaults.get(column)
+                 for record in records],
+                dtype=dtype
+            )
+            for column, dtype in COLUMN_DTYPES.items()
+        },
+        "timestamp": pd.to_datetime(timestamps, unit="ns", utc=timezone_aware),
+    })
+
+
+def read_intelligence_frame(db: Session, stmt: Select) -> pd.DataFrame:
+    """Small result sets (e.g. one parish's latest reports) via pd.read_sql with dtype hints"""
+    return pd.read_sql(stmt, db.connection(), dtype=COLUMN_DTYPES)
+
+
+def load_training_frame(
+    db: Session,
+    since: Optional[datetime] = None,
+    chunk_size: Optional[int] = None,
+    conditions: Sequence[ColumnElement] = (),
+    key_columns: Sequence[ColumnElement] = ()
+) -> pd.DataFrame:
+    """
+    Stream the training rows into typed column arrays and wrap them in a
+    DataFrame without copying. Extra conditions narrow the scan; key_columns
+    (labelled integer expressions, e.g. PARTITION_COLUMNS or the id) are
+    appended as int64 columns.
+    """
+    chunk_size = chunk_size or settings.TRAINING_CHUNK_SIZE
+    conditions = [*usable_rows(since), *conditions]
+    dtypes = {**COLUMN_DTYPES, **{column.name: "int64" for column in key_columns}}
+
+    # Size the arrays up front; rows written after the count are left for the next run
+    total, max_id = db.execute(
+        select(func.count(), func.max(Intelligence.id)).where(*conditions)
+    ).one()
+    if not total:
+        return pd.DataFrame({
+            column: pd.Series(dtype=dtype)
+            for column, dtype in {"type": "object", **dtypes, "timestamp": "datetime64[ns]"}.items()
+        })
+    stmt = select(*FEATURE_COLUMNS, *key_columns).where(*conditions, Intelligence.id <= max_id)
+    names = [column.name for column in stmt.selected_columns]
+
+    arrays = {column: np.empty(total, dtype=dtype) for column, dtype in dtypes.items()}
+    type_codes = np.empty(total, dtype=np.int16)
+    timestamps = np.empty(total, dtype=np.int64)  # nanoseconds since the epoch
+    vocabulary: Dict[str, int] = {}
+    timezone_aware = False
+
+    filled = 0
+    result = db.execute(stmt.execution_options(yield_per=chunk_size))
+    for chunk in result.partitions():
+        end = min(filled + len(chunk), total)
+        values = dict(zip(names, zip(*chunk[:end - filled])))
+
+        type_codes[filled:end] = [vocabulary.setdefault(value, len(vocabulary)) for value in values["type"]]
+        for column, array in arrays.items():
+            array[filled:end] = values[column]
+
+        timestamps[filled:end], timezone_aware = timestamp_nanoseconds(values["timestamp"], timezone_aware)
+
+        filled = end
+        if filled == total:
+            break
+    result.close()
+
+    # Rows deleted during the scan leave the arrays part-filled
+    if filled < total:
+        arrays = {column: array[:filled] for column, array in arrays.items()}
+        type_codes, timestamps = type_codes[:filled], timestamps[:filled]
+
+    labels = np.empty(len(vocabulary), dtype=object)
+    for value, code in vocabulary.items():
+        labels[code] = value
+
+    return pd.DataFrame({
+        "type": labels[type_codes],
+        **{column: arrays[column] for column in COLUMN_DTYPES},
+        "timestamp": pd.to_datetime(timestamps, unit="ns", utc=timezone_aware),
+        **{column.name: arrays[column.name] for column in key_columns},
+    }, copy=False)
@@ -21,7 +21,7 @@ def train_initial_model():
         
         # Train the crime prediction model
         print("Training crime prediction model...")
-        prediction_model = CrimePredictionModel()
+        prediction_model = CrimePredictionModel(db)
         accuracy = prediction_model.train(db, synthetic_data)
         print(f"Model trained with accuracy: {accuracy:.2f}")
         
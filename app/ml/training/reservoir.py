@@ -0,0 +1,168 @@
+# app/ml/training/reservoir.py
+"""
+Bounded training sets for retraining (TRAINING_RESERVOIR_ROWS).
+
+A retrain uses every report of the last TRAINING_RECENT_DAYS plus a
+stratified sample of the older history, an equal share of
+TRAINING_RESERVOIR_ROWS per parish x type x severity stratum. Each row is
+weighted by its importance (older rows in its stratum / rows sampled from
+it; 1 for recent rows), so the weighted sample keeps the history's mix of
+parishes, types and severities, times a decay that halves every
+TRAINING_HALF_LIFE_DAYS of age. The weights are passed to fit as
+sample_weight.
+
+Within a stratum the sample is the rows with the smallest hash of their id, a
+uniform sample that can be maintained incrementally: an update reads only the
+reports added since the previous one and those that have aged out of the
+recent window, merges them in and keeps the smallest hashes. Edits and
+deletions of older reports are picked up by a full rebuild every
+TRAINING_RESERVOIR_REBUILD_HOURS.
+"""
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.ml.features.feature_engineering import TYPE_VOCABULARY
+from app.ml.features.materialized import load_static_training_frame
+from app.ml.training.data_loader import usable_rows
+from app.models.models import Intelligence
+
+# Sampled ids per IN (...) list when loading the sample
+ID_BATCH_SIZE = 10_000
+
+
+def stratum_keys(parish_ids: np.ndarray, types: np.ndarray, severities: np.ndarray) -> np.ndarray:
+    """One integer per parish x type x severity combination"""
+    type_codes = pd.Categorical(types, categories=TYPE_VOCABULARY).codes.astype(np.int64) + 1
+    return (parish_ids.astype(np.int64) * 1000 + type_codes) * 1000 + severities.astype(np.int64)
+
+
+def id_priorities(ids: np.ndarray) -> np.ndarray:
+    """Pseudo-random but fixed rank of every id (splitmix64), so samples are reproducible"""
+    z = ids.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+class TrainingReservoir:
+    """Recent window plus a stratified sample of older reports, kept up to date across retrains"""
+    def __init__(self, rows: int, recent_days: int, half_life_days: float, rebuild_hours: int):
+        self.rows = rows
+        self.recent_days = recent_days
+        self.half_life_days = half_life_days
+        self.rebuild_hours = rebuild_hours
+        self._lock = threading.Lock()
+        self.reset()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rows > 0
+
+    def reset(self) -> None:
+        self.ids = np.empty(0, dtype=np.int64)
+        self.strata = np.empty(0, dtype=np.int64)
+        self.stratum_rows: Dict[int, int] = {}  # Older reports seen per stratum
+        self.max_id = 0
+        self.cutoff: Optional[datetime] = None  # Start of the recent window at the last update
+        self.built_at: Optional[datetime] = None
+
+    def update(self, db: Session, now: Optional[datetime] = None) -> int:
+        """Offer the reports that are new to the older history to the sample; returns how many were read"""
+        # UTC like prediction time; naive values are taken as UTC, as SQLite stores timestamps
+        now = now or datetime.now(timezone.utc)
+        if now.tzinfo is None:
+            now = now.replace(tzinfo=timezone.utc)
+        with self._lock:
+            if self.built_at is None or now - self.built_at > timedelta(hours=self.rebuild_hours):
+                self.reset()
+                self.built_at = now
+
+            cutoff = now - timedelta(days=self.recent_days)
+            max_id = db.scalar(select(func.max(Intelligence.id))) or 0
+            conditions = [*usable_rows(), Intelligence.timestamp < cutoff, Intelligence.id <= max_id]
+            if self.cutoff is not None:
+                # Added since the last update, or aged out of the recent window since then
+                conditions.append(or_(Intelligence.id > self.max_id, Intelligence.timestamp >= self.cutoff))
+
+            read = 0
+            result = db.execute(
+                select(Intelligence.id, Intelligence.parish_id, Intelligence.type, Intelligence.severity)
+                .where(*conditions)
+                .execution_options(yield_per=settings.TRAINING_CHUNK_SIZE)
+            )
+            for chunk in result.partitions():
+                ids, parish_ids, types, severities = (np.array(values) for values in zip(*chunk))
+                self._merge(ids.astype(np.int64), stratum_keys(parish_ids, types, severities))
+                read += len(chunk)
+            result.close()
+
+            self.max_id, self.cutoff = max_id, cutoff
+            return read
+
+    def _merge(self, ids: np.ndarray, strata: np.ndarray) -> None:
+        """Add rows to the population counts and keep the smallest priorities of every stratum"""
+        for stratum, count in zip(*np.unique(strata, return_counts=True)):
+            self.stratum_rows[int(stratum)] = self.stratum_rows.get(int(stratum), 0) + int(count)
+        per_stratum = max(1, self.rows // len(self.stratum_rows))
+
+        ids, strata = np.concatenate([self.ids, ids]), np.concatenate([self.strata, strata])
+        order = np.lexsort((id_priorities(ids), strata))
+        sorted_strata = strata[order]
+        starts = np.flatnonzero(np.r_[True, sorted_strata[1:] != sorted_strata[:-1]])
+        rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+        keep = order[rank < per_stratum]
+        self.ids, self.strata = ids[keep], strata[keep]
+
+    def importance(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Sampled ids (sorted) and the number of older reports each one stands for"""
+        stratum, index, kept = np.unique(self.strata, return_inverse=True, return_counts=True)
+        population = np.array([self.stratum_rows[int(key)] for key in stratum], dtype=np.float64)
+        weights = (population / kept)[index]
+        order = np.argsort(self.ids)
+        return self.ids[order], weights[order]
+
+    def training_set(self, db: Session, now: Optional[datetime] = None) -> Tuple[pd.DataFrame, np.ndarray]:
+        """
+        Update the sample, then load the static features of the recent window
+        and the sampled rows, with their sample weights (mean 1)
+        """
+        self.update(db, now)
+        with self._lock:
+            cutoff = self.cutoff
+            ids, importance = self.importance()
+
+        id_column = Intelligence.id.label("id")
+        parts = [load_static_training_frame(db, since=cutoff, key_columns=[id_column])]
+        for start in range(0, len(ids), ID_BATCH_SIZE):
+            batch = ids[start:start + ID_BATCH_SIZE]
+            parts.append(load_static_training_frame(
+                db, conditions=[Intelligence.id.in_(batch.tolist()), Intelligence.timestamp < cutoff],
+                key_columns=[id_column]
+            ))
+        frame = pd.concat(parts, ignore_index=True)
+
+        # Rows after the recent window are sampled ones; sampled reports that were deleted are simply missing
+        recent = len(parts[0])
+        weights = np.ones(len(frame))
+        weights[recent:] = importance[np.searchsorted(ids, frame.pop("id").to_numpy()[recent:])]
+
+        if len(frame):
+            age_days = (frame["timestamp"].max() - frame["timestamp"]).dt.total_seconds().to_numpy() / (24 * 3600)
+            weights *= 0.5 ** (age_days / self.half_life_days)
+            weights /= weights.mean()
+        return frame, weights
+
+
+training_reservoir = TrainingReservoir(
+    settings.TRAINING_RESERVOIR_ROWS,
+    settings.TRAINING_RECENT_DAYS,
+    settings.TRAINING_HALF_LIFE_DAYS,
+    settings.TRAINING_RESERVOIR_REBUILD_HOURS
+)
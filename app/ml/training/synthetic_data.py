@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from typing import List, Dict
 
 from app.models.models import Parish, Intelligence
+from app.ml.features.materialized import store_static_features
 from app.schemas.intelligence import IntelligenceType
 
 def generate_synthetic_intelligence(db: Session, num_records: int = 1000) -> List[Dict]:
@@ -277,7 +278,8 @@ def generate_synthetic_intelligence(db: Session, num_records: int = 1000) -> Lis
     return synthetic_data
 
 def save_synthetic_data_to_db(db: Session, data: List[Dict]) -> None:
-    """Save synthetic intelligence data to the database"""
+    """Save synthetic intelligence data, with its static feature vectors, to the database"""
+    records = []
     for record in data:
         # Convert NumPy data types to Python native types
         processed_record = {}
@@ -289,5 +291,8 @@ def save_synthetic_data_to_db(db: Session, data: List[Dict]) -> None:
         
         intelligence = Intelligence(**processed_record)
         db.add(intelligence)
+        records.append(intelligence)
     
+    db.flush()
+    store_static_features(db, records)
     db.commit()
\ No newline at end of file
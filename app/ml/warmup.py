@@ -0,0 +1,138 @@
+# app/ml/warmup.py
+"""
+Worker warm-up, started in a background thread by the startup event. /ready
+answers 503 until it has finished, so load balancers only route to workers
+that have:
+
+- loaded the parish reference data,
+- imported pandas and scikit-learn (deferred at import time),
+- loaded the newest ModelVersion into the shared model cache,
+- run a synthetic batch through featurize -> predict, half of it from stored
+  vectors and half featurized on the fly, and an allocation dry run.
+
+Failed warm-ups are retried every WARMUP_RETRY_SECONDS. Without a trained
+model the worker stays not ready (status "failed") unless WARMUP_REQUIRE_MODEL
+is off, in which case it serves the severity heuristic.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.reference_data import INTELLIGENCE_TYPES, refresh_reference_data
+from app.models.models import Intelligence
+
+
+class WarmupState:
+    def __init__(self):
+        self.status = "pending"  # pending, warming, ready or failed
+        self.error: Optional[str] = None
+        self.model_version: Optional[int] = None
+        self.steps: Dict[str, float] = {}  # Seconds per step
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    @contextmanager
+    def step(self, name: str):
+        start = time.perf_counter()
+        yield
+        self.steps[name] = round(time.perf_counter() - start, 4)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "error": self.error,
+            "model_version": self.model_version,
+            "steps": dict(self.steps),
+            "seconds": round(self.finished_at - self.started_at, 4) if self.finished_at and self.started_at else None,
+        }
+
+
+warmup_state = WarmupState()
+
+
+def synthetic_frame(parish_ids):
+    """One report per parish and intelligence type, shaped like read_intelligence_frame output"""
+    from app.ml.features.materialized import encode_vectors, feature_engineer
+    from app.ml.training.data_loader import records_frame
+
+    now = datetime.now()
+    pairs = [(parish_id, intel_type) for parish_id in parish_ids for intel_type in sorted(INTELLIGENCE_TYPES)]
+    records = [
+        Intelligence(type=intel_type, parish_id=parish_id, severity=1 + index % 10, confidence=0.7,
+                     is_verified=index % 2 == 0, feedback_score=0, timestamp=now)
+        for index, (parish_id, intel_type) in enumerate(pairs)
+    ]
+    frame = records_frame(records)
+    vectors = encode_vectors(feature_engineer.add_static_features(frame))
+    # Every other row without a vector, so both featurization paths run
+    frame["vector"] = [vector if index % 2 == 0 else None for index, vector in enumerate(vectors)]
+    return frame
+
+
+def warm_up(session_scope, state: WarmupState = warmup_state) -> WarmupState:
+    """Run every warm-up step; failures are recorded in state, not raised"""
+    state.status, state.error, state.steps = "warming", None, {}
+    state.started_at = time.time()
+    try:
+        with session_scope() as db:
+            with state.step("reference_data"):
+                reference = refresh_reference_data(db)
+
+            with state.step("imports"):
+                from app.ml.models.crime_prediction import CrimePredictionModel, model_cache
+                from app.ml.models.resource_allocator import ResourceAllocator
+
+            with state.step("model"):
+                loaded = model_cache.latest(db)
+            if loaded is None and settings.WARMUP_REQUIRE_MODEL:
+                raise RuntimeError("No trained crime_prediction model in the database (run train_and_allocate.py)")
+            state.model_version = loaded.version if loaded else None
+
+            parish_ids = reference.parish_ids.tolist()
+            with state.step("predict"):
+                model = CrimePredictionModel(db)
+                if model.is_trained:
+                    frame = synthetic_frame(parish_ids)
+                    severities = model.predict_severities(frame)
+                    parish_column = frame["parish_id"].to_numpy()
+                    mean_severity = (np.bincount(parish_column, weights=severities)
+                                     / np.maximum(np.bincount(parish_column), 1))
+                    crime_levels = {
+                        parish_id: int(min(100, max(0, mean_severity[parish_id] * 10))) for parish_id in parish_ids
+                    }
+                else:
+                    crime_levels = {parish_id: 20 for parish_id in parish_ids}
+
+            with state.step("allocate"):
+                ResourceAllocator().plan_allocation(db, crime_levels)
+    except Exception as e:
+        state.status, state.error = "failed", f"{type(e).__name__}: {e}"
+        print(f"Warm-up failed, retrying in {settings.WARMUP_RETRY_SECONDS} s: {state.error}")
+    else:
+        state.status = "ready"
+        print(f"Warm-up finished in {time.time() - state.started_at:.2f} s (model version {state.model_version})")
+    state.finished_at = time.time()
+    return state
+
+
+def start_warmup(session_scope) -> threading.Thread:
+    """
+    Warm up in a background thread so the worker can answer /ready meanwhile,
+    retrying until it succeeds (e.g. once the first model has been trained)
+    """
+    def run():
+        while not warm_up(session_scope).ready:
+            time.sleep(settings.WARMUP_RETRY_SECONDS)
+
+    thread = threading.Thread(target=run, daemon=True, name="warm-up")
+    thread.start()
+    return thread
@@ -41,6 +41,14 @@ class Intelligence(Base):
     # Relationships
     parish = relationship("Parish", back_populates="intelligence_items")
 
+class IntelligenceFeatures(Base):
+    __tablename__ = "intelligence_features"
+    
+    # Static per-row features (FeatureEngineer.add_static_features) written at ingestion
+    intelligence_id = Column(Integer, ForeignKey("intelligence.id", ondelete="CASCADE"), primary_key=True)
+    schema_version = Column(String(16), nullable=False)  # Changes whenever the static feature columns do
+    vector = Column(LargeBinary, nullable=False)  # float32 values in schema order, timestamp excluded
+
 class Prediction(Base):
     __tablename__ = "predictions"
     
@@ -60,6 +68,7 @@ class ModelVersion(Base):
     model_type = Column(String(50), nullable=False)
     accuracy = Column(Float)
     features = Column(JSON)  # JSONB in PostgreSQL
+    feature_stats = Column(JSON)  # Recency reference time and normalization statistics from training
     binary_data = Column(LargeBinary)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -0,0 +1,23 @@
+# app/schemas/history.py
+from datetime import datetime
+from typing import List
+from pydantic import BaseModel
+
+class HistoryPoint(BaseModel):
+    bucket_start: datetime
+    samples: int
+    avg: float
+    min: float
+    max: float
+
+class ParishHistory(BaseModel):
+    parish_id: int
+    predicted_crime_level: List[HistoryPoint] = []
+    recommended_officers: List[HistoryPoint] = []
+    allocated_officers: List[HistoryPoint] = []
+
+class HistoryResponse(BaseModel):
+    bucket: str  # "hour", "day", "week" or "month"
+    start: datetime
+    end: datetime
+    parishes: List[ParishHistory]
@@ -2,6 +2,7 @@
 from sqlalchemy.orm import Session
 from typing import Dict, Any, List
 
+from app.core.cache import response_cache
 from app.models.models import Parish
 from app.ml.models.resource_allocator import ResourceAllocator
 
@@ -33,6 +34,7 @@ def execute_allocation_plan(db: Session, allocation: Dict[int, int]) -> Dict[str
             total_officers += officers
     
     db.commit()
+    response_cache.invalidate("parishes", "parish_stats", "insights")
     
     # Return execution summary
     return {
@@ -0,0 +1,172 @@
+# app/services/duplicates.py
+import hashlib
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.models import Intelligence
+
+ReportKey = Tuple[int, str]  # (parish_id, intelligence type)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def simhash(text: str, shingle_size: int = 1) -> int:
+    """
+    64-bit SimHash of the word shingles in text; similar texts differ in few bits.
+    Single words work best for descriptions as short as intelligence reports.
+    """
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) >= shingle_size:
+        features = [" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)]
+    else:
+        features = [" ".join(tokens)]
+
+    weights = [0] * 64
+    for feature in features:
+        value = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class RecentReportIndex:
+    """
+    Sliding-window index of recent (parish_id, type) submissions.
+
+    Counts are kept per time bucket plus a running total per key, so a lookup is a
+    dict access and expiry only touches the buckets that fell out of the window.
+    With SimHash enabled each bucket also keeps description fingerprints, and a
+    report only counts as a duplicate when a recent one has a similar description.
+    """
+    def __init__(
+        self,
+        window_seconds: Optional[int] = None,
+        bucket_seconds: Optional[int] = None,
+        simhash_enabled: Optional[bool] = None,
+        simhash_max_distance: Optional[int] = None
+    ):
+        self.window_seconds = window_seconds or settings.DUPLICATE_WINDOW_SECONDS
+        self.bucket_seconds = bucket_seconds or settings.DUPLICATE_BUCKET_SECONDS
+        self.simhash_enabled = settings.DUPLICATE_SIMHASH_ENABLED if simhash_enabled is None else simhash_enabled
+        self.simhash_max_distance = (
+            settings.DUPLICATE_SIMHASH_MAX_DISTANCE if simhash_max_distance is None else simhash_max_distance
+        )
+        self.bucket_count = max(1, self.window_seconds // self.bucket_seconds)
+
+        self._buckets: Dict[int, Dict[ReportKey, int]] = {}
+        self._fingerprints: Dict[int, Dict[ReportKey, List[int]]] = {}
+        self._totals: Dict[ReportKey, int] = {}
+        self._oldest_bucket: Optional[int] = None
+        self._seeded = False
+        self._lock = threading.Lock()
+
+    def _bucket(self, timestamp: Optional[datetime]) -> int:
+        seconds = timestamp.timestamp() if timestamp is not None else time.time()
+        return int(seconds // self.bucket_seconds)
+
+    def _expire(self, current_bucket: int) -> None:
+        """Drop buckets that are no longer inside the window ending at current_bucket"""
+        first_live = current_bucket - self.bucket_count + 1
+        if self._oldest_bucket is None or self._oldest_bucket >= first_live:
+            return
+
+        if first_live - self._oldest_bucket > len(self._buckets):
+            expired = [bucket for bucket in self._buckets if bucket < first_live]
+        else:
+            expired = range(self._oldest_bucket, first_live)
+
+        for bucket in expired:
+            self._fingerprints.pop(bucket, None)
+            for key, count in self._buckets.pop(bucket, {}).items():
+                remaining = self._totals.get(key, 0) - count
+                if remaining > 0:
+                    self._totals[key] = remaining
+                else:
+                    self._totals.pop(key, None)
+        self._oldest_bucket = first_live
+
+    def record(
+        self,
+        parish_id: int,
+        intel_type: str,
+        timestamp: Optional[datetime] = None,
+        description: Optional[str] = None
+    ) -> None:
+        """Add a submission to the index (call on every intelligence write path)"""
+        key = (parish_id, intel_type)
+        bucket = self._bucket(timestamp)
+
+        with self._lock:
+            current_bucket = self._bucket(None)
+            self._expire(current_bucket)
+            if bucket <= current_bucket - self.bucket_count:
+                return  # Already outside the window
+
+            counts = self._buckets.setdefault(bucket, {})
+            counts[key] = counts.get(key, 0) + 1
+            self._totals[key] = self._totals.get(key, 0) + 1
+            if self._oldest_bucket is None or bucket < self._oldest_bucket:
+                self._oldest_bucket = bucket
+
+            if self.simhash_enabled and description:
+                self._fingerprints.setdefault(bucket, {}).setdefault(key, []).append(simhash(description))
+
+    def count(self, parish_id: int, intel_type: str) -> int:
+        """Number of submissions for (parish_id, type) inside the window"""
+        with self._lock:
+            self._expire(self._bucket(None))
+            return self._totals.get((parish_id, intel_type), 0)
+
+    def is_duplicate(self, parish_id: int, intel_type: str, description: Optional[str] = None) -> bool:
+        """Whether a similar report was submitted inside the window"""
+        key = (parish_id, intel_type)
+        with self._lock:
+            self._expire(self._bucket(None))
+            if not self._totals.get(key):
+                return False
+            if not (self.simhash_enabled and description):
+                return True
+
+            fingerprint = simhash(description)
+            return any(
+                hamming_distance(fingerprint, other) <= self.simhash_max_distance
+                for bucket in self._fingerprints.values()
+                for other in bucket.get(key, ())
+            )
+
+    def seed(self, db: Session) -> None:
+        """Load the submissions of the current window from the database"""
+        since = datetime.now() - timedelta(seconds=self.window_seconds)
+        columns = [Intelligence.parish_id, Intelligence.type, Intelligence.timestamp]
+        if self.simhash_enabled:
+            columns.append(Intelligence.description)
+
+        rows = db.query(*columns).filter(Intelligence.timestamp > since).all()
+
+        with self._lock:
+            self._buckets.clear()
+            self._fingerprints.clear()
+            self._totals.clear()
+            self._oldest_bucket = None
+
+        for row in rows:
+            self.record(row[0], row[1], row[2], row[3] if self.simhash_enabled else None)
+        self._seeded = True
+
+    def ensure_seeded(self, db: Session) -> None:
+        if not self._seeded:
+            self.seed(db)
+
+
+recent_reports = RecentReportIndex()
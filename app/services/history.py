@@ -0,0 +1,285 @@
+# app/services/history.py
+import math
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, literal_column
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.models import Prediction, ResourceAllocation
+
+# Supported bucket sizes, finest first
+BUCKETS = ["hour", "day", "week", "month"]
+
+# Shortest bucket widths, only used to size the response (months count as 28 days,
+# so a range never holds more buckets than estimated)
+BUCKET_SECONDS = {
+    "hour": 3600,
+    "day": 24 * 3600,
+    "week": 7 * 24 * 3600,
+    "month": 28 * 24 * 3600,
+}
+
+# SQLite has no date_trunc, so buckets are rendered with strftime instead
+SQLITE_BUCKET_FORMATS = {
+    "hour": ("%Y-%m-%d %H:00:00",),
+    "day": ("%Y-%m-%d 00:00:00",),
+    "week": ("%Y-%m-%d 00:00:00", "weekday 0", "-6 days"),
+    "month": ("%Y-%m-01 00:00:00",),
+}
+
+# Series exposed for each history source: (source table, timestamp column, metric columns)
+HISTORY_SOURCES = {
+    "predictions": (Prediction, Prediction.timestamp, {
+        "predicted_crime_level": Prediction.predicted_crime_level,
+        "recommended_officers": Prediction.recommended_officers,
+    }),
+    "allocations": (ResourceAllocation, ResourceAllocation.timestamp, {
+        "allocated_officers": ResourceAllocation.allocated_officers,
+    }),
+}
+
+# Metric series returned per parish
+METRICS_PER_PARISH = sum(len(metrics) for _, _, metrics in HISTORY_SOURCES.values())
+
+
+def truncate_timestamp(value: datetime, bucket: str) -> datetime:
+    """Round a timestamp down to the start of its bucket (same rules as date_trunc)"""
+    if bucket == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    day_start = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if bucket == "day":
+        return day_start
+    if bucket == "week":
+        return day_start - timedelta(days=day_start.weekday())
+    if bucket == "month":
+        return day_start.replace(day=1)
+    raise ValueError(f"Unsupported bucket '{bucket}'")
+
+
+def choose_bucket(start: datetime, end: datetime, requested: str, series_count: int = 1) -> str:
+    """
+    Pick the finest bucket (no finer than the one requested) that keeps
+    series_count series within HISTORY_MAX_POINTS points in total
+    """
+    budget = max(1, settings.HISTORY_MAX_POINTS // max(1, series_count))
+    span = (end - start).total_seconds()
+
+    first = 0 if requested == "auto" else BUCKETS.index(requested)
+    for bucket in BUCKETS[first:]:
+        # A range that does not start on a bucket boundary touches one bucket more
+        if math.ceil(span / BUCKET_SECONDS[bucket]) + 1 <= budget:
+            return bucket
+
+    return BUCKETS[-1]
+
+
+class ClosedBucketCache:
+    """
+    Keeps the rows of buckets that can no longer change (they ended before the
+    current bucket started), so sliding dashboard windows only query the tail.
+    Each key holds one contiguous covered range [start, end).
+    """
+    def __init__(self, max_rows: int = 50000):
+        self.max_rows = max_rows
+        self._entries: Dict[Tuple, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, key: Tuple, start: datetime) -> Optional[Dict[str, Any]]:
+        """Return the cached range for key if it covers start"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry["start"] <= start < entry["end"]:
+                return entry
+        return None
+
+    def store(self, key: Tuple, start: datetime, end: datetime, rows: List[Tuple]) -> None:
+        """Add closed rows for [start, end), extending the range if it is contiguous"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry["start"] <= start <= entry["end"]:
+                known = {row[1] for row in entry["rows"]}
+                rows = entry["rows"] + [row for row in rows if row[1] not in known]
+                start = entry["start"]
+                end = max(end, entry["end"])
+
+            if len(rows) > self.max_rows:
+                # Too much history for one key; start over rather than grow without bound
+                self._entries.pop(key, None)
+                return
+
+            self._entries[key] = {"start": start, "end": end, "rows": rows}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+closed_bucket_cache = ClosedBucketCache()
+
+
+def bucket_expression(db: Session, bucket: str, column):
+    """SQL expression that truncates column to the start of its bucket"""
+    # The bucket name comes from a fixed whitelist, so it is safe to inline.
+    # Inlining also keeps the SELECT and GROUP BY expressions identical for PostgreSQL.
+    if db.bind.dialect.name == "postgresql":
+        return func.date_trunc(literal_column(f"'{bucket}'"), column)
+
+    fmt, *modifiers = SQLITE_BUCKET_FORMATS[bucket]
+    return func.strftime(
+        literal_column(f"'{fmt}'"),
+        column,
+        *[literal_column(f"'{modifier}'") for modifier in modifiers]
+    )
+
+
+def to_datetime(value) -> datetime:
+    """
+    Normalise bounds and the bucket values returned by the different backends to
+    naive local datetimes, the way history rows are written (datetime.now())
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def local_now() -> datetime:
+    """The current time in the same convention as to_datetime"""
+    return to_datetime(datetime.now().astimezone())
+
+
+def _query_buckets(
+    db: Session,
+    source: str,
+    bucket: str,
+    start: datetime,
+    end: datetime,
+    parish_id: Optional[int]
+) -> List[Tuple]:
+    """
+    Aggregate one history source per (parish, bucket) in a single statement.
+    Rows are (parish_id, bucket_start, samples, avg, min, max, avg, min, max, ...)
+    with one avg/min/max triple per metric of the source.
+    """
+    model, timestamp_column, metrics = HISTORY_SOURCES[source]
+    bucket_start = bucket_expression(db, bucket, timestamp_column).label("bucket_start")
+
+    aggregates = []
+    for column in metrics.values():
+        aggregates.extend([func.avg(column), func.min(column), func.max(column)])
+
+    query = db.query(
+        model.parish_id,
+        bucket_start,
+        func.count(model.id),
+        *aggregates
+    ).filter(
+        timestamp_column >= start,
+        timestamp_column < end
+    )
+
+    if parish_id is not None:
+        query = query.filter(model.parish_id == parish_id)
+
+    rows = query.group_by(model.parish_id, bucket_start).order_by(model.parish_id, bucket_start).all()
+    return [(row[0], to_datetime(row[1]), *row[2:]) for row in rows]
+
+
+def _load_rows(
+    db: Session,
+    source: str,
+    bucket: str,
+    start: datetime,
+    end: datetime,
+    parish_id: Optional[int]
+) -> List[Tuple]:
+    """Rows for [start, end), served from the closed bucket cache where possible"""
+    key = (source, parish_id, bucket)
+    now = local_now()
+    closed_end = min(truncate_timestamp(end, bucket), truncate_timestamp(now, bucket))
+
+    cached = []
+    query_start = start
+    entry = closed_bucket_cache.lookup(key, start)
+    if entry:
+        cached = [row for row in entry["rows"] if start <= row[1] < min(entry["end"], end)]
+        query_start = entry["end"]
+
+    fresh = []
+    if query_start < end:
+        fresh = _query_buckets(db, source, bucket, query_start, end, parish_id)
+        if closed_end > query_start:
+            closed_bucket_cache.store(
+                key,
+                query_start,
+                closed_end,
+                [row for row in fresh if row[1] < closed_end]
+            )
+
+    return cached + fresh
+
+
+def get_history(
+    db: Session,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    bucket: str = "auto",
+    parish_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Downsampled prediction and allocation history for one parish, or for every
+    parish when parish_id is None. The response holds at most HISTORY_MAX_POINTS
+    points across all series, coarsening the bucket (and finally the range) as needed.
+    Timezone-aware bounds are converted to naive local time, like the stored rows.
+    """
+    if bucket != "auto" and bucket not in BUCKETS:
+        raise ValueError(f"Invalid bucket. Must be one of: auto, {', '.join(BUCKETS)}")
+
+    end = to_datetime(end or local_now())
+    start = to_datetime(start or end - timedelta(days=settings.HISTORY_DEFAULT_DAYS))
+    if start >= end:
+        raise ValueError("'from' must be earlier than 'to'")
+
+    parish_count = 1 if parish_id is not None else settings.TOTAL_PARISHES
+    series_count = parish_count * METRICS_PER_PARISH
+    bucket = choose_bucket(start, end, bucket, series_count)
+
+    # Even monthly buckets do not fit: keep only the most recent part of the range
+    budget = max(1, settings.HISTORY_MAX_POINTS // series_count)
+    earliest = end - timedelta(seconds=BUCKET_SECONDS[bucket] * (budget - 1))
+    start = truncate_timestamp(max(start, earliest), bucket)
+
+    parishes: Dict[int, Dict[str, List[Dict[str, Any]]]] = {}
+    if parish_id is not None:
+        parishes[parish_id] = {}
+
+    for source, (_, _, metrics) in HISTORY_SOURCES.items():
+        for row in _load_rows(db, source, bucket, start, end, parish_id):
+            row_parish_id, bucket_start, samples = row[0], row[1], row[2]
+            series = parishes.setdefault(row_parish_id, {})
+
+            for i, metric in enumerate(metrics):
+                avg_value, min_value, max_value = row[3 + 3 * i: 6 + 3 * i]
+                if avg_value is None:
+                    continue
+                series.setdefault(metric, []).append({
+                    "bucket_start": bucket_start,
+                    "samples": samples,
+                    "avg": float(avg_value),
+                    "min": float(min_value),
+                    "max": float(max_value)
+                })
+
+    return {
+        "bucket": bucket,
+        "start": start,
+        "end": end,
+        "parishes": [
+            {"parish_id": pid, **series}
+            for pid, series in sorted(parishes.items(), key=lambda item: item[0] or 0)
+        ]
+    }
@@ -1,23 +1,27 @@
 # app/services/insights.py
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import func, case
 from datetime import datetime, timedelta
 
 from app.models.models import Intelligence, Parish, Prediction
 from app.ml.models.resource_allocator import ResourceAllocator
 from app.ml.models.crime_prediction import CrimePredictionModel
+from app.services.trends import trend_engine
 
 class InsightsGenerator:
     def __init__(self, db: Session):
         self.db = db
         self.resource_allocator = ResourceAllocator()
-        self.prediction_model = CrimePredictionModel()
+        self.prediction_model = CrimePredictionModel(db)
     
-    def generate_resource_insights(self) -> List[Dict[str, Any]]:
+    def generate_resource_insights(self, read_only: bool = True) -> List[Dict[str, Any]]:
         """
         Generate insights about resource allocation based on recent intelligence
         Returns a list of resource adjustment recommendations
+
+        With read_only (the default) the new crime levels and allocation are only
+        computed, not persisted; pass read_only=False to also apply them.
         """
         # Get current allocations
         parishes = self.db.query(Parish).all()
@@ -25,24 +29,31 @@ class InsightsGenerator:
         parish_names = {parish.id: parish.name for parish in parishes}
         
         # Update crime level predictions
-        for parish in parishes:
-            crime_level = self.prediction_model.predict_crime_level(self.db, parish.id)
-            parish.current_crime_level = crime_level
-        
-        self.db.commit()
+        crime_levels = self.prediction_model.predict_crime_levels(self.db, list(parish_names))
         
         # Get new recommended allocations
-        new_allocations = self.resource_allocator.allocate_resources(self.db)
+        if read_only:
+            _, new_allocations = self.resource_allocator.plan_allocation(self.db, crime_levels)
+        else:
+            for parish in parishes:
+                parish.current_crime_level = crime_levels[parish.id]
+            self.db.commit()
+            new_allocations = self.resource_allocator.allocate_resources(self.db)
+        
+        # Per-parish intelligence aggregates for every parish at once
+        aggregates = self._get_parish_aggregates()
         
         # Generate insights based on differences
         insights = []
         for parish_id, new_count in new_allocations.items():
-            current_count = current_allocations.get(parish_id, 0)
+            current_count = current_allocations.get(parish_id) or 0
             difference = new_count - current_count
             
             if abs(difference) >= 5:  # Only suggest significant changes
+                stats = aggregates.get(parish_id, self._empty_aggregate())
+                
                 # Determine confidence based on recent intelligence volume
-                recent_intelligence = self._get_recent_intelligence_count(parish_id)
+                recent_intelligence = stats["count_14d"]
                 
                 if recent_intelligence > 20:
                     confidence = "high"
@@ -56,7 +67,7 @@ class InsightsGenerator:
                 
                 if difference > 0:
                     action = "Increase"
-                    reason = self._get_increase_reason(parish_id)
+                    reason = self._get_increase_reason(stats)
                 else:
                     action = "Reduce"
                     reason = self._get_decrease_reason(parish_id)
@@ -78,32 +89,56 @@ class InsightsGenerator:
         
         return insights
     
-    def _get_recent_intelligence_count(self, parish_id: int) -> int:
-        """Get count of intelligence from the last 14 days for a parish"""
-        two_weeks_ago = datetime.now() - timedelta(days=14)
-        return self.db.query(func.count(Intelligence.id)).filter(
-            Intelligence.parish_id == parish_id,
+    @staticmethod
+    def _empty_aggregate() -> Dict[str, Any]:
+        return {
+            "count_14d": 0,
+            "count_7d": 0,
+            "severity_7d": 0,
+            "top_type_7d": None,
+            "top_type_count_7d": 0
+        }
+    
+    def _get_parish_aggregates(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Gather every per-parish figure the insight reasons need in one grouped query:
+        14-day count and 7-day count/severity per type (for the top type and
+        average severity).
+        """
+        now = datetime.now()
+        two_weeks_ago = now - timedelta(days=14)
+        week_ago = now - timedelta(days=7)
+        
+        in_last_week = Intelligence.timestamp > week_ago
+        rows = self.db.query(
+            Intelligence.parish_id,
+            Intelligence.type,
+            func.sum(case((Intelligence.timestamp > two_weeks_ago, 1), else_=0)),
+            func.sum(case((in_last_week, 1), else_=0)),
+            func.sum(case((in_last_week, Intelligence.severity), else_=0))
+        ).filter(
             Intelligence.timestamp > two_weeks_ago
-        ).scalar()
+        ).group_by(Intelligence.parish_id, Intelligence.type).all()
+        
+        aggregates: Dict[int, Dict[str, Any]] = {}
+        for parish_id, intel_type, count_14d, count_7d, severity_7d in rows:
+            stats = aggregates.setdefault(parish_id, self._empty_aggregate())
+            stats["count_14d"] += count_14d or 0
+            stats["count_7d"] += count_7d or 0
+            stats["severity_7d"] += severity_7d or 0
+            if (count_7d or 0) > stats["top_type_count_7d"]:
+                stats["top_type_7d"] = intel_type
+                stats["top_type_count_7d"] = count_7d
+        
+        return aggregates
     
-    def _get_increase_reason(self, parish_id: int) -> str:
+    def _get_increase_reason(self, stats: Dict[str, Any]) -> str:
         """Generate a reason for increasing officers"""
-        # Get most common intelligence types for this parish recently
-        week_ago = datetime.now() - timedelta(days=7)
-        common_type = self.db.query(
-            Intelligence.type, 
-            func.count(Intelligence.id).label('count')
-        ).filter(
-            Intelligence.parish_id == parish_id,
-            Intelligence.timestamp > week_ago
-        ).group_by(Intelligence.type).order_by(desc('count')).first()
+        # Most common intelligence type for this parish recently
+        intel_type = stats["top_type_7d"]
         
-        if common_type:
-            intel_type = common_type[0]
-            high_severity = self.db.query(func.avg(Intelligence.severity)).filter(
-                Intelligence.parish_id == parish_id,
-                Intelligence.timestamp > week_ago
-            ).scalar() or 0
+        if intel_type:
+            high_severity = stats["severity_7d"] / stats["count_7d"] if stats["count_7d"] else 0
             
             if high_severity > 7:
                 severity_text = "high-severity"
@@ -118,20 +153,8 @@ class InsightsGenerator:
     
     def _get_decrease_reason(self, parish_id: int) -> str:
         """Generate a reason for decreasing officers"""
-        month_ago = datetime.now() - timedelta(days=30)
-        
-        # Check if intelligence volume has decreased
-        old_count = self.db.query(func.count(Intelligence.id)).filter(
-            Intelligence.parish_id == parish_id,
-            Intelligence.timestamp.between(month_ago, month_ago + timedelta(days=15))
-        ).scalar()
-        
-        new_count = self.db.query(func.count(Intelligence.id)).filter(
-            Intelligence.parish_id == parish_id,
-            Intelligence.timestamp > (month_ago + timedelta(days=15))
-        ).scalar()
-        
-        if old_count > new_count * 1.5:
+        # Check if intelligence volume has decreased (shared rolling-window trend test)
+        if trend_engine.trends(self.db).get(parish_id) == "decreasing":
             return "Decrease due to significant reduction in reported incidents"
         
-        return "Resources needed more urgently in other areas based on relative crime levels"
\ No newline at end of file
+        return "Resources needed more urgently in other areas based on relative crime levels"
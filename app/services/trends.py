@@ -0,0 +1,180 @@
+# app/services/trends.py
+import threading
+import time
+from datetime import date, datetime
+from typing import Dict, Optional
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.models import Intelligence
+from app.services.history import bucket_expression
+
+TREND_LABELS = np.array(["decreasing", "stable", "increasing"])
+
+
+def classify_trends(recent: np.ndarray, previous: np.ndarray, test: Optional[str] = None) -> np.ndarray:
+    """
+    Classify report volume in the latest window against the window before it,
+    for many parishes at once. Returns an array of trend labels.
+
+    "poisson": under equal rates the recent count is Binomial(recent + previous, 0.5),
+    so the normal-approximation z score (with continuity correction) is compared
+    against TREND_Z_THRESHOLD.
+    "ratio": one window has to exceed the other by TREND_RATIO.
+    """
+    recent = np.asarray(recent, dtype=np.float64)
+    previous = np.asarray(previous, dtype=np.float64)
+    test = test or settings.TREND_TEST
+
+    if test == "ratio":
+        increasing = recent > previous * settings.TREND_RATIO
+        decreasing = previous > recent * settings.TREND_RATIO
+    elif test == "poisson":
+        total = recent + previous
+        difference = np.maximum(np.abs(recent - previous) - 1.0, 0.0)
+        z = np.divide(difference, np.sqrt(total), out=np.zeros_like(total), where=total > 0)
+        significant = z > settings.TREND_Z_THRESHOLD
+        increasing = significant & (recent > previous)
+        decreasing = significant & (recent < previous)
+    else:
+        raise ValueError(f"Unknown trend test '{test}'")
+
+    return TREND_LABELS[1 + increasing.astype(np.int8) - decreasing.astype(np.int8)]
+
+
+class TrendEngine:
+    """
+    Per-parish rolling windows of daily report counts and severity sums.
+
+    The days are kept in a ring buffer of 2 x TREND_WINDOW_DAYS columns (one row per
+    parish), loaded with one grouped query and then kept current by record() on the
+    write paths. Because other workers write too, the buffer is reloaded from the
+    database every TREND_REFRESH_SECONDS.
+    """
+    def __init__(self, window_days: Optional[int] = None, refresh_seconds: Optional[int] = None):
+        self.window_days = window_days or settings.TREND_WINDOW_DAYS
+        self.refresh_seconds = refresh_seconds if refresh_seconds is not None else settings.TREND_REFRESH_SECONDS
+        self.history_days = 2 * self.window_days
+
+        self._rows: Dict[int, int] = {}  # parish_id -> row in the buffers
+        self._counts = np.zeros((0, self.history_days), dtype=np.int32)
+        self._severity = np.zeros((0, self.history_days), dtype=np.int64)
+        self._current_day: Optional[int] = None  # ordinal of the newest day in the buffer
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _row(self, parish_id: int) -> int:
+        row = self._rows.get(parish_id)
+        if row is None:
+            row = len(self._rows)
+            self._rows[parish_id] = row
+            self._counts = np.vstack([self._counts, np.zeros((1, self.history_days), dtype=np.int32)])
+            self._severity = np.vstack([self._severity, np.zeros((1, self.history_days), dtype=np.int64)])
+        return row
+
+    def _advance(self, day: int) -> None:
+        """Move the newest day forward, clearing the slots of the days that fell out"""
+        if self._current_day is None or day <= self._current_day:
+            return
+        expired = min(day - self._current_day, self.history_days)
+        slots = np.arange(day - expired + 1, day + 1) % self.history_days
+        self._counts[:, slots] = 0
+        self._severity[:, slots] = 0
+        self._current_day = day
+
+    def load(self, db: Session) -> None:
+        """(Re)build the buffers from the database with one grouped query"""
+        today = date.today().toordinal()
+        first_day = datetime.fromordinal(today - self.history_days + 1)
+        day_start = bucket_expression(db, "day", Intelligence.timestamp).label("day")
+
+        rows = db.query(
+            Intelligence.parish_id,
+            day_start,
+            func.count(Intelligence.id),
+            func.coalesce(func.sum(Intelligence.severity), 0)
+        ).filter(
+            Intelligence.timestamp >= first_day
+        ).group_by(Intelligence.parish_id, day_start).all()
+
+        with self._lock:
+            self._counts[:] = 0
+            self._severity[:] = 0
+            self._current_day = today
+            for parish_id, day, count, severity_sum in rows:
+                # The day as truncated in the database's timezone (to_datetime would shift it to UTC)
+                day_number = (datetime.fromisoformat(day) if isinstance(day, str) else day).toordinal()
+                if parish_id is None or not (today - self.history_days < day_number <= today):
+                    continue
+                row = self._row(parish_id)
+                self._counts[row, day_number % self.history_days] += count
+                self._severity[row, day_number % self.history_days] += severity_sum
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """Force a reload on next use (e.g. after reports were edited or deleted)"""
+        with self._lock:
+            self._loaded_at = None
+
+    def _ensure_loaded(self, db: Session) -> None:
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > self.refresh_seconds:
+            self.load(db)
+
+    def record(self, parish_id: int, timestamp: Optional[datetime], severity: int) -> None:
+        """Add one new report to the rolling windows (no-op until the engine has loaded)"""
+        if self._loaded_at is None or parish_id is None:
+            return
+        day = (timestamp or datetime.now()).date().toordinal()
+
+        with self._lock:
+            self._advance(day)
+            if day <= self._current_day - self.history_days:
+                return
+            row = self._row(parish_id)
+            self._counts[row, day % self.history_days] += 1
+            self._severity[row, day % self.history_days] += severity or 0
+
+    def _window_sums(self, db: Session):
+        """Per-parish totals of both windows: (rows, recent/previous counts, recent/previous severity)"""
+        self._ensure_loaded(db)
+
+        with self._lock:
+            self._advance(date.today().toordinal())
+            # Slot order oldest -> newest across both windows
+            slots = np.arange(self._current_day - self.history_days + 1, self._current_day + 1) % self.history_days
+            counts = self._counts[:, slots]
+            severity = self._severity[:, slots]
+            rows = dict(self._rows)
+
+        w = self.window_days
+        return (
+            rows,
+            counts[:, w:].sum(axis=1), counts[:, :w].sum(axis=1),
+            severity[:, w:].sum(axis=1), severity[:, :w].sum(axis=1)
+        )
+
+    def window_stats(self, db: Session) -> Dict[int, Dict[str, int]]:
+        """Recent/previous window report counts and severity sums per parish"""
+        rows, recent_counts, previous_counts, recent_severity, previous_severity = self._window_sums(db)
+        return {
+            parish_id: {
+                "recent_count": int(recent_counts[row]),
+                "previous_count": int(previous_counts[row]),
+                "recent_severity": int(recent_severity[row]),
+                "previous_severity": int(previous_severity[row]),
+            }
+            for parish_id, row in rows.items()
+        }
+
+    def trends(self, db: Session) -> Dict[int, str]:
+        """Trend label for every parish that has reports, computed in one vectorized pass"""
+        rows, recent_counts, previous_counts, _, _ = self._window_sums(db)
+        labels = classify_trends(recent_counts, previous_counts)
+        return {parish_id: str(labels[row]) for parish_id, row in rows.items()}
+
+
+trend_engine = TrendEngine()
@@ -1,11 +1,13 @@
 # app/services/validation.py
 from typing import Dict, Any, List, Tuple
 from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
-from app.models.models import Intelligence, Parish
+from app.db import queries
+from app.core.reference_data import INTELLIGENCE_TYPES, parish_exists
 from app.schemas.intelligence import IntelligenceType
+from app.services.duplicates import recent_reports
 
 def validate_intelligence(data: Dict[str, Any], db: Session) -> Tuple[bool, str]:
     """
@@ -15,18 +17,15 @@ def validate_intelligence(data: Dict[str, Any], db: Session) -> Tuple[bool, str]
     # Check if parish exists
     parish_id = data.get("parish_id")
     if parish_id:
-        parish = db.query(Parish).filter(Parish.id == parish_id).first()
-        if not parish:
+        if not parish_exists(db, parish_id):
             return False, f"Parish with ID {parish_id} does not exist"
     else:
         return False, "Parish ID is required"
     
     # Validate intelligence type
     intel_type = data.get("type")
-    try:
-        # Ensure type is a valid enum value
-        IntelligenceType(intel_type)
-    except ValueError:
+    # Enum members hash by name, so compare on the plain value
+    if getattr(intel_type, "value", intel_type) not in INTELLIGENCE_TYPES:
         valid_types = [t.value for t in IntelligenceType]
         return False, f"Invalid intelligence type. Must be one of: {', '.join(valid_types)}"
     
@@ -44,14 +43,8 @@ def validate_intelligence(data: Dict[str, Any], db: Session) -> Tuple[bool, str]
         return False, "Description must be at least 10 characters long"
     
     # Check for potential duplicates (similar intelligence within the last hour)
-    one_hour_ago = datetime.now() - timedelta(hours=1)
-    recent_similar = db.query(Intelligence).filter(
-        Intelligence.parish_id == parish_id,
-        Intelligence.type == intel_type,
-        Intelligence.timestamp > one_hour_ago
-    ).count()
-    
-    if recent_similar > 0:
+    recent_reports.ensure_seeded(db)
+    if recent_reports.is_duplicate(parish_id, intel_type, description):
         # Not an error, but a warning that can be returned with the validation
         return True, "Warning: Similar intelligence was reported in the last hour"
     
@@ -62,43 +55,35 @@ def check_intelligence_trends(parish_id: int, db: Session) -> Dict[str, Any]:
     Analyze intelligence trends for a specific parish
     Returns metrics about intelligence reporting patterns
     """
-    # Get total intelligence count
-    total_count = db.query(func.count(Intelligence.id)).filter(
-        Intelligence.parish_id == parish_id
-    ).scalar()
-    
-    # Get average severity
-    avg_severity = db.query(func.avg(Intelligence.severity)).filter(
-        Intelligence.parish_id == parish_id
-    ).scalar() or 0.0
-    
-    # Get intelligence count by type
-    intel_by_type = {}
-    for intel_type in IntelligenceType:
-        count = db.query(func.count(Intelligence.id)).filter(
-            Intelligence.parish_id == parish_id,
-            Intelligence.type == intel_type.value
-        ).scalar()
-        intel_by_type[intel_type.value] = count
-    
-    # Get verified vs unverified ratio
-    verified_count = db.query(func.count(Intelligence.id)).filter(
-        Intelligence.parish_id == parish_id,
-        Intelligence.is_verified == True
-    ).scalar()
-    
-    # Calculate recent activity (last 7 days)
     week_ago = datetime.now() - timedelta(days=7)
-    recent_count = db.query(func.count(Intelligence.id)).filter(
-        Intelligence.parish_id == parish_id,
-        Intelligence.timestamp > week_ago
-    ).scalar()
+    intel_types = [intel_type.value for intel_type in IntelligenceType]
+    
+    # Every metric comes from one scan of the parish's rows
+    row = db.execute(
+        queries.intelligence_trends(parish_id, week_ago, intel_types, queries.supports_filter_clause(db.bind.dialect))
+    ).one()
+    return summarize_intelligence_trends(row, intel_types)
+
+def summarize_intelligence_trends(row, intel_types: List[str]) -> Dict[str, Any]:
+    """Shape a queries.intelligence_trends row into the trends response"""
+    total_count, avg_severity, verified_count, recent_count = row[:4]
+    intel_by_type = dict(zip(intel_types, row[4:]))
     
     return {
         "total_intelligence": total_count,
-        "average_severity": float(avg_severity),
+        "average_severity": float(avg_severity or 0.0),
         "intelligence_by_type": intel_by_type,
         "verified_count": verified_count,
         "unverified_count": total_count - verified_count,
         "recent_activity": recent_count
-    }
\ No newline at end of file
+    }
+
+async def check_intelligence_trends_async(parish_id: int, db: AsyncSession) -> Dict[str, Any]:
+    """check_intelligence_trends() for an AsyncSession (same statement)"""
+    week_ago = datetime.now() - timedelta(days=7)
+    intel_types = [intel_type.value for intel_type in IntelligenceType]
+    
+    result = await db.execute(
+        queries.intelligence_trends(parish_id, week_ago, intel_types, queries.supports_filter_clause(db.bind.dialect))
+    )
+    return summarize_intelligence_trends(result.one(), intel_types)
@@ -4,11 +4,13 @@ from fastapi import WebSocket, Depends, WebSocketDisconnect
 from sqlalchemy.orm import Session
 import json
 
+from app.core.cache import response_cache
+from app.core.reference_data import parish_exists
+from app.services.trends import trend_engine
+from app.services.duplicates import recent_reports
 from app.db.session import get_db
 from app.socket.manager import manager
 from app.models.models import Intelligence, Parish, Prediction
-from app.ml.models.crime_prediction import CrimePredictionModel
-from app.ml.models.resource_allocator import ResourceAllocator
 
 async def handle_subscribe(websocket: WebSocket, parish_id: int):
     """Handle subscription to parish updates"""
@@ -16,22 +18,30 @@ async def handle_subscribe(websocket: WebSocket, parish_id: int):
 
 async def handle_intelligence_create(data: Dict[str, Any], db: Session):
     """Handle new intelligence creation and broadcast updates"""
+    # Imported on first use, keeping pandas and scikit-learn out of the worker's startup
+    from app.ml.features.materialized import store_static_features
+    from app.ml.models.crime_prediction import CrimePredictionModel
+    from app.ml.models.resource_allocator import ResourceAllocator
+
     # Create new intelligence record
     new_intelligence = Intelligence(**data)
     db.add(new_intelligence)
+    db.flush()
+    store_static_features(db, [new_intelligence])
     db.commit()
     db.refresh(new_intelligence)
+    response_cache.invalidate("parish_stats", "insights")
+    trend_engine.record(new_intelligence.parish_id, new_intelligence.timestamp, new_intelligence.severity)
+    recent_reports.record(new_intelligence.parish_id, new_intelligence.type, new_intelligence.timestamp, new_intelligence.description)
     
     # Run prediction model for affected parish
-    prediction_model = CrimePredictionModel()
+    prediction_model = CrimePredictionModel(db)
     parish_id = new_intelligence.parish_id
     
-    # Get the parish
-    parish = db.query(Parish).filter(Parish.id == parish_id).first()
-    if parish:
+    if parish_exists(db, parish_id):
         # Update crime level prediction
         crime_level = prediction_model.predict_crime_level(db, parish_id)
-        parish.current_crime_level = crime_level
+        db.query(Parish).filter(Parish.id == parish_id).update({Parish.current_crime_level: crime_level})
         db.commit()
         
         # Create a prediction record
@@ -2,6 +2,11 @@
 from fastapi import WebSocket
 from typing import List, Dict, Any
 import json
+import time
+
+from app.core.metrics import (
+    websocket_broadcast_duration, websocket_broadcast_recipients, websocket_connections, websocket_send_errors
+)
 
 class ConnectionManager:
     def __init__(self):
@@ -38,26 +43,28 @@ class ConnectionManager:
             "parish_id": parish_id
         }))
     
-    async def broadcast(self, message: Dict[str, Any]):
-        """Send a message to all connected clients"""
-        for connection in self.active_connections:
+    async def _fan_out(self, connections: List[WebSocket], message: Dict[str, Any], scope: str):
+        """Send a message to each connection, recording the fan-out latency"""
+        start = time.perf_counter()
+        for connection in connections:
             try:
                 await connection.send_text(json.dumps(message))
             except Exception:
                 # Connection might be closed or invalid
-                pass
+                websocket_send_errors.inc(labels=(scope,))
+        websocket_broadcast_duration.observe(time.perf_counter() - start, (scope,))
+        websocket_broadcast_recipients.observe(len(connections), (scope,))
+    
+    async def broadcast(self, message: Dict[str, Any]):
+        """Send a message to all connected clients"""
+        await self._fan_out(self.active_connections, message, "all")
     
     async def broadcast_to_parish(self, parish_id: int, message: Dict[str, Any]):
         """Send a message to all clients subscribed to a specific parish"""
         if parish_id not in self.parish_subscribers:
             return
         
-        for connection in self.parish_subscribers[parish_id]:
-            try:
-                await connection.send_text(json.dumps(message))
-            except Exception:
-                # Connection might be closed or invalid
-                pass
+        await self._fan_out(self.parish_subscribers[parish_id], message, "parish")
     
     async def send_intelligence_update(self, intelligence_data: Dict[str, Any]):
         """Send intelligence update to relevant subscribers"""
@@ -91,4 +98,5 @@ class ConnectionManager:
             })
 
 # Create a global connection manager instance
-manager = ConnectionManager()
\ No newline at end of file
+manager = ConnectionManager()
+websocket_connections.set_function(lambda: len(manager.active_connections))
\ No newline at end of file
@@ -0,0 +1,21 @@
+# backfill_features.py
+import sys
+
+from app.db.init_db import init_db
+from app.db.session import SessionLocal
+from app.ml.features.materialized import backfill_static_features
+
+# Optional argument: reports per batch (defaults to TRAINING_CHUNK_SIZE)
+chunk_size = int(sys.argv[1]) if len(sys.argv) > 1 else None
+
+db = SessionLocal()
+
+try:
+    # Creates the intelligence_features table on databases that predate it
+    init_db(db)
+    
+    print("Backfilling static feature vectors...")
+    written = backfill_static_features(db, chunk_size)
+    print(f"Backfill complete: {written} feature vectors written")
+finally:
+    db.close()
@@ -0,0 +1,79 @@
+# benchmarks/bench_feature_store.py
+"""
+Retraining feature preparation: full re-featurization of the whole history
+(load_training_frame + extract_features) against the feature store, where a
+snapshot featurizes only the rows added since the previous one and
+memory-maps the rest from Parquet. Needs pyarrow.
+
+    BENCH_DB=bench_store.db python -m benchmarks.bench_feature_store --rows 1000000
+    BENCH_DB=bench_store_10m.db python -m benchmarks.bench_feature_store --rows 10000000
+"""
+import argparse
+import shutil
+import tempfile
+import time
+
+from sqlalchemy import func
+
+from benchmarks.common import BENCH_DATABASE_PATH, create_benchmark_engine, open_session, seed_intelligence
+from app.models.models import Intelligence
+from app.ml.features.feature_engineering import FeatureEngineer
+from app.ml.features.feature_store import FeatureStore
+from app.ml.training.data_loader import load_training_frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--new-rows", type=int, default=5_000, help="Rows added between the two snapshots")
+    parser.add_argument("--store", default=None, help="Feature store directory (default: a temporary one)")
+    args = parser.parse_args()
+
+    engine = create_benchmark_engine()
+    db = open_session()
+
+    existing = db.query(func.count(Intelligence.id)).scalar()
+    if existing < args.rows:
+        print(f"Seeding {args.rows - existing} intelligence rows into {BENCH_DATABASE_PATH}...")
+        seed_intelligence(engine, args.rows - existing)
+
+    store_path = args.store or tempfile.mkdtemp(prefix="jisp_feature_store_")
+    store = FeatureStore(store_path)
+    feature_engineer = FeatureEngineer()
+
+    start = time.perf_counter()
+    initial = store.snapshot(db)
+    print(f"Initial snapshot: {initial['rows']} rows, {len(initial['partitions'])} partitions "
+          f"in {time.perf_counter() - start:.1f} s")
+
+    # New reports arrive between retrains
+    seed_intelligence(engine, args.new_rows, days=1, seed=7)
+    total = db.query(func.count(Intelligence.id)).scalar()
+    print(f"Rows: {total} (+{args.new_rows} since the snapshot)")
+
+    start = time.perf_counter()
+    X, _ = feature_engineer.extract_features(load_training_frame(db))
+    full_seconds = time.perf_counter() - start
+    del X
+
+    start = time.perf_counter()
+    snapshot = store.snapshot(db)
+    snapshot_seconds = time.perf_counter() - start
+    static = store.load(snapshot["id"])
+    load_seconds = time.perf_counter() - start - snapshot_seconds
+    X, _ = feature_engineer.finalize_features(static)
+    store_seconds = time.perf_counter() - start
+    del X, static
+
+    print(f"{'full re-featurization':28s} {full_seconds:8.2f} s")
+    print(f"{'feature store':28s} {store_seconds:8.2f} s   (snapshot {snapshot_seconds:.2f} s, "
+          f"{snapshot['featurized_rows']} rows featurized; load {load_seconds:.2f} s; "
+          f"finalize {store_seconds - snapshot_seconds - load_seconds:.2f} s)")
+
+    db.close()
+    if args.store is None:
+        shutil.rmtree(store_path)
+
+
+if __name__ == "__main__":
+    main()
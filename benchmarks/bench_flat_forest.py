@@ -0,0 +1,79 @@
+# benchmarks/bench_flat_forest.py
+"""
+Prediction latency of the newest ModelVersion: sklearn's
+RandomForestClassifier.predict against the flattened forest evaluator that
+serving uses, on batches of real feature rows. Both must return identical
+predictions for every batch, or the benchmark fails.
+
+    BENCH_DB=bench_flat_forest.db python -m benchmarks.bench_flat_forest --batch-sizes 1,50,10000
+"""
+import argparse
+import pickle
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+
+from benchmarks.common import BENCH_DATABASE_PATH, create_benchmark_engine, open_session, seed_intelligence, time_calls
+from benchmarks.load_harness import ensure_trained_model
+from app.ml.features.feature_engineering import FeatureEngineer
+from app.ml.models.flat_forest import FlatForest
+from app.ml.training.data_loader import load_training_frame
+from app.models.models import Intelligence, ModelVersion
+
+
+def feature_rows(db, model_version: ModelVersion, rows: int) -> np.ndarray:
+    """The newest reports featurized the way predict_severities does"""
+    feature_engineer = FeatureEngineer()
+    frame = load_training_frame(db).iloc[-rows:].reset_index(drop=True)
+    X, feature_names = feature_engineer.finalize_features(
+        feature_engineer.add_static_features(frame),
+        reference_time=datetime.now(timezone.utc),
+        stats=model_version.feature_stats
+    )
+    return pd.DataFrame(X, columns=feature_names).reindex(columns=model_version.features, fill_value=0).values
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", default="1,50,10000")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--train-rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",")]
+
+    engine = create_benchmark_engine()
+    db = open_session()
+    existing = db.query(func.count(Intelligence.id)).scalar()
+    if existing < args.rows:
+        print(f"Seeding {args.rows - existing} intelligence rows into {BENCH_DATABASE_PATH}...")
+        seed_intelligence(engine, args.rows - existing)
+    ensure_trained_model(args.train_rows)
+
+    model_version = db.query(ModelVersion).filter(
+        ModelVersion.model_type == "crime_prediction", ModelVersion.binary_data.isnot(None)
+    ).order_by(ModelVersion.id.desc()).first()
+    estimator = pickle.loads(model_version.binary_data)
+    flat = FlatForest.from_estimator(estimator)
+    X = feature_rows(db, model_version, max(batch_sizes))
+    db.close()
+    print(f"Model version {model_version.id}: {len(estimator.estimators_)} trees, "
+          f"{len(flat.left)} nodes, max depth {max(tree.get_depth() for tree in estimator.estimators_)}")
+
+    print(f"{'batch':>8s} {'sklearn p50':>14s} {'flat p50':>12s} {'speedup':>8s}")
+    for size in batch_sizes:
+        batch = X[:size]
+        if not np.array_equal(flat.predict(batch), estimator.predict(batch)):
+            raise AssertionError(f"Flattened forest predictions differ from sklearn at batch size {size}")
+        # Large batches take long enough that a few calls are representative
+        repeat = max(3, min(args.repeat, args.repeat * 100 // size))
+        sklearn_timing = time_calls(lambda: estimator.predict(batch), repeat)
+        flat_timing = time_calls(lambda: flat.predict(batch), repeat)
+        print(f"{size:8d} {sklearn_timing['p50_ms']:11.3f} ms {flat_timing['p50_ms']:9.3f} ms "
+              f"{sklearn_timing['p50_ms'] / flat_timing['p50_ms']:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
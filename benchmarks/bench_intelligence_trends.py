@@ -0,0 +1,92 @@
+# benchmarks/bench_intelligence_trends.py
+"""
+Per-call latency of check_intelligence_trends before (one query per metric and
+per intelligence type) and after (single conditional-aggregation statement).
+
+    BENCH_DB=bench_trends.db python -m benchmarks.bench_intelligence_trends --rows 5000000
+"""
+import argparse
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from benchmarks.common import BENCH_DATABASE_PATH, create_benchmark_engine, open_session, seed_intelligence, time_calls
+from app.models.models import Intelligence
+from app.schemas.intelligence import IntelligenceType
+from app.services.validation import check_intelligence_trends
+
+
+def legacy_check_intelligence_trends(parish_id: int, db: Session) -> Dict[str, Any]:
+    """The previous implementation, kept here as the baseline"""
+    total_count = db.query(func.count(Intelligence.id)).filter(
+        Intelligence.parish_id == parish_id
+    ).scalar()
+
+    avg_severity = db.query(func.avg(Intelligence.severity)).filter(
+        Intelligence.parish_id == parish_id
+    ).scalar() or 0.0
+
+    intel_by_type = {}
+    for intel_type in IntelligenceType:
+        count = db.query(func.count(Intelligence.id)).filter(
+            Intelligence.parish_id == parish_id,
+            Intelligence.type == intel_type.value
+        ).scalar()
+        intel_by_type[intel_type.value] = count
+
+    verified_count = db.query(func.count(Intelligence.id)).filter(
+        Intelligence.parish_id == parish_id,
+        Intelligence.is_verified == True
+    ).scalar()
+
+    week_ago = datetime.now() - timedelta(days=7)
+    recent_count = db.query(func.count(Intelligence.id)).filter(
+        Intelligence.parish_id == parish_id,
+        Intelligence.timestamp > week_ago
+    ).scalar()
+
+    return {
+        "total_intelligence": total_count,
+        "average_severity": float(avg_severity),
+        "intelligence_by_type": intel_by_type,
+        "verified_count": verified_count,
+        "unverified_count": total_count - verified_count,
+        "recent_activity": recent_count
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--parish-id", type=int, default=1)
+    args = parser.parse_args()
+
+    # The database file (BENCH_DB) is reused when it already holds enough rows
+    engine = create_benchmark_engine()
+    db = open_session()
+
+    existing = db.query(func.count(Intelligence.id)).scalar()
+    if existing < args.rows:
+        print(f"Seeding {args.rows - existing} intelligence rows into {BENCH_DATABASE_PATH}...")
+        seed_intelligence(engine, args.rows - existing)
+
+    before = legacy_check_intelligence_trends(args.parish_id, db)
+    after = check_intelligence_trends(args.parish_id, db)
+    assert before == after, f"Output differs:\n{before}\n{after}"
+
+    print(f"Rows: {args.rows}, parish {args.parish_id}, {args.repeat} calls each")
+    for label, func_ in [
+        ("before (per-metric queries)", lambda: legacy_check_intelligence_trends(args.parish_id, db)),
+        ("after (single statement)", lambda: check_intelligence_trends(args.parish_id, db)),
+    ]:
+        stats = time_calls(func_, args.repeat)
+        print(f"{label:30s} mean {stats['mean_ms']:9.2f} ms   p50 {stats['p50_ms']:9.2f} ms   p95 {stats['p95_ms']:9.2f} ms")
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
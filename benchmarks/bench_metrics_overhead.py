@@ -0,0 +1,103 @@
+# benchmarks/bench_metrics_overhead.py
+"""
+Overhead of the /metrics instrumentation: the same request mix is sent
+in-process (httpx ASGITransport, no network) with the collectors switched off
+and on, alternating rounds so drift affects both equally. Also reports the
+cost of a single histogram observation. The target is under 2%.
+
+    BENCH_DB=bench_metrics.db python -m benchmarks.bench_metrics_overhead --rows 100000
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from typing import List
+
+import httpx
+from sqlalchemy import func
+
+from benchmarks.common import BENCH_DATABASE_PATH, create_benchmark_engine, open_session, seed_intelligence
+from benchmarks.load_async_vs_sync import request_paths
+from app.core.metrics import Histogram, registry
+from app.core.reference_data import refresh_reference_data
+from app.main import app
+from app.ml.models.resource_allocator import ResourceAllocator
+from app.models.models import Intelligence
+
+
+async def run_round(client: httpx.AsyncClient, paths: List[str]) -> float:
+    """Seconds to send every path in turn"""
+    start = time.perf_counter()
+    for path in paths:
+        response = await client.get(path)
+        response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def compare(paths: List[str], rounds: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    timings = {False: [], True: []}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        registry.enabled = True
+        await run_round(client, paths)  # warm-up (model load, caches)
+        for round_index in range(rounds):
+            # Alternate which mode goes first
+            for enabled in ((False, True) if round_index % 2 == 0 else (True, False)):
+                registry.enabled = enabled
+                timings[enabled].append(await run_round(client, paths))
+    registry.enabled = True
+    return timings
+
+
+def observe_cost(observations: int, threads: int) -> float:
+    """Nanoseconds per Histogram.observe with several threads recording at once"""
+    histogram = Histogram("bench_observe_seconds", "Benchmark histogram", ["route"])
+
+    def record():
+        for i in range(observations):
+            histogram.observe(0.003, ("/api/v1/parishes/{parish_id}",))
+
+    workers = [threading.Thread(target=record) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    assert histogram.collect()[("/api/v1/parishes/{parish_id}",)][-1] > 0
+    return elapsed / (observations * threads) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per round")
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    engine = create_benchmark_engine()
+    db = open_session()
+    existing = db.query(func.count(Intelligence.id)).scalar()
+    if existing < args.rows:
+        print(f"Seeding {args.rows - existing} intelligence rows into {BENCH_DATABASE_PATH}...")
+        seed_intelligence(engine, args.rows - existing)
+    refresh_reference_data(db)
+    # Parish reads need an allocation to exist
+    ResourceAllocator().allocate_resources(db)
+    db.close()
+
+    paths = request_paths(0, args.requests)
+    timings = asyncio.run(compare(paths, args.rounds))
+
+    off, on = statistics.median(timings[False]), statistics.median(timings[True])
+    overhead = (on / off - 1) * 100
+    print(f"Requests per round: {len(paths)}, rounds: {args.rounds}")
+    print(f"{'metrics off':16s} {1000 * off / len(paths):8.3f} ms/request (median round)")
+    print(f"{'metrics on':16s} {1000 * on / len(paths):8.3f} ms/request (median round)")
+    print(f"{'overhead':16s} {overhead:8.2f} %   ({'within' if overhead < 2 else 'OVER'} the 2% budget)")
+    print(f"{'observe()':16s} {observe_cost(200_000, 4):8.0f} ns per observation (4 threads)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# benchmarks/bench_model_memory.py
+"""
+Memory of the newest ModelVersion across several worker processes, each
+loading it through the model cache like an API worker does, with every page
+of the model touched (as after enough predictions):
+
+- private: MODEL_SHARE_PATH unset, every worker unpickles and flattens its
+  own copy
+- shared: MODEL_SHARE_PATH set, every worker maps the same exported file
+  (exported beforehand, as the training process does when it saves a model)
+
+All workers stay alive while they are measured. Per worker it reports the
+growth of RSS (resident pages, shared ones counted in full), RssAnon (private
+heap) and PSS (shared pages split between the processes that map them) from
+loading the model, and the PSS of all workers together.
+
+    BENCH_DB=bench_model_memory.db python -m benchmarks.bench_model_memory --workers 4
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from sqlalchemy import func
+
+from benchmarks.common import BENCH_DATABASE_PATH, create_benchmark_engine, open_session, seed_intelligence
+from app.models.models import Intelligence
+
+WORKER = """
+import json, sys
+import numpy as np
+
+def memory():
+    fields = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(("VmRSS:", "RssAnon:")):
+                key, value = line.split(":")
+                fields[key] = int(value.split()[0]) * 1024
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Pss:"):
+                fields["Pss"] = int(line.split()[1]) * 1024
+    return {"rss": fields["VmRSS"], "rss_anon": fields["RssAnon"], "pss": fields["Pss"]}
+
+from benchmarks.common import open_session
+from app.ml.models.crime_prediction import CrimePredictionModel, model_cache
+from app.ml.warmup import synthetic_frame
+from app.core.reference_data import refresh_reference_data
+
+db = open_session()
+frame = synthetic_frame(refresh_reference_data(db).parish_ids.tolist())
+before = memory()
+model = CrimePredictionModel(db)
+model.predict_severities(frame)
+estimator = model_cache.entry.estimator
+# Fault in every page of the model, as a long-running worker eventually does
+for array in (estimator.left, estimator.right, estimator.feature, estimator.threshold,
+              estimator.missing_left, estimator.value):
+    array.sum()
+after = memory()
+db.close()
+print(json.dumps({"mapped": isinstance(estimator.value, np.memmap), "before": before, "after": after}), flush=True)
+sys.stdin.readline()
+"""
+
+
+def read_result(process: subprocess.Popen) -> dict:
+    """The worker's JSON line, skipping what the application prints while loading"""
+    for line in process.stdout:
+        if line.startswith("{"):
+            return json.loads(line)
+    raise RuntimeError(f"Worker exited with status {process.wait()}")
+
+
+def measure(workers: int, share_path: str) -> list:
+    """Memory before and after loading the model, one dict per concurrently running worker"""
+    env = dict(os.environ, MODEL_SHARE_PATH=share_path)
+    processes = [
+        subprocess.Popen([sys.executable, "-c", WORKER], env=env, stdin=subprocess.PIPE,
+                         stdout=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    try:
+        return [read_result(process) for process in processes]
+    finally:
+        for process in processes:
+            process.stdin.close()
+            process.wait()
+
+
+def report(label: str, results: list) -> dict:
+    mib = 1024 * 1024
+    growth = {
+        key: statistics.mean(r["after"][key] - r["before"][key] for r in results) / mib
+        for key in ("rss", "rss_anon", "pss")
+    }
+    total_pss = sum(r["after"]["pss"] for r in results) / mib
+    print(f"{label:8s} (mapped: {results[0]['mapped']}): per worker RSS +{growth['rss']:.1f} MiB, "
+          f"RssAnon +{growth['rss_anon']:.1f} MiB, PSS +{growth['pss']:.1f} MiB; "
+          f"PSS of all workers {total_pss:.1f} MiB")
+    return {"growth_mib": growth, "total_pss_mib": total_pss}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--train-rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    engine = create_benchmark_engine()
+    db = open_session()
+    existing = db.query(func.count(Intelligence.id)).scalar()
+    db.close()
+    if existing < args.rows:
+        print(f"Seeding {args.rows - existing} intelligence rows into {BENCH_DATABASE_PATH}...")
+        seed_intelligence(engine, args.rows - existing)
+    subprocess.run([sys.executable, "-c", (
+        "from benchmarks.load_harness import ensure_trained_model\n"
+        f"ensure_trained_model({args.train_rows})\n"
+    )], check=True)
+    engine.dispose()
+
+    share_path = tempfile.mkdtemp(prefix="jisp-models-")
+    try:
+        subprocess.run([sys.executable, "-c", (
+            "from benchmarks.common import open_session\n"
+            "from app.ml.models.crime_prediction import model_cache\n"
+            "model_cache.latest(open_session())\n"
+        )], env=dict(os.environ, MODEL_SHARE_PATH=share_path), check=True, stdout=subprocess.DEVNULL)
+        private = report("private", measure(args.workers, ""))
+        shared = report("shared", measure(args.workers, share_path))
+    finally:
+        shutil.rmtree(share_path)
+    print(f"{'saved':8s} {private['total_pss_mib'] - shared['total_pss_mib']:.1f} MiB PSS over {args.workers} workers")
+
+
+if __name__ == "__main__":
+    main()
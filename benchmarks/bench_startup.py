@@ -0,0 +1,126 @@
+# benchmarks/bench_startup.py
+"""
+Cold start of an API worker, each run in a fresh process:
+
+- import: `import app.main` alone, and which heavy ML modules it pulled in
+  (none are expected: pandas and scikit-learn are imported on first use)
+- first 200: from spawning uvicorn to the first successful request
+  (GET /api/v1/parishes/, which needs the startup event to have finished)
+- ready: from spawning uvicorn until /ready answers 200, i.e. the warm-up
+  has imported the ML modules, loaded the model and run a prediction
+- first model request: GET /api/v1/insights/resource-recommendations right
+  after that
+
+    BENCH_DB=bench_startup.db python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+from sqlalchemy import func
+
+from benchmarks.common import BENCH_DATABASE_PATH, create_benchmark_engine, open_session, seed_intelligence
+from app.models.models import Intelligence
+
+HEAVY_MODULES = ("pandas", "sklearn", "scipy", "alembic")
+
+IMPORT_PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import() -> dict:
+    output = subprocess.run([sys.executable, "-c", IMPORT_PROBE], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def wait_for(client: httpx.Client, server: subprocess.Popen, path: str, start: float, timeout: float) -> float:
+    """Poll path until it answers 200; seconds since start"""
+    while True:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with status {server.returncode}")
+        if time.perf_counter() - start > timeout:
+            raise RuntimeError(f"{path} did not answer 200 within {timeout} s")
+        try:
+            if client.get(path).status_code == 200:
+                return time.perf_counter() - start
+        except httpx.TransportError:
+            pass
+        time.sleep(0.01)
+
+
+def measure_server(port: int, timeout: float = 60.0) -> dict:
+    """Seconds from spawn to the first 200 and to /ready, then the duration of the first model request"""
+    base_url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL
+    )
+    try:
+        with httpx.Client(base_url=base_url, timeout=timeout) as client:
+            first_200 = wait_for(client, server, "/api/v1/parishes/", start, timeout)
+            ready = wait_for(client, server, "/ready", start, timeout)
+
+            model_start = time.perf_counter()
+            client.get("/api/v1/insights/resource-recommendations").raise_for_status()
+            first_model_request = time.perf_counter() - model_start
+    finally:
+        server.terminate()
+        server.wait()
+    return {"first_200": first_200, "ready": ready, "first_model_request": first_model_request}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--train-rows", type=int, default=10_000)
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    engine = create_benchmark_engine()
+    db = open_session()
+    existing = db.query(func.count(Intelligence.id)).scalar()
+    db.close()
+    if existing < args.rows:
+        print(f"Seeding {args.rows - existing} intelligence rows into {BENCH_DATABASE_PATH}...")
+        seed_intelligence(engine, args.rows - existing)
+    # Trained in a subprocess so this process stays free of the ML imports;
+    # parish reads need an allocation to exist
+    subprocess.run([sys.executable, "-c", (
+        "from benchmarks.common import open_session\n"
+        "from benchmarks.load_harness import ensure_trained_model\n"
+        "from app.ml.models.resource_allocator import ResourceAllocator\n"
+        f"ensure_trained_model({args.train_rows})\n"
+        "db = open_session()\n"
+        "ResourceAllocator().allocate_resources(db)\n"
+        "db.close()\n"
+    )], check=True)
+    engine.dispose()
+
+    imports, servers = [], []
+    for run in range(args.runs):
+        imports.append(measure_import())
+        servers.append(measure_server(args.port))
+        print(f"run {run + 1}: import {imports[-1]['seconds']:.3f} s, first 200 {servers[-1]['first_200']:.3f} s, "
+              f"ready {servers[-1]['ready']:.3f} s, first model request {servers[-1]['first_model_request']:.3f} s")
+
+    loaded = sorted({module for result in imports for module in result["loaded"]})
+    print(f"{'import app.main':24s} {statistics.median(r['seconds'] for r in imports):8.3f} s (median)")
+    print(f"{'first 200 after spawn':24s} {statistics.median(s['first_200'] for s in servers):8.3f} s (median)")
+    print(f"{'/ready after spawn':24s} {statistics.median(s['ready'] for s in servers):8.3f} s (median)")
+    print(f"{'first model request':24s} {statistics.median(s['first_model_request'] for s in servers):8.3f} s (median)")
+    print(f"{'ML modules at import':24s} {', '.join(loaded) if loaded else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
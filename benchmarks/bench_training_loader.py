@@ -0,0 +1,79 @@
+# benchmarks/bench_training_loader.py
+"""
+Time and peak Python memory of loading the training set before (every ORM
+object, then a list of dicts, then a DataFrame) and after (load_training_frame
+streaming typed column arrays).
+
+    BENCH_DB=bench_training.db python -m benchmarks.bench_training_loader --rows 1000000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+import pandas as pd
+from sqlalchemy import func
+
+from benchmarks.common import BENCH_DATABASE_PATH, create_benchmark_engine, open_session, seed_intelligence
+from app.models.models import Intelligence
+from app.ml.training.data_loader import load_training_frame
+
+
+def legacy_load_training_frame(db) -> pd.DataFrame:
+    """The previous implementation, kept here as the baseline"""
+    intelligence_records = db.query(Intelligence).all()
+    data = [{
+        "type": record.type,
+        "parish_id": record.parish_id,
+        "severity": record.severity,
+        "confidence": record.confidence,
+        "is_verified": record.is_verified,
+        "feedback_score": record.feedback_score,
+        "timestamp": record.timestamp
+    } for record in intelligence_records]
+    return pd.DataFrame(data)
+
+
+def measure(load: Callable[[], pd.DataFrame]) -> Tuple[pd.DataFrame, float, float]:
+    """Result, seconds and peak traced memory in MB"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    df = load()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return df, elapsed, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+
+    engine = create_benchmark_engine()
+    db = open_session()
+
+    existing = db.query(func.count(Intelligence.id)).scalar()
+    if existing < args.rows:
+        print(f"Seeding {args.rows - existing} intelligence rows into {BENCH_DATABASE_PATH}...")
+        seed_intelligence(engine, args.rows - existing)
+
+    print(f"Rows: {max(existing, args.rows)}")
+    for label, load in [
+        ("before (ORM objects + dicts)", lambda: legacy_load_training_frame(db)),
+        ("after (streamed column arrays)", lambda: load_training_frame(db, chunk_size=args.chunk_size)),
+    ]:
+        df, elapsed, peak_mb = measure(load)
+        frame_mb = df.memory_usage(deep=False).sum() / 1e6
+        print(f"{label:32s} {elapsed:8.2f} s   peak {peak_mb:9.1f} MB   frame {frame_mb:7.1f} MB")
+        del df
+        db.expunge_all()
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# benchmarks/bench_training_reservoir.py
+"""
+Accuracy against training time of the bounded training set
+(TRAINING_RESERVOIR_ROWS) at several reservoir sizes, next to training on
+every report:
+
+- build: building the reservoir from scratch and loading its rows (for
+  "all", loading every report)
+- fit: fitting the estimator, with the sample weights
+- accuracy and mean absolute error of the predicted severity on reports added
+  after training (--holdout-rows, inserted for the evaluation and removed
+  afterwards)
+- update: the incremental reservoir update that takes in those new reports
+
+The served feature set includes severity itself and products of it, so
+predicting severity from it is trivially exact. Here models are fitted and
+scored without those columns, on reports seeded with a severity that depends
+on type, parish, hour and recency (seed_intelligence(learnable_severity=True)),
+so the training sets can be told apart. Use a BENCH_DB of its own: a database
+seeded by the other benchmarks has uniform severities.
+
+    BENCH_DB=bench_reservoir.db python -m benchmarks.bench_training_reservoir --rows 200000 --sizes 5000,20000,50000
+"""
+import argparse
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, func
+
+from benchmarks.common import BENCH_DATABASE_PATH, create_benchmark_engine, open_session, seed_intelligence
+from app.core.config import settings
+from app.ml.features.feature_engineering import FeatureEngineer
+from app.ml.features.materialized import backfill_static_features, load_static_training_frame
+from app.ml.models.crime_prediction import new_estimator
+from app.ml.training.reservoir import TrainingReservoir
+from app.models.models import Intelligence, IntelligenceFeatures
+
+# Features computed from the target; the benchmark leaves them (and their _norm columns) out
+SEVERITY_FEATURES = {
+    "severity", "weighted_severity", "severity_confidence", "verified_severity",
+    "weekend_severity", "density_severity", "recency_severity",
+}
+
+
+def without_severity(X: np.ndarray, feature_names: list) -> tuple:
+    keep = [i for i, name in enumerate(feature_names) if name.removesuffix("_norm") not in SEVERITY_FEATURES]
+    return X[:, keep], [feature_names[i] for i in keep]
+
+
+def fit(static: pd.DataFrame, sample_weight) -> dict:
+    """train_on_features without saving the model, on the severity-free features"""
+    feature_engineer = FeatureEngineer()
+    y = static["severity"].values
+    X, feature_names = without_severity(*feature_engineer.finalize_features(static))
+    estimator = new_estimator()
+    start = time.perf_counter()
+    estimator.fit(X, y, sample_weight=sample_weight)
+    return {
+        "estimator": estimator, "features": feature_names, "stats": feature_engineer.feature_stats,
+        "rows": len(static), "fit": time.perf_counter() - start,
+    }
+
+
+def evaluate(model: dict, holdout: pd.DataFrame) -> dict:
+    """Accuracy and mean absolute error of the predicted severity, featurized as at prediction time"""
+    X, feature_names = FeatureEngineer().finalize_features(
+        holdout.copy(), reference_time=datetime.now(timezone.utc), stats=model["stats"]
+    )
+    X = pd.DataFrame(X, columns=feature_names).reindex(columns=model["features"], fill_value=0).values
+    predicted = model["estimator"].predict(X)
+    actual = holdout["severity"].to_numpy()
+    return {"accuracy": float(np.mean(predicted == actual)), "mae": float(np.mean(np.abs(predicted - actual)))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--sizes", default="5000,20000,50000")
+    parser.add_argument("--holdout-rows", type=int, default=5_000)
+    parser.add_argument("--recent-days", type=int, default=settings.TRAINING_RECENT_DAYS)
+    parser.add_argument("--half-life-days", type=float, default=settings.TRAINING_HALF_LIFE_DAYS)
+    args = parser.parse_args()
+
+    engine = create_benchmark_engine()
+    db = open_session()
+    existing = db.query(func.count(Intelligence.id)).scalar()
+    if existing < args.rows:
+        print(f"Seeding {args.rows - existing} intelligence rows into {BENCH_DATABASE_PATH}...")
+        seed_intelligence(engine, args.rows - existing, learnable_severity=True)
+    backfill_static_features(db)
+    history_max_id = db.query(func.max(Intelligence.id)).scalar()
+
+    start = time.perf_counter()
+    static = load_static_training_frame(db)
+    build = time.perf_counter() - start
+    results = {"all": {**fit(static, None), "build": build}}
+    del static
+
+    reservoirs = {}
+    for size in [int(size) for size in args.sizes.split(",")]:
+        reservoir = TrainingReservoir(size, args.recent_days, args.half_life_days, rebuild_hours=10 ** 6)
+        start = time.perf_counter()
+        static, sample_weight = reservoir.training_set(db)
+        build = time.perf_counter() - start
+        results[f"reservoir {size}"] = {**fit(static, sample_weight), "build": build}
+        reservoirs[f"reservoir {size}"] = reservoir
+        del static
+
+    # Reports arriving after training: the evaluation set, and what the next incremental update reads
+    seed_intelligence(engine, args.holdout_rows, days=max(1, args.recent_days // 2), seed=7, learnable_severity=True)
+    try:
+        for label, reservoir in reservoirs.items():
+            start = time.perf_counter()
+            reservoir.update(db)
+            results[label]["update"] = time.perf_counter() - start
+        holdout = load_static_training_frame(db, conditions=[Intelligence.id > history_max_id])
+        for result in results.values():
+            result.update(evaluate(result, holdout))
+    finally:
+        db.execute(delete(IntelligenceFeatures).where(IntelligenceFeatures.intelligence_id > history_max_id))
+        db.execute(delete(Intelligence).where(Intelligence.id > history_max_id))
+        db.commit()
+        db.close()
+
+    print(f"{'training set':18s} {'rows':>8s} {'build':>9s} {'fit':>9s} {'accuracy':>9s} {'MAE':>7s} {'update':>9s}")
+    for label, result in results.items():
+        update = f"{result['update']:7.3f} s" if "update" in result else f"{'-':>9s}"
+        print(f"{label:18s} {result['rows']:8d} {result['build']:7.2f} s {result['fit']:7.2f} s "
+              f"{result['accuracy']:9.4f} {result['mae']:7.3f} {update}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# benchmarks/common.py
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import numpy as np
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+# Point the application at the benchmark database before anything imports app.db.session
+BENCH_DATABASE_PATH = os.environ.get("BENCH_DB", "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{BENCH_DATABASE_PATH}"
+
+from app.db.session import SessionLocal, engine
+from app.db.init_db import init_db
+from app.schemas.intelligence import IntelligenceType
+
+INTELLIGENCE_COLUMNS = ("type", "parish_id", "description", "severity", "confidence",
+                        "is_verified", "feedback_score", "timestamp")
+
+
+def create_benchmark_engine(fresh: bool = False) -> Engine:
+    """Engine for the benchmark database (BENCH_DB, SQLite), with the schema and parishes in place"""
+    if fresh and os.path.exists(BENCH_DATABASE_PATH):
+        engine.dispose()
+        os.remove(BENCH_DATABASE_PATH)
+
+    db = SessionLocal()
+    try:
+        init_db(db)
+    finally:
+        db.close()
+
+    return engine
+
+
+def open_session() -> Session:
+    return SessionLocal()
+
+
+def seed_intelligence(
+    engine: Engine,
+    rows: int,
+    days: int = 365,
+    chunk_size: int = 200_000,
+    seed: int = 42,
+    learnable_severity: bool = False
+) -> None:
+    """
+    Bulk-insert synthetic intelligence rows. Uses vectorized NumPy sampling and
+    executemany instead of the ORM so millions of rows can be seeded quickly;
+    the distributions roughly follow app.ml.training.synthetic_data.
+
+    Severity is uniform unless learnable_severity is set: then it depends on the
+    type, the parish, the hour and, for crime and gang reports, on whether the
+    report is from the last 60 days, plus noise, so model accuracy means something.
+    """
+    rng = np.random.default_rng(seed)
+    types = np.array([intel_type.value for intel_type in IntelligenceType])
+    type_weights = np.array([0.35, 0.08, 0.15, 0.12, 0.05, 0.25])
+    parish_weights = np.array([4, 4, 4, 2, 2, 1, 2, 1, 4, 1, 2, 1, 1, 1], dtype=float)
+    # Crime, Event, Person, Gang Activity, Police, Suspicious Activity (learnable_severity)
+    type_severity = np.array([5, 2, 3, 6, 2, 4])
+    end = np.datetime64(datetime.now().replace(microsecond=0), "s")
+    placeholders = ", ".join("?" for _ in INTELLIGENCE_COLUMNS)
+    statement = f"INSERT INTO intelligence ({', '.join(INTELLIGENCE_COLUMNS)}) VALUES ({placeholders})"
+
+    with engine.begin() as conn:
+        for offset in range(0, rows, chunk_size):
+            n = min(chunk_size, rows - offset)
+            parish_ids = rng.choice(np.arange(1, 15), size=n, p=parish_weights / parish_weights.sum())
+            type_codes = rng.choice(len(types), size=n, p=type_weights)
+            intel_types = types[type_codes]
+            severity = rng.integers(1, 11, size=n)
+            confidence = rng.uniform(0.3, 0.95, size=n).round(3)
+            is_verified = rng.random(n) < 0.6
+            feedback = rng.choice([-1, 0, 1], size=n, p=[0.2, 0.4, 0.4])
+            seconds = rng.integers(0, days * 24 * 3600, size=n)
+            if learnable_severity:
+                hours = (end - seconds.astype("timedelta64[s]")).astype("datetime64[h]").astype(np.int64) % 24
+                severity = (
+                    type_severity[type_codes]
+                    + (parish_weights[parish_ids - 1] >= 4)  # Urban parishes
+                    + ((hours < 5) | (hours >= 22))  # Night
+                    + 2 * ((seconds < 60 * 24 * 3600) & np.isin(type_codes, [0, 3]))  # Recent escalation
+                    + rng.choice([-1, 0, 1], size=n, p=[0.2, 0.6, 0.2])
+                ).clip(1, 10)
+            # Same text layout SQLAlchemy uses for SQLite DateTime, so range filters compare correctly
+            timestamps = np.char.add(
+                np.char.replace(np.datetime_as_string(end - seconds.astype("timedelta64[s]")), "T", " "),
+                ".000000"
+            )
+
+            conn.exec_driver_sql(statement, list(zip(
+                intel_types.tolist(),
+                parish_ids.tolist(),
+                ["Synthetic benchmark report"] * n,
+                severity.tolist(),
+                confidence.tolist(),
+                is_verified.tolist(),
+                feedback.tolist(),
+                timestamps.tolist()
+            )))
+
+
+def time_calls(func: Callable[[], object], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    """Run func repeatedly and summarise per-call latency in milliseconds"""
+    for _ in range(warmup):
+        func()
+
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    return {
+        "calls": repeat,
+        "mean_ms": sum(samples) / len(samples),
+        "p50_ms": samples[len(samples) // 2],
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "min_ms": samples[0],
+    }
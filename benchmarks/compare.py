@@ -0,0 +1,63 @@
+# benchmarks/compare.py
+"""
+Regression report between two benchmarks.suite result files. A case regresses
+when its median latency grew by more than --threshold percent and by more
+than --min-ms (sub-millisecond cases are mostly noise). Exits with status 1
+when anything regressed, so it can gate CI.
+
+    python -m benchmarks.compare results/main.json results/HEAD.json --threshold 10
+"""
+import argparse
+import json
+import sys
+
+
+def compare(baseline: dict, current: dict, threshold: float, min_ms: float) -> list:
+    """(size, case, baseline ms, current ms, change %, status) for every case in both files"""
+    rows = []
+    for size, part in current["sizes"].items():
+        base_cases = baseline["sizes"].get(size, {}).get("cases", {})
+        for case, stats in part["cases"].items():
+            if case not in base_cases:
+                rows.append((size, case, None, stats["p50_ms"], None, "new"))
+                continue
+            before, after = base_cases[case]["p50_ms"], stats["p50_ms"]
+            change = (after / before - 1) * 100 if before else 0.0
+            if change > threshold and after - before > min_ms:
+                status = "REGRESSION"
+            elif change < -threshold and before - after > min_ms:
+                status = "improved"
+            else:
+                status = "ok"
+            rows.append((size, case, before, after, change, status))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed slowdown in percent")
+    parser.add_argument("--min-ms", type=float, default=0.5, help="Ignore changes smaller than this")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    print(f"Baseline {baseline['meta']['commit']} ({baseline['meta']['created_at']}) -> "
+          f"current {current['meta']['commit']} ({current['meta']['created_at']}), threshold {args.threshold}%")
+    rows = compare(baseline, current, args.threshold, args.min_ms)
+    for size, case, before, after, change, status in rows:
+        before_text = f"{before:10.2f}" if before is not None else f"{'-':>10s}"
+        change_text = f"{change:+7.1f}%" if change is not None else f"{'':8s}"
+        print(f"{size:>8s}  {case:52s} {before_text} -> {after:10.2f} ms {change_text}  {status}")
+
+    regressions = [row for row in rows if row[5] == "REGRESSION"]
+    print(f"{len(regressions)} regression(s) out of {len(rows)} cases")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
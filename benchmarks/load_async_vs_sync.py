@@ -0,0 +1,143 @@
+# benchmarks/load_async_vs_sync.py
+"""
+Load-test comparison of the sync endpoints and the async database layer
+(ASYNC_DB_ENABLED). Starts the API under uvicorn once per mode and drives it
+with N concurrent clients, each sending a mix of intelligence and parish reads.
+
+    BENCH_DB=bench_load.db python -m benchmarks.load_async_vs_sync --clients 1000
+
+SQLite serialises access, so for numbers that mean anything in production pass
+--database-url with a PostgreSQL database (asyncpg must be installed).
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+from sqlalchemy import func
+
+from benchmarks.common import BENCH_DATABASE_PATH, create_benchmark_engine, open_session, seed_intelligence
+from app.models.models import Intelligence
+
+MODES = {"sync": "false", "async": "true"}
+
+
+def request_paths(client_id: int, count: int) -> List[str]:
+    """Request mix for one client: uncached intelligence reads plus cached parish reads"""
+    paths = []
+    for i in range(count):
+        parish_id = (client_id + i) % 14 + 1
+        paths.append([
+            f"/api/v1/intelligence/?parish_id={parish_id}&limit=20",
+            f"/api/v1/intelligence/insights/{parish_id}",
+            f"/api/v1/parishes/{parish_id}",
+            "/api/v1/parishes/with-stats",
+        ][i % 4])
+    return paths
+
+
+async def run_client(client: httpx.AsyncClient, paths: List[str], latencies: List[float], errors: List[str]) -> None:
+    for path in paths:
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                errors.append(str(response.status_code))
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run_load(base_url: str, clients: int, requests_per_client: int, timeout: float) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors: List[str] = []
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            run_client(client, request_paths(client_id, requests_per_client), latencies, errors)
+            for client_id in range(clients)
+        ])
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[int(len(latencies) * 0.95)],
+        "p99_ms": latencies[int(len(latencies) * 0.99)],
+        "max_ms": latencies[-1],
+    }
+
+
+def start_server(mode: str, database_url: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=database_url, ASYNC_DB_ENABLED=MODES[mode])
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning",
+         "--backlog", "4096"],
+        env=env
+    )
+
+
+def wait_until_ready(base_url: str, timeout: float = 60.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=1000, help="Concurrent clients")
+    parser.add_argument("--requests-per-client", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=100_000, help="Intelligence rows to seed (SQLite only)")
+    parser.add_argument("--database-url", default=None, help="Run against this database instead of BENCH_DB")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url is None:
+        engine = create_benchmark_engine()
+        db = open_session()
+        existing = db.query(func.count(Intelligence.id)).scalar()
+        db.close()
+        if existing < args.rows:
+            print(f"Seeding {args.rows - existing} intelligence rows into {BENCH_DATABASE_PATH}...")
+            seed_intelligence(engine, args.rows - existing)
+        database_url = f"sqlite:///{os.path.abspath(BENCH_DATABASE_PATH)}"
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    results = {}
+    for mode in args.modes:
+        server = start_server(mode, database_url, args.port)
+        try:
+            wait_until_ready(base_url)
+            asyncio.run(run_load(base_url, min(args.clients, 50), 1, args.timeout))  # warm-up
+            results[mode] = asyncio.run(run_load(base_url, args.clients, args.requests_per_client, args.timeout))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"\n{args.clients} concurrent clients x {args.requests_per_client} requests")
+    print(f"{'mode':<8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'errors':>8}")
+    for mode, result in results.items():
+        print(f"{mode:<8}{result['throughput_rps']:>10.1f}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}"
+              f"{result['p99_ms']:>10.1f}{result['max_ms']:>10.1f}{result['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
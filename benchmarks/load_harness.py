@@ -0,0 +1,436 @@
+# benchmarks/load_harness.py
+"""
+Replay a declarative load scenario (benchmarks/scenarios/*.json) against the
+API: an open-loop mix of HTTP requests plus websocket subscribers, and
+creators sending create_intelligence actions to /ws. Reports throughput,
+latency percentiles and error rates per request kind, and how long broadcasts
+took to reach the subscribers.
+
+By default the app runs in this process (httpx's ASGI transport and a minimal
+ASGI websocket client), sharing the event loop with the load generator;
+--target loopback starts uvicorn and connects over 127.0.0.1 instead
+(websocket clients then need the websockets package).
+
+    BENCH_DB=bench_load.db python -m benchmarks.load_harness benchmarks/scenarios/carnival_weekend_burst.json
+    BENCH_DB=bench_load.db python -m benchmarks.load_harness benchmarks/scenarios/carnival_weekend_burst.json \\
+        --target loopback --output carnival.json
+
+A scenario lists phases (duration, HTTP requests per second and websocket
+creates per second), the request mix by weight, parish and intelligence type
+weights, and the number of websocket subscribers and creators. Requests
+arrive as a Poisson process and their latency is measured from the scheduled
+arrival, so time queued behind max_in_flight counts. Reports created during
+the run are removed afterwards, so every replay starts from the same data.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.common import BENCH_DATABASE_PATH, open_session
+from benchmarks.load_async_vs_sync import start_server, wait_until_ready
+from benchmarks.suite_cases import prepare_database, remove_rows_after
+from app.main import app
+from app.ml.models.crime_prediction import CrimePredictionModel
+from app.ml.training.data_loader import load_training_frame
+from app.models.models import ModelVersion
+
+# Time allowed after the last phase for acknowledgements and broadcasts to arrive
+DRAIN_SECONDS = 15.0
+
+
+def ensure_trained_model(train_rows: int) -> None:
+    """Train once on the seeded data so predictions do not fall back to the heuristic"""
+    db = open_session()
+    try:
+        if db.query(ModelVersion).filter(ModelVersion.model_type == "crime_prediction").first() is None:
+            print(f"Training a model on the latest {train_rows} reports...")
+            frame = load_training_frame(db)
+            CrimePredictionModel(db).train(db, frame.iloc[-train_rows:].reset_index(drop=True))
+    finally:
+        db.close()
+
+
+def report_body(rng: random.Random, scenario: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "type": weighted_choice(rng, scenario["intelligence_types"]),
+        "parish_id": int(weighted_choice(rng, scenario["parish_weights"])),
+        "severity": rng.randint(1, 10),
+        "confidence": round(rng.uniform(0.3, 0.95), 3),
+        "description": f"Load test report {rng.getrandbits(48):012x}",
+    }
+
+
+def parish(rng: random.Random, scenario: Dict[str, Any]) -> str:
+    return weighted_choice(rng, scenario["parish_weights"])
+
+
+# Request kinds a scenario mix can use: (method, path, JSON body)
+REQUEST_KINDS: Dict[str, Callable[[random.Random, Dict[str, Any]], Tuple[str, str, Optional[dict]]]] = {
+    "create_intelligence": lambda rng, s: ("POST", "/api/v1/intelligence/", report_body(rng, s)),
+    "create_with_validation": lambda rng, s: ("POST", "/api/v1/intelligence/with-validation", report_body(rng, s)),
+    "parish_read": lambda rng, s: ("GET", f"/api/v1/parishes/{parish(rng, s)}", None),
+    "parish_stats": lambda rng, s: ("GET", "/api/v1/parishes/with-stats", None),
+    "intelligence_list": lambda rng, s: ("GET", f"/api/v1/intelligence/?parish_id={parish(rng, s)}&limit=20", None),
+    "parish_insights": lambda rng, s: ("GET", f"/api/v1/intelligence/insights/{parish(rng, s)}", None),
+    "resource_recommendations": lambda rng, s: ("GET", "/api/v1/insights/resource-recommendations", None),
+    "allocate_resources": lambda rng, s: ("POST", "/api/v1/parishes/allocate-resources", None),
+}
+
+
+def weighted_choice(rng: random.Random, weights: Dict[str, float]) -> str:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def load_scenario(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        scenario = json.load(f)
+    unknown = set(scenario["mix"]) - set(REQUEST_KINDS)
+    if unknown:
+        raise ValueError(f"Unknown request kinds in {path}: {sorted(unknown)} (known: {sorted(REQUEST_KINDS)})")
+    scenario.setdefault("seed", 0)
+    scenario.setdefault("max_in_flight", 100)
+    scenario.setdefault("websocket", {})
+    return scenario
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Nearest-rank percentiles of latencies in milliseconds"""
+    if not samples:
+        return {"count": 0}
+    samples = sorted(samples)
+
+    def rank(p: float) -> float:
+        return samples[min(len(samples) - 1, int(len(samples) * p))]
+    return {
+        "count": len(samples),
+        "p50_ms": rank(0.50), "p90_ms": rank(0.90), "p95_ms": rank(0.95), "p99_ms": rank(0.99),
+        "max_ms": samples[-1],
+    }
+
+
+class ASGIWebSocket:
+    """Minimal websocket client driving the ASGI app in this event loop"""
+    def __init__(self, asgi_app, path: str = "/ws"):
+        self.app = asgi_app
+        self.path = path
+        self._to_app: asyncio.Queue = asyncio.Queue()
+        self._from_app: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def connect(self) -> None:
+        scope = {
+            "type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws", "http_version": "1.1",
+            "path": self.path, "raw_path": self.path.encode(), "root_path": "", "query_string": b"",
+            "headers": [(b"host", b"loadtest")], "client": ("127.0.0.1", 0), "server": ("loadtest", 80),
+            "subprotocols": [],
+        }
+        await self._to_app.put({"type": "websocket.connect"})
+        self._task = asyncio.create_task(self.app(scope, self._to_app.get, self._from_app.put))
+        message = await self._from_app.get()
+        if message["type"] != "websocket.accept":
+            raise ConnectionError(f"Websocket rejected: {message}")
+
+    async def send(self, text: str) -> None:
+        await self._to_app.put({"type": "websocket.receive", "text": text})
+
+    async def recv(self) -> str:
+        message = await self._from_app.get()
+        if message["type"] == "websocket.close":
+            raise ConnectionError("Websocket closed by the app")
+        return message.get("text") or message.get("bytes", b"").decode()
+
+    async def close(self) -> None:
+        await self._to_app.put({"type": "websocket.disconnect", "code": 1000})
+        try:
+            await asyncio.wait_for(self._task, timeout=5)
+        except Exception:
+            pass
+
+
+class LoopbackWebSocket:
+    """Websocket client over the network (the websockets package)"""
+    def __init__(self, url: str):
+        self.url = url
+        self._connection = None
+
+    async def connect(self) -> None:
+        import websockets  # Optional dependency, only needed for websocket clients with --target loopback
+        self._connection = await websockets.connect(self.url, max_queue=None)
+
+    async def send(self, text: str) -> None:
+        await self._connection.send(text)
+
+    async def recv(self) -> str:
+        return await self._connection.recv()
+
+    async def close(self) -> None:
+        await self._connection.close()
+
+
+class LoadRun:
+    """State and measurements of one scenario replay"""
+    def __init__(self, scenario: Dict[str, Any], client: httpx.AsyncClient, open_websocket: Callable[[], Any]):
+        self.scenario = scenario
+        self.client = client
+        self.open_websocket = open_websocket
+        self.rng = random.Random(scenario["seed"])
+        self.in_flight = asyncio.Semaphore(scenario["max_in_flight"])
+        self.tasks: List[asyncio.Task] = []
+
+        self.latencies: Dict[str, List[float]] = {kind: [] for kind in scenario["mix"]}
+        self.errors: Dict[str, Counter] = {kind: Counter() for kind in scenario["mix"]}
+        self.phase_counts: Dict[str, Counter] = {}
+
+        # Websocket creates are matched to their broadcasts by a unique confidence value
+        self.subscribers_per_parish: Counter = Counter()
+        self.sent_broadcasts: Dict[float, Tuple[float, int]] = {}  # marker -> (sent at, parish)
+        self.deliveries: Counter = Counter()  # marker -> subscribers reached
+        self.delivery_latencies: List[float] = []
+        self.ack_latencies: List[float] = []
+        self.ack_errors: Counter = Counter()
+        self.pending_acks: Dict[int, List[float]] = {}  # creator -> send times, in order
+        self.creates_sent = 0
+
+    # HTTP
+
+    async def _request(self, kind: str, phase: str, scheduled_at: float) -> None:
+        method, path, body = REQUEST_KINDS[kind](self.rng, self.scenario)
+        async with self.in_flight:
+            try:
+                response = await self.client.request(method, path, json=body)
+                error = str(response.status_code) if response.status_code >= 400 else None
+            except httpx.HTTPError as e:
+                error = type(e).__name__
+        self.latencies[kind].append((time.perf_counter() - scheduled_at) * 1000)
+        self.phase_counts[phase]["completed"] += 1
+        if error:
+            self.errors[kind][error] += 1
+            self.phase_counts[phase]["errors"] += 1
+
+    async def _http_arrivals(self, phase: Dict[str, Any], end: float) -> None:
+        rate = phase.get("requests_per_second", 0)
+        if rate <= 0:
+            return
+        kinds, weights = list(self.scenario["mix"]), list(self.scenario["mix"].values())
+        scheduled_at = time.perf_counter()
+        while True:
+            scheduled_at += self.rng.expovariate(rate)
+            if scheduled_at >= end:
+                return
+            await asyncio.sleep(max(0.0, scheduled_at - time.perf_counter()))
+            kind = self.rng.choices(kinds, weights=weights)[0]
+            self.phase_counts[phase["name"]]["scheduled"] += 1
+            self.tasks.append(asyncio.create_task(self._request(kind, phase["name"], scheduled_at)))
+
+    # Websockets
+
+    async def _listen(self, websocket, creator: Optional[int] = None) -> None:
+        try:
+            while True:
+                message = json.loads(await websocket.recv())
+                received_at = time.perf_counter()
+                if message.get("event") == "intelligence_update":
+                    marker = message["data"].get("confidence")
+                    if marker in self.sent_broadcasts and creator is None:
+                        self.deliveries[marker] += 1
+                        self.delivery_latencies.append((received_at - self.sent_broadcasts[marker][0]) * 1000)
+                elif creator is not None and "status" in message:
+                    # The handler answers every action once, after broadcasting
+                    sent_at = self.pending_acks[creator].pop(0) if self.pending_acks[creator] else received_at
+                    self.ack_latencies.append((received_at - sent_at) * 1000)
+                    if message["status"] != "success":
+                        self.ack_errors[message.get("message", "error")[:80]] += 1
+        except (ConnectionError, asyncio.CancelledError):
+            return
+        except Exception as e:
+            # websockets raises its own ConnectionClosed
+            if type(e).__name__ != "ConnectionClosedOK":
+                self.ack_errors[type(e).__name__] += 1
+
+    async def _websocket_arrivals(self, phase: Dict[str, Any], creators: List[Any], end: float) -> None:
+        rate = phase.get("websocket_creates_per_second", 0)
+        if rate <= 0 or not creators:
+            return
+        scheduled_at = time.perf_counter()
+        while True:
+            scheduled_at += self.rng.expovariate(rate)
+            if scheduled_at >= end:
+                return
+            await asyncio.sleep(max(0.0, scheduled_at - time.perf_counter()))
+
+            body = report_body(self.rng, self.scenario)
+            marker = round(0.3 + (self.creates_sent % 600_000) / 1_000_000, 6)
+            body["confidence"] = marker
+            creator = self.creates_sent % len(creators)
+            self.creates_sent += 1
+
+            sent_at = time.perf_counter()
+            self.sent_broadcasts[marker] = (sent_at, body["parish_id"])
+            self.pending_acks[creator].append(sent_at)
+            await creators[creator].send(json.dumps({"action": "create_intelligence", "data": body}))
+
+    async def _connect_websockets(self) -> Tuple[List[Any], List[Any], List[asyncio.Task]]:
+        settings = self.scenario["websocket"]
+        subscribers, creators, listeners = [], [], []
+        for _ in range(settings.get("subscribers", 0)):
+            websocket = self.open_websocket()
+            await websocket.connect()
+            parish_id = int(weighted_choice(self.rng, self.scenario["parish_weights"]))
+            await websocket.send(json.dumps({"action": "subscribe", "parish_id": parish_id}))
+            self.subscribers_per_parish[parish_id] += 1
+            subscribers.append(websocket)
+            listeners.append(asyncio.create_task(self._listen(websocket)))
+        for creator in range(settings.get("creators", 0)):
+            websocket = self.open_websocket()
+            await websocket.connect()
+            self.pending_acks[creator] = []
+            creators.append(websocket)
+            listeners.append(asyncio.create_task(self._listen(websocket, creator)))
+        return subscribers, creators, listeners
+
+    async def run(self) -> Dict[str, Any]:
+        subscribers, creators, listeners = await self._connect_websockets()
+
+        start = time.perf_counter()
+        for phase in self.scenario["phases"]:
+            print(f"Phase {phase['name']}: {phase['duration_seconds']} s at {phase.get('requests_per_second', 0)} req/s, "
+                  f"{phase.get('websocket_creates_per_second', 0)} websocket creates/s")
+            self.phase_counts[phase["name"]] = Counter()
+            end = time.perf_counter() + phase["duration_seconds"]
+            await asyncio.gather(self._http_arrivals(phase, end), self._websocket_arrivals(phase, creators, end))
+        await asyncio.gather(*self.tasks)
+        elapsed = time.perf_counter() - start
+
+        # Let outstanding acknowledgements and broadcasts arrive
+        deadline = time.perf_counter() + DRAIN_SECONDS
+        while any(self.pending_acks.values()) and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(0.2)
+
+        for listener in listeners:
+            listener.cancel()
+        for websocket in subscribers + creators:
+            await websocket.close()
+        return self.summary(elapsed)
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        all_latencies = [latency for latencies in self.latencies.values() for latency in latencies]
+        total_errors = sum(sum(errors.values()) for errors in self.errors.values())
+        expected = sum(self.subscribers_per_parish[parish_id] for _, parish_id in self.sent_broadcasts.values())
+        delivered = sum(self.deliveries.values())
+        return {
+            "scenario": self.scenario["name"],
+            "elapsed_seconds": elapsed,
+            "http": {
+                "requests": len(all_latencies),
+                "throughput_rps": len(all_latencies) / elapsed if elapsed else 0.0,
+                "errors": total_errors,
+                "error_rate": total_errors / len(all_latencies) if all_latencies else 0.0,
+                **percentiles(all_latencies),
+                "kinds": {
+                    kind: {
+                        **percentiles(latencies),
+                        "errors": dict(self.errors[kind]),
+                        "error_rate": sum(self.errors[kind].values()) / len(latencies) if latencies else 0.0,
+                    }
+                    for kind, latencies in self.latencies.items()
+                },
+                "phases": {name: dict(counts) for name, counts in self.phase_counts.items()},
+            },
+            "websocket": {
+                "subscribers": sum(self.subscribers_per_parish.values()),
+                "creates": self.creates_sent,
+                "creates_per_second": self.creates_sent / elapsed if elapsed else 0.0,
+                "ack": {**percentiles(self.ack_latencies), "errors": dict(self.ack_errors),
+                        "unacknowledged": sum(len(pending) for pending in self.pending_acks.values())},
+                "broadcast": {**percentiles(self.delivery_latencies), "expected": expected,
+                              "delivered": delivered, "missed": max(0, expected - delivered)},
+            },
+        }
+
+
+def print_summary(result: Dict[str, Any]) -> None:
+    http = result["http"]
+    print(f"\n{result['scenario']}: {http['requests']} requests in {result['elapsed_seconds']:.1f} s "
+          f"({http['throughput_rps']:.1f} req/s), error rate {100 * http['error_rate']:.2f}%")
+    print(f"{'kind':<28}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'errors':>8}")
+    for kind, stats in list(http["kinds"].items()) + [("all", http)]:
+        if not stats.get("count"):
+            continue
+        errors = sum(stats["errors"].values()) if isinstance(stats["errors"], dict) else stats["errors"]
+        print(f"{kind:<28}{stats['count']:>7}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}"
+              f"{stats['p99_ms']:>10.1f}{stats['max_ms']:>10.1f}{errors:>8}")
+
+    websocket = result["websocket"]
+    if websocket["creates"]:
+        ack, broadcast = websocket["ack"], websocket["broadcast"]
+        print(f"\nwebsocket: {websocket['subscribers']} subscribers, {websocket['creates']} creates "
+              f"({websocket['creates_per_second']:.1f}/s), {sum(ack['errors'].values())} errors, "
+              f"{ack['unacknowledged']} unacknowledged")
+        if ack.get("count"):
+            print(f"  create ack        p50 {ack['p50_ms']:.1f} ms  p95 {ack['p95_ms']:.1f} ms  p99 {ack['p99_ms']:.1f} ms")
+        if broadcast.get("count"):
+            print(f"  broadcast delivery p50 {broadcast['p50_ms']:.1f} ms  p95 {broadcast['p95_ms']:.1f} ms  "
+                  f"p99 {broadcast['p99_ms']:.1f} ms  ({broadcast['delivered']}/{broadcast['expected']} delivered)")
+
+
+async def run_in_process(scenario: Dict[str, Any]) -> Dict[str, Any]:
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+        return await LoadRun(scenario, client, lambda: ASGIWebSocket(app)).run()
+
+
+async def run_loopback(scenario: Dict[str, Any], base_url: str, timeout: float) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=scenario["max_in_flight"])
+    websocket_url = base_url.replace("http://", "ws://") + "/ws"
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        return await LoadRun(scenario, client, lambda: LoopbackWebSocket(websocket_url)).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenario", help="Scenario JSON file, e.g. benchmarks/scenarios/carnival_weekend_burst.json")
+    parser.add_argument("--target", choices=["in-process", "loopback"], default="in-process")
+    parser.add_argument("--rows", type=int, default=100_000, help="Intelligence rows to seed")
+    parser.add_argument("--train-rows", type=int, default=50_000, help="Rows to train on when there is no model yet")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds (loopback)")
+    parser.add_argument("--output", default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    scenario = load_scenario(args.scenario)
+    prepare_database(args.rows)
+    ensure_trained_model(args.train_rows)
+
+    try:
+        if args.target == "in-process":
+            result = asyncio.run(run_in_process(scenario))
+        else:
+            database_url = f"sqlite:///{os.path.abspath(BENCH_DATABASE_PATH)}"
+            base_url = f"http://127.0.0.1:{args.port}"
+            server = start_server("sync", database_url, args.port)
+            try:
+                wait_until_ready(base_url)
+                result = asyncio.run(run_loopback(scenario, base_url, args.timeout))
+            finally:
+                server.terminate()
+                server.wait()
+    finally:
+        remove_rows_after(args.rows)
+
+    result["target"] = args.target
+    print_summary(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/suite.py
+"""
+Reproducible benchmark suite: feature extraction, training, prediction,
+resource allocation, intelligence trends and the main endpoints (in-process
+ASGI client) at several database sizes.
+
+Each size runs in its own process against its own SQLite file,
+bench_suite_<rows>.db, seeded on first use with the same fixed-seed synthetic
+data (benchmarks.common.seed_intelligence) and with the feature vectors
+backfilled. Results go to one JSON file to compare between commits:
+
+    python -m benchmarks.suite --sizes 10000,100000,1000000 --output results/HEAD.json
+    python -m benchmarks.compare results/main.json results/HEAD.json --threshold 10
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+DEFAULT_SIZES = "10000,100000,1000000"
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_size(rows: int, args) -> dict:
+    """Run benchmarks.suite_cases for one size in a fresh process"""
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as part:
+        output = part.name
+    env = {**os.environ, "BENCH_DB": os.path.join(args.db_dir, f"bench_suite_{rows}.db")}
+    try:
+        subprocess.run([
+            sys.executable, "-m", "benchmarks.suite_cases",
+            "--rows", str(rows), "--repeat", str(args.repeat),
+            "--train-rows", str(args.train_rows), "--output", output,
+        ], env=env, check=True)
+        with open(output) as f:
+            return json.load(f)
+    finally:
+        os.remove(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated row counts")
+    parser.add_argument("--repeat", type=int, default=20, help="Calls per case (extract_features runs a fifth)")
+    parser.add_argument("--train-rows", type=int, default=100_000, help="Most recent rows used by the train case")
+    parser.add_argument("--db-dir", default=".", help="Where the bench_suite_<rows>.db files are kept")
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeat": args.repeat,
+            "train_rows": args.train_rows,
+        },
+        "sizes": {},
+    }
+    for rows in [int(size) for size in args.sizes.split(",")]:
+        print(f"== {rows} rows ==")
+        part = run_size(rows, args)
+        results["sizes"][str(rows)] = part
+        for case, stats in part["cases"].items():
+            print(f"  {case:52s} p50 {stats['p50_ms']:10.2f} ms   mean {stats['mean_ms']:10.2f} ms")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=1)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
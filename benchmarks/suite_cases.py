@@ -0,0 +1,177 @@
+# benchmarks/suite_cases.py
+"""
+The cases of the benchmark suite for one database size. Normally started by
+benchmarks.suite, once per size, with BENCH_DB pointing at that size's file:
+
+    BENCH_DB=bench_suite_10000.db python -m benchmarks.suite_cases --rows 10000 --output part.json
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Callable, Dict
+
+import httpx
+from sqlalchemy import delete, func, select
+
+from benchmarks.common import BENCH_DATABASE_PATH, create_benchmark_engine, open_session, seed_intelligence, time_calls
+from app.core.cache import response_cache
+from app.core.reference_data import refresh_reference_data
+from app.main import app
+from app.ml.features.feature_engineering import FeatureEngineer
+from app.ml.features.materialized import backfill_static_features
+from app.ml.models.crime_prediction import CrimePredictionModel
+from app.ml.models.resource_allocator import ResourceAllocator
+from app.ml.training.data_loader import load_training_frame
+from app.models.models import Intelligence, IntelligenceFeatures
+from app.services.validation import check_intelligence_trends
+
+PARISH_IDS = list(range(1, 15))
+
+
+def prepare_database(rows: int) -> Dict[str, float]:
+    """Seed (first run only) and backfill the stored feature vectors; returns setup timings"""
+    timings = {}
+    engine = create_benchmark_engine()
+    remove_rows_after(rows)  # left behind by an interrupted run
+    db = open_session()
+    try:
+        existing = db.scalar(select(func.count(Intelligence.id)))
+        if existing < rows:
+            print(f"Seeding {rows - existing} intelligence rows into {BENCH_DATABASE_PATH}...")
+            start = time.perf_counter()
+            seed_intelligence(engine, rows - existing)
+            timings["seed_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        backfill_static_features(db)
+        timings["backfill_s"] = time.perf_counter() - start
+
+        refresh_reference_data(db)
+        # Parish reads need an allocation to exist
+        ResourceAllocator().allocate_resources(db)
+    finally:
+        db.close()
+    return timings
+
+
+def remove_rows_after(rows: int) -> None:
+    """Drop reports created by the write cases so the next run sees the same data"""
+    db = open_session()
+    try:
+        db.execute(delete(IntelligenceFeatures).where(IntelligenceFeatures.intelligence_id > rows))
+        db.execute(delete(Intelligence).where(Intelligence.id > rows))
+        db.commit()
+    finally:
+        db.close()
+
+
+def cycle(values):
+    """Callable returning the next value of values on each call"""
+    state = {"index": -1}
+
+    def next_value():
+        state["index"] = (state["index"] + 1) % len(values)
+        return values[state["index"]]
+    return next_value
+
+
+def ml_cases(db, repeat: int, train_rows: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    frame = load_training_frame(db)
+    feature_engineer = FeatureEngineer()
+
+    results["extract_features"] = time_calls(lambda: feature_engineer.extract_features(frame), max(1, repeat // 5))
+    results["extract_features"]["rows"] = len(frame)
+
+    # Random forest fitting grows superlinearly; bound it so 1M-row runs finish
+    train_frame = frame.iloc[-train_rows:].reset_index(drop=True)
+    results["train"] = time_calls(lambda: CrimePredictionModel(db).train(db, train_frame), 1, warmup=0)
+    results["train"]["rows"] = len(train_frame)
+    del frame, train_frame
+
+    model = CrimePredictionModel(db)
+    parish = cycle(PARISH_IDS)
+    results["predict_crime_level"] = time_calls(lambda: model.predict_crime_level(db, parish()), repeat)
+    results["predict_crime_levels_all_parishes"] = time_calls(lambda: model.predict_crime_levels(db, PARISH_IDS), repeat)
+
+    allocator = ResourceAllocator()
+    results["allocate_resources"] = time_calls(lambda: allocator.allocate_resources(db), repeat)
+
+    parish = cycle(PARISH_IDS)
+    results["check_intelligence_trends"] = time_calls(lambda: check_intelligence_trends(parish(), db), repeat)
+    return results
+
+
+def api_cases(repeat: int) -> Dict[str, Dict[str, float]]:
+    """Main endpoints through an in-process ASGI client (no network, no server)"""
+    loop = asyncio.new_event_loop()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+    def call(method: str, path: Callable[[], str], body: Callable[[], dict] = None, invalidate=()) -> Callable[[], None]:
+        def request():
+            if invalidate:
+                response_cache.invalidate(*invalidate)
+            response = loop.run_until_complete(
+                client.request(method, path(), json=body() if body else None)
+            )
+            response.raise_for_status()
+        return request
+
+    parish = cycle(PARISH_IDS)
+    counter = cycle(list(range(1000)))
+    report = lambda: {
+        "type": "Crime", "parish_id": parish(), "severity": 5,
+        "description": f"Benchmark report {counter()}"
+    }
+    cases = {
+        "GET /parishes/{id} (cached)": call("GET", lambda: f"/api/v1/parishes/{parish()}"),
+        "GET /parishes/with-stats (cached)": call("GET", lambda: "/api/v1/parishes/with-stats"),
+        "GET /parishes/with-stats (uncached)": call(
+            "GET", lambda: "/api/v1/parishes/with-stats", invalidate=("parish_stats",)
+        ),
+        "GET /intelligence/?parish_id&limit=20": call(
+            "GET", lambda: f"/api/v1/intelligence/?parish_id={parish()}&limit=20"
+        ),
+        "GET /intelligence/insights/{id}": call("GET", lambda: f"/api/v1/intelligence/insights/{parish()}"),
+        "GET /insights/resource-recommendations (uncached)": call(
+            "GET", lambda: "/api/v1/insights/resource-recommendations", invalidate=("insights",)
+        ),
+        "POST /intelligence/": call("POST", lambda: "/api/v1/intelligence/", report),
+        "POST /intelligence/with-validation": call("POST", lambda: "/api/v1/intelligence/with-validation", report),
+        "POST /parishes/allocate-resources": call("POST", lambda: "/api/v1/parishes/allocate-resources"),
+    }
+
+    results = {}
+    try:
+        for name, request in cases.items():
+            results[name] = time_calls(request, repeat)
+    finally:
+        loop.run_until_complete(client.aclose())
+        loop.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--train-rows", type=int, default=100_000, help="Most recent rows used by the train case")
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    setup = prepare_database(args.rows)
+    db = open_session()
+    try:
+        cases = ml_cases(db, args.repeat, args.train_rows)
+    finally:
+        db.close()
+    cases.update(api_cases(args.repeat))
+    remove_rows_after(args.rows)
+
+    with open(args.output, "w") as f:
+        json.dump({"rows": args.rows, "setup": setup, "cases": cases}, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
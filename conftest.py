@@ -0,0 +1,118 @@
+# conftest.py
+"""
+Pytest fixtures for query-count regression checks, e.g.
+
+    def test_parish_stats_queries(endpoint_queries):
+        endpoint_queries("/api/v1/parishes/with-stats", max_queries=3)
+
+Tests run against a temporary SQLite database (never DATABASE_URL from the
+environment): the schema, the reference data and a few months of synthetic
+reports, created once per session.
+"""
+import os
+import random
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+# The engine is created when app.db.session is first imported
+_DATABASE_DIR = tempfile.mkdtemp(prefix="jisp-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DATABASE_DIR, 'jisp.db')}"
+os.environ["DATABASE_READ_URLS"] = ""
+
+from app.core.sql_profiler import assert_max_queries as _assert_max_queries  # noqa: E402
+
+SYNTHETIC_REPORTS = 2000
+
+# Manual scripts run with python (they query a populated database or a running server on import)
+collect_ignore = [
+    "test_active_learning.py",
+    "test_allocation_fix.py",
+    "test_field_names.py",
+    "app/api/v1/endpoints/test_allocations.py",
+]
+
+
+def seed_reports(db, rows: int, days: int = 120, seed: int = 42) -> None:
+    """Synthetic intelligence reports spread over every parish, type and the last `days` days"""
+    from app.models.models import Intelligence, Parish
+    from app.schemas.intelligence import IntelligenceType
+
+    rng = random.Random(seed)
+    parish_ids = [parish_id for (parish_id,) in db.query(Parish.id)]
+    types = [intel_type.value for intel_type in IntelligenceType]
+    now = datetime.now()
+    db.add_all([
+        Intelligence(
+            type=rng.choice(types),
+            parish_id=rng.choice(parish_ids),
+            description="Synthetic test report",
+            severity=rng.randint(1, 10),
+            confidence=round(rng.uniform(0.3, 0.95), 3),
+            is_verified=rng.random() < 0.6,
+            feedback_score=rng.choice([-1, 0, 1]),
+            timestamp=now - timedelta(seconds=rng.randrange(days * 24 * 3600))
+        )
+        for _ in range(rows)
+    ])
+    db.commit()
+
+
+@pytest.fixture(scope="session")
+def database():
+    """The temporary database, with schema, parishes, settings and synthetic reports"""
+    from app.core.reference_data import refresh_reference_data
+    from app.db.init_db import seed_reference_data
+    from app.db.schema import create_schema
+    from app.db.session import engine, session_scope
+
+    create_schema(engine)
+    with session_scope() as db:
+        seed_reference_data(db)
+        seed_reports(db, SYNTHETIC_REPORTS)
+        refresh_reference_data(db)
+    yield engine
+    engine.dispose()
+    shutil.rmtree(_DATABASE_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def db(database):
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def assert_max_queries():
+    """Context manager failing the test when its block runs more than N queries"""
+    return _assert_max_queries
+
+
+@pytest.fixture
+def client(database):
+    """TestClient for the app; startup events (training monitor) are not run"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def endpoint_queries(client):
+    """
+    Call an endpoint and fail if it runs more than max_queries statements or
+    does not succeed; returns the response
+    """
+    def check(path: str, max_queries: int, method: str = "GET", **kwargs):
+        with _assert_max_queries(max_queries):
+            response = client.request(method, path, **kwargs)
+        assert response.status_code < 400, f"{method} {path} returned {response.status_code}: {response.text[:200]}"
+        return response
+    return check
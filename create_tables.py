@@ -1,4 +1,5 @@
 # create_tables.py
+from app.db.schema import create_schema
 from app.db.session import Base, engine
 from app.models.models import Parish, Intelligence, Prediction, ModelVersion, SystemSettings, ResourceAllocation
 
@@ -7,8 +8,8 @@ from sqlalchemy import inspect
 inspector = inspect(engine)
 print("Tables BEFORE:", inspector.get_table_names())
 
-# Force creation of all tables
-Base.metadata.create_all(bind=engine)
+# Force creation of all tables (a new database is stamped with the current revision)
+create_schema(engine)
 
 # Print tables after creation to verify
 inspector = inspect(engine)
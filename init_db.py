@@ -1,16 +1,33 @@
 # init_db.py
-from app.db.session import engine, SessionLocal
-from app.models.models import Base
-from app.db.init_db import init_db
+"""
+Seed the parishes and system settings. The API does not create or seed
+anything on startup, so run this once per database:
 
-print("Creating database tables...")
-# Create all tables
-Base.metadata.create_all(bind=engine)
+    alembic upgrade head
+    python init_db.py
+
+--create-tables uses create_all instead of the migrations (development
+databases) and stamps a new database with the current revision.
+"""
+import argparse
+
+from app.db.init_db import seed_reference_data
+from app.db.schema import create_schema
+from app.db.session import SessionLocal, engine
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--create-tables", action="store_true", help="Create missing tables with create_all first")
+args = parser.parse_args()
+
+if args.create_tables:
+    print("Creating database tables...")
+    create_schema(engine)
 
 print("Initializing data...")
-# Initialize with parish data
 db = SessionLocal()
-init_db(db)
-db.close()
+try:
+    seed_reference_data(db)
+finally:
+    db.close()
 
-print("Database initialized successfully!")
\ No newline at end of file
+print("Database initialized successfully!")
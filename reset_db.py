@@ -1,4 +1,5 @@
 # reset_db.py
+from app.db.schema import create_schema
 from app.db.session import Base, engine
 from app.models.models import *  # Import all models
 from app.db.init_db import init_db
@@ -11,7 +12,7 @@ Base.metadata.drop_all(bind=engine)
 
 # Recreate tables
 print("Creating database tables...")
-Base.metadata.create_all(bind=engine)
+create_schema(engine)
 
 # Initialize the database with parish data
 print("Initializing parishes...")
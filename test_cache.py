@@ -0,0 +1,61 @@
+# test_cache.py
+"""Response cache invalidation on the in-process and Redis backends"""
+import pytest
+
+from app.core.cache import MemoryCacheBackend, RedisCacheBackend, ResponseCache
+
+
+class FakeRedis:
+    """The part of redis.Redis the backend uses; values are stored as bytes like Redis does"""
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+
+    def incr(self, key):
+        value = int(self.data.get(key, b"0")) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request):
+    if request.param == "memory":
+        backend = MemoryCacheBackend()
+    else:
+        backend = RedisCacheBackend("redis://unused", client=FakeRedis())
+    return ResponseCache(backend, ttl=60)
+
+
+def test_read_after_invalidate_recomputes(cache):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"value": len(calls)}
+
+    first, first_etag = cache.get_or_compute("parishes", "list", compute)
+    assert cache.get_or_compute("parishes", "list", compute)[0] == first
+
+    cache.invalidate("parishes")
+    second, second_etag = cache.get_or_compute("parishes", "list", compute)
+    assert second == {"value": 2} and second_etag != first_etag
+    assert cache.get_or_compute("parishes", "list", compute)[0] == second
+    assert len(calls) == 2
+
+
+def test_invalidate_leaves_other_namespaces(cache):
+    cache.get_or_compute("parishes", "list", lambda: {"value": 1})
+    cache.invalidate("insights")
+    assert cache.get_or_compute("parishes", "list", lambda: {"value": 2})[0] == {"value": 1}
+
+
+def test_generation_counter_reads_as_int(cache):
+    cache.invalidate("parish_stats")
+    cache.invalidate("parish_stats")
+    assert cache.backend.get_int("parish_stats:generation") == 2
+    assert cache.backend.get_int("unset:generation") == 0
@@ -0,0 +1,107 @@
+# test_flat_forest.py
+"""
+Parity of the flattened forest evaluator with sklearn's RandomForestClassifier:
+identical class probabilities and predictions, in memory and memory-mapped.
+"""
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from app.ml.models.crime_prediction import new_estimator
+from app.ml.models.flat_forest import FlatForest, SharedModelStore
+
+
+def fitted_forest(seed: int = 0, rows: int = 3000, n_features: int = 12, missing: float = 0.0, estimator=None,
+                  **params):
+    rng = np.random.default_rng(seed)
+    X = rng.random((rows, n_features))
+    # Severity-like labels that depend on a few features, plus noise
+    y = np.clip((X[:, 0] * 6 + X[:, 1] * 4 + rng.normal(0, 1, rows)).round(), 1, 10).astype(int)
+    if missing:
+        X[rng.random(X.shape) < missing] = np.nan
+    if estimator is None:
+        estimator = RandomForestClassifier(random_state=seed, **params)
+    return estimator.fit(X, y)
+
+
+def batch(rows: int, n_features: int = 12, seed: int = 1, missing: float = 0.0):
+    rng = np.random.default_rng(seed)
+    X = rng.random((rows, n_features))
+    if missing:
+        X[rng.random(X.shape) < missing] = np.nan
+    return X
+
+
+def assert_parity(estimator, flat: FlatForest, X):
+    np.testing.assert_array_equal(flat.predict_proba(X), estimator.predict_proba(X))
+    np.testing.assert_array_equal(flat.predict(X), estimator.predict(X))
+
+
+@pytest.mark.parametrize("rows", [1, 50, 10_000])
+def test_production_estimator_parity(rows):
+    estimator = fitted_forest(estimator=new_estimator())
+    assert_parity(estimator, FlatForest.from_estimator(estimator), batch(rows))
+
+
+@pytest.mark.parametrize("params", [
+    {"n_estimators": 1},
+    {"n_estimators": 25, "max_depth": 3},
+    {"n_estimators": 25, "min_samples_leaf": 20},
+    {"n_estimators": 25, "max_features": None},
+])
+def test_parity_across_forest_shapes(params):
+    estimator = fitted_forest(**params)
+    assert_parity(estimator, FlatForest.from_estimator(estimator), batch(500))
+
+
+def test_parity_with_missing_values():
+    estimator = fitted_forest(n_estimators=25, missing=0.05)
+    assert_parity(estimator, FlatForest.from_estimator(estimator), batch(2000, missing=0.1))
+
+
+def test_parity_on_thresholds_and_float32_rounding():
+    estimator = fitted_forest(n_estimators=25)
+    X = batch(200)
+    # Values exactly on (and a float32 step either side of) the first split of each tree
+    for index, (row, tree) in enumerate(zip(X, estimator.estimators_)):
+        feature, split = tree.tree_.feature[0], np.float32(tree.tree_.threshold[0])
+        row[feature] = (split, np.nextafter(split, np.float32(-1)), np.nextafter(split, np.float32(2)))[index % 3]
+    assert_parity(estimator, FlatForest.from_estimator(estimator), X)
+
+
+def test_string_classes():
+    rng = np.random.default_rng(3)
+    X = rng.random((500, 4))
+    y = np.where(X[:, 0] > 0.5, "high", "low")
+    estimator = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+    assert_parity(estimator, FlatForest.from_estimator(estimator), batch(100, n_features=4))
+
+
+def test_rejects_wrong_feature_count():
+    flat = FlatForest.from_estimator(fitted_forest(n_estimators=5))
+    with pytest.raises(ValueError):
+        flat.predict(batch(10, n_features=11))
+
+
+def test_mapped_export_parity(tmp_path):
+    estimator = fitted_forest(n_estimators=25)
+    store = SharedModelStore(str(tmp_path), keep_versions=2)
+    flat = store.export(1, estimator)
+
+    assert isinstance(flat.value, np.memmap)
+    assert_parity(estimator, flat, batch(1000))
+    assert_parity(estimator, store.load(1), batch(1000, seed=2))
+
+
+def test_export_keeps_newest_versions(tmp_path):
+    estimator = fitted_forest(n_estimators=5)
+    store = SharedModelStore(str(tmp_path), keep_versions=2)
+    for version in (1, 2, 3):
+        store.export(version, estimator)
+    # Exporting an existing version again maps the file that is already there
+    store.export(3, estimator)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "crime_prediction_v2.joblib", "crime_prediction_v3.joblib"
+    ]
+    assert store.load(1) is None
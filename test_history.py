@@ -0,0 +1,118 @@
+# test_history.py
+"""Bucket selection and the point cap of the downsampled parish history"""
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete, insert
+
+from app.core.config import settings
+from app.models.models import Prediction, ResourceAllocation
+from app.services.history import METRICS_PER_PARISH, choose_bucket, closed_bucket_cache, get_history, local_now, to_datetime
+
+END = datetime(2026, 6, 15, 12, 30)
+
+
+@pytest.fixture
+def hourly_history(db):
+    """One prediction and one allocation per parish and hour over the 60 days before END"""
+    closed_bucket_cache.clear()
+    rows = [
+        {"parish_id": parish_id, "timestamp": END - timedelta(hours=hour + 1)}
+        for hour in range(60 * 24)
+        for parish_id in range(1, settings.TOTAL_PARISHES + 1)
+    ]
+    db.execute(insert(Prediction), [{**row, "predicted_crime_level": 50, "recommended_officers": 70} for row in rows])
+    db.execute(insert(ResourceAllocation), [{**row, "allocated_officers": 70} for row in rows])
+    db.commit()
+    yield
+    db.execute(delete(Prediction))
+    db.execute(delete(ResourceAllocation))
+    db.commit()
+    closed_bucket_cache.clear()
+
+
+def point_count(history) -> int:
+    return sum(len(points) for parish in history["parishes"] for key, points in parish.items() if key != "parish_id")
+
+
+@pytest.mark.parametrize("days, series_count, expected", [
+    (1, 1, "hour"),
+    (7, 3, "hour"),
+    (30, 3, "day"),
+    (30, 42, "day"),
+    (120, 42, "week"),
+    (365, 42, "month"),
+])
+def test_choose_bucket_keeps_points_under_the_cap(days, series_count, expected):
+    assert choose_bucket(END - timedelta(days=days), END, "auto", series_count) == expected
+
+
+def test_choose_bucket_never_finer_than_requested():
+    assert choose_bucket(END - timedelta(days=1), END, "week") == "week"
+
+
+def test_all_parishes_stay_within_the_point_cap(db, hourly_history, monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_MAX_POINTS", 2000)
+    history = get_history(db, start=END - timedelta(days=60), end=END)
+
+    # 14 parishes x 3 metrics of 60 daily points would be 2520
+    assert history["bucket"] == "week"
+    assert len(history["parishes"]) == settings.TOTAL_PARISHES
+    assert 0 < point_count(history) <= settings.HISTORY_MAX_POINTS
+
+
+def test_range_is_cut_when_even_months_do_not_fit(db, hourly_history, monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_MAX_POINTS", 2 * settings.TOTAL_PARISHES * METRICS_PER_PARISH)
+    history = get_history(db, start=END - timedelta(days=5 * 365), end=END, bucket="month")
+
+    assert history["bucket"] == "month"
+    assert history["start"] == datetime(2026, 5, 1)
+    assert point_count(history) <= settings.HISTORY_MAX_POINTS
+
+
+def test_single_parish_history(db, hourly_history):
+    history = get_history(db, start=END - timedelta(days=2), end=END, parish_id=3)
+
+    assert history["bucket"] == "hour"
+    (parish,) = history["parishes"]
+    assert parish["parish_id"] == 3
+    assert len(parish["predicted_crime_level"]) == len(parish["allocated_officers"]) == 48
+    assert point_count(history) <= settings.HISTORY_MAX_POINTS
+
+
+@pytest.fixture
+def tokyo_time(monkeypatch):
+    """Run with the process timezone set to UTC+9"""
+    monkeypatch.setenv("TZ", "Asia/Tokyo")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_aware_bounds_and_buckets_are_converted_to_local_time(tokyo_time):
+    kingston = timezone(timedelta(hours=-5))
+    assert to_datetime(datetime(2026, 6, 15, 20, 0, tzinfo=kingston)) == datetime(2026, 6, 16, 10, 0)
+    assert to_datetime("2026-06-15 20:00:00-05:00") == datetime(2026, 6, 16, 10, 0)
+    assert to_datetime("2026-06-15 20:00:00") == datetime(2026, 6, 15, 20, 0)
+
+
+def test_aware_bounds_find_rows_written_in_local_time(db, tokyo_time):
+    closed_bucket_cache.clear()
+    # Written the way ResourceAllocator.allocate_resources does
+    db.add(ResourceAllocation(parish_id=1, allocated_officers=70, timestamp=datetime.now()))
+    db.commit()
+    try:
+        end = datetime.now(timezone.utc)
+        history = get_history(db, start=end - timedelta(hours=2), end=end, bucket="hour", parish_id=1)
+        assert len(history["parishes"][0]["allocated_officers"]) == 1
+
+        # The current bucket is still open, so it is not kept in the closed bucket cache
+        key = ("allocations", 1, "hour")
+        entry = closed_bucket_cache.lookup(key, history["start"])
+        assert entry is None or all(row[1] < local_now().replace(minute=0, second=0, microsecond=0) for row in entry["rows"])
+    finally:
+        db.execute(delete(ResourceAllocation))
+        db.commit()
+        closed_bucket_cache.clear()
@@ -0,0 +1,21 @@
+# test_parish_stats.py
+"""/parishes/with-stats: one grouped statement for every parish"""
+from app.core.cache import response_cache
+from app.core.sql_profiler import profile_queries
+from app.services.trends import trend_engine
+
+
+def test_with_stats_runs_one_statement(client, db):
+    # A cold process first seeds the trend engine's windows with one more statement
+    trend_engine.trends(db)
+    response_cache.invalidate("parish_stats")
+
+    with profile_queries(all_threads=True) as profile:
+        response = client.get("/api/v1/parishes/with-stats")
+    assert response.status_code == 200
+    assert profile.count == 1, profile.summary()
+
+    parishes = response.json()
+    assert len(parishes) == 14
+    assert sum(parish["intelligence_count"] for parish in parishes) > 0
+    assert all(parish["crime_trend"] in ("increasing", "decreasing", "stable") for parish in parishes)
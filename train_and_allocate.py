@@ -1,8 +1,9 @@
 # train_and_allocate.py
 from app.db.session import SessionLocal
-from app.models.models import Intelligence, Parish
+from app.models.models import Parish
 from app.ml.models.crime_prediction import CrimePredictionModel
 from app.ml.models.resource_allocator import ResourceAllocator
+from app.ml.features.materialized import load_static_training_frame
 
 print("Starting model training and resource allocation...")
 
@@ -10,27 +11,16 @@ print("Starting model training and resource allocation...")
 db = SessionLocal()
 
 try:
-    # Get all intelligence data
+    # Stream the static feature vectors of all intelligence data
     print("Loading intelligence data...")
-    intelligence_records = db.query(Intelligence).all()
+    static_features = load_static_training_frame(db)
     
-    print(f"Found {len(intelligence_records)} intelligence records")
-    
-    # Convert to list of dictionaries for the model
-    data = [{
-        "type": record.type,
-        "parish_id": record.parish_id,
-        "severity": record.severity,
-        "confidence": record.confidence,
-        "is_verified": record.is_verified,
-        "feedback_score": record.feedback_score,
-        "timestamp": record.timestamp
-    } for record in intelligence_records]
+    print(f"Found {len(static_features)} intelligence records")
     
     # Train the crime prediction model
     print("Training crime prediction model...")
-    prediction_model = CrimePredictionModel()
-    accuracy = prediction_model.train(db, data)
+    prediction_model = CrimePredictionModel(db)
+    accuracy = prediction_model.train_on_features(db, static_features)
     print(f"Model trained with accuracy: {accuracy:.2f}")
     
     # Update crime levels for all parishes